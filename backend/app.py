@@ -3,8 +3,10 @@
 Flask API for the Sectomie Cultivation System - Single Sect Focus
 """
 
-from flask import Flask, jsonify, request, make_response
+from flask import Flask, jsonify, request, make_response, g
 from flask_cors import CORS
+from contextlib import ExitStack, contextmanager
+import atexit
 import json
 import random
 import uuid
@@ -21,6 +23,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from member import Member
 from sect import Sect
 from data_manager import DataManager
+from registry import MemberRegistry
+from disciple_index import DiscipleIndex, FIELDS as DISCIPLE_FIELDS, project
+from leaderboards import SectLeaderboard, top_disciples
+from world_locks import WorldLocks
+from background_saver import BackgroundSaver
+from response_cache import ResponseCache
+from cultivation_methods import SESSION_METHODS, get_session_cost
 
 app = Flask(__name__)
 
@@ -36,8 +45,14 @@ def handle_500_error(e):
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
     return response, 500
 
-# Initialize data manager
-data_manager = DataManager()
+# Initialize data manager (SECTOMIE_STORAGE=sqlite switches to the SQLite backend;
+# SECTOMIE_SAVE_FORMAT=ndjson|binary|mapped picks the snapshot layout, detected again on load,
+# and SECTOMIE_SAVE_COMPRESSION=none|gzip|zstd compresses binary snapshots)
+STORAGE_BACKEND = os.environ.get('SECTOMIE_STORAGE', 'json')
+DATA_FILE = "example_data.db" if STORAGE_BACKEND == 'sqlite' else "example_data.json"
+data_manager = DataManager(incremental=True, backend=STORAGE_BACKEND,
+                           save_format=os.environ.get('SECTOMIE_SAVE_FORMAT', 'json'),
+                           compression=os.environ.get('SECTOMIE_SAVE_COMPRESSION', 'gzip'))
 
 # Add global OPTIONS method handling for all API routes
 @app.route('/api/<path:path>', methods=['OPTIONS'])
@@ -55,13 +70,29 @@ members = []
 # Player sect ID (the main sect being managed)
 player_sect_id = 0  # Default to the first sect
 
-# Initialize game state
-game_state = GameState()
+# Initialize game state (SECTOMIE_WORLD_SEED makes every turn and action reproducible)
+world_seed = os.environ.get('SECTOMIE_WORLD_SEED')
+world_seed = int(world_seed) if world_seed is not None else None
+game_state = GameState(seed=world_seed)
 game_state.sect_id = player_sect_id
+game_state.enable_batch_engine()  # Vectorized turn processing when numpy is installed
+
+# Every sect advances each turn unless SECTOMIE_WORLD_SIMULATION=0;
+# SECTOMIE_TURN_WORKERS=N shards large worlds across N spawned worker processes
+if os.environ.get('SECTOMIE_WORLD_SIMULATION', '1') != '0':
+    game_state.enable_world_simulation(workers=int(os.environ.get('SECTOMIE_TURN_WORKERS', '0')) or None)
 
 # Try to load existing data
 try:
-    sects, members = data_manager.load_data("example_data.json")
+    sects, members = data_manager.load_data(
+        DATA_FILE, progress=lambda loaded, total: print(f"Loading world: {loaded}/{total} entities")
+    )
+    # Resume at the saved turn and world seed (unless SECTOMIE_WORLD_SEED overrides it)
+    game_state.restore(data_manager.last_load_world, members, seed=world_seed)
+    if data_manager.last_load_metrics:
+        load_metrics = data_manager.last_load_metrics
+        print(f"Loaded {load_metrics['sects']} sects and {load_metrics['members']} disciples "
+              f"in {load_metrics['total_time']:.3f}s ({load_metrics['entities_per_second']:.0f} entities/s)")
 except:
     # If no data exists, create some example data
     azure_peak = Sect("Azure Peak Sect", "Sword Dao", 3, 
@@ -97,11 +128,232 @@ except:
     members = [li_mei, zhang_wei]
     
     # Save the example data
-    data_manager.save_data(sects, members, "example_data.json")
+    data_manager.save_data(sects, members, DATA_FILE, world=game_state.to_dict())
+
+# Index disciples by their stable IDs for the /api/disciples/<id> routes
+member_registry = MemberRegistry(members)
+
+# Filter and sort indexes for the paginated disciple listings and leaderboards
+disciple_index = DiscipleIndex(members)
+sect_leaderboard = SectLeaderboard(sects)
+
+# SECTOMIE_LAZY_CULTIVATION=1 only cultivates the player sect every turn; other
+# disciples catch up in closed form before a request shows or changes them (reads
+# catch up in lock_world, so the lookup hook only does work under write locks).
+# Otherwise disciples left idle by a lazily cultivated save are caught up once here
+if os.environ.get('SECTOMIE_LAZY_CULTIVATION') == '1' and game_state.world_ticker is not None:
+    game_state.enable_lazy_cultivation(sects)
+    member_registry.on_access = game_state.materialize
+else:
+    game_state.settle_idle(members)
+
+# Per-sect readers-writer locks under a world lock (see world_locks.py)
+world_locks = WorldLocks(sects)
+
+# Mutations are saved by a writer thread, coalesced over SECTOMIE_SAVE_DELAY seconds
+# or SECTOMIE_SAVE_MAX_PENDING requests; SECTOMIE_BACKGROUND_SAVE=0 saves after every request
+world_saver = BackgroundSaver(
+    lambda: data_manager.save_data(sects, members, DATA_FILE, world=game_state.to_dict()),
+    max_latency=float(os.environ.get('SECTOMIE_SAVE_DELAY', '1.0')),
+    max_pending=int(os.environ.get('SECTOMIE_SAVE_MAX_PENDING', '500')),
+    guard=world_locks.read_all,
+    background=os.environ.get('SECTOMIE_BACKGROUND_SAVE', '1') != '0'
+)
+atexit.register(world_saver.close)
+
+# Views showing every disciple, or sect totals summed over them; with lazy
+# cultivation all idle disciples are caught up before one is built
+CATCH_UP_ENDPOINTS = {'get_disciples', 'get_disciple_leaderboard', 'get_sects', 'get_sect_leaderboard'}
+
+@contextmanager
+def read_world():
+    """
+    Hold every sect shared, first catching up idle disciples if the request lists them
+    
+    Catch-up writes the disciples it replays, so it runs under the world
+    write lock before the shared locks are taken; a turn that ends in
+    between means another round.
+    """
+    while True:
+        listing = request.endpoint in CATCH_UP_ENDPOINTS
+        if listing and not game_state.caught_up():
+            with world_locks.world_write():
+                game_state.materialize_all(members)
+        with world_locks.read_all():
+            if not listing or game_state.caught_up():
+                yield
+                return
+
+# GET responses are reused until the world version changes; hits take no locks
+response_cache = ResponseCache(lambda: game_state.world_version, guard=read_world)
+
+@app.after_request
+def bump_world_version(response):
+    """A successful POST may have changed the world, so invalidate cached responses"""
+    if request.method == 'POST' and response.status_code < 400:
+        game_state.mark_changed()
+    return response
+
+@app.after_request
+def recount_disciple_power(response):
+    """
+    Recount the combat power of the disciple a POST acted on
+    
+    Disciple actions change power fields one assignment at a time, so the
+    sect's aggregates are updated once here, while the request's locks are
+    still held, instead of on every write.
+    """
+    if request.method == 'POST':
+        member = member_registry.peek((request.view_args or {}).get('disciple_id'))
+        if member is not None and member.sect is not None:
+            member.sect.power_stats.update(member)
+    return response
+
+# Endpoints acting on the player sect; routes with a disciple_id or sect_id act on that sect
+PLAYER_SECT_ENDPOINTS = {
+    'get_player_sect_resources', 'get_player_sect_knowledge', 'collect_player_sect_resources',
+    'add_treasure', 'get_recruitment_candidates', 'select_recruit'
+}
+# Disciple endpoints that also spend the player sect's resources
+PLAYER_FUNDED_ENDPOINTS = {'cultivate_with_method', 'use_treasure', 'assign_cultivation_method'}
+WORLD_ENDPOINTS = {'end_turn'}
+
+def request_sect():
+    """The sect a request is confined to, or None if it spans the world"""
+    view_args = request.view_args or {}
+    if request.endpoint in PLAYER_SECT_ENDPOINTS:
+        return sects[player_sect_id] if 0 <= player_sect_id < len(sects) else None
+    if 'sect_id' in view_args:
+        sect_id = view_args['sect_id']
+        return sects[sect_id] if 0 <= sect_id < len(sects) else None
+    if 'disciple_id' in view_args:
+        member = member_registry.peek(view_args['disciple_id'])
+        if member is None:
+            return None
+        if request.endpoint in PLAYER_FUNDED_ENDPOINTS and member.sect is not sects[player_sect_id]:
+            return None  # Two sects change, so the request needs the world
+        return member.sect
+    return None
+
+@app.before_request
+def lock_world():
+    """
+    Take the locks a request needs for its whole duration
+    
+    Turn end holds the world exclusively. Requests confined to one sect hold
+    that sect (exclusively for POST), so sects are served in parallel.
+    Other reads hold every sect shared and other writes the whole world.
+    Views served from the response cache lock only when they rebuild.
+    A read of an idle disciple that is behind the current turn first catches
+    it up under its sect's write lock.
+    """
+    view = app.view_functions.get(request.endpoint)
+    if request.method == 'OPTIONS' or view is None or getattr(view, 'response_cache', None):
+        return
+    writing = request.method != 'GET'
+    
+    while True:
+        stack = ExitStack()
+        sect = None if request.endpoint in WORLD_ENDPOINTS else request_sect()
+        if sect is not None:
+            stack.enter_context(world_locks.sect_write(sect) if writing else world_locks.sect_read(sect))
+            if sect is not request_sect():  # The disciple changed sect while we waited
+                stack.close()
+                sect = None
+        if sect is None:
+            stack.enter_context(world_locks.world_write() if writing else read_world())
+        member = member_registry.peek((request.view_args or {}).get('disciple_id'))
+        if writing or member is None or not game_state.needs_catch_up(member):
+            break
+        stack.close()
+        with world_locks.sect_write(sect) if sect is not None else world_locks.world_write():
+            if member.sect is sect or sect is None:
+                game_state.materialize(member)
+    g.world_locks = stack
+
+@app.teardown_request
+def unlock_world(exc):
+    stack = g.pop('world_locks', None)
+    if stack is not None:
+        stack.close()
+    if not world_saver.background:
+        world_saver.save_pending()  # Synchronous saves wait for the request's locks to be released
+
+# Disciple listings: fields returned when ?fields= is not given
+DISCIPLE_LIST_FIELDS = ['id', 'name', 'age', 'path', 'realm', 'stage', 'sect']
+PLAYER_SECT_DISCIPLE_FIELDS = ['id', 'name', 'age', 'path', 'realm', 'stage', 'combat_power']
+
+# Any of these switches a listing from a plain array to a page object
+LISTING_PARAMS = {'limit', 'cursor', 'sort', 'order', 'fields', 'realm', 'stage', 'path', 'bottleneck', 'sect'}
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def list_disciples(listed, default_fields, sect=None):
+    """
+    Build a disciple listing response
+    
+    Without listing parameters this is the plain array of every listed disciple.
+    Otherwise it returns {'disciples', 'next_cursor', 'total'} for one page:
+    ?realm=, ?stage= (numbers), ?path=, ?bottleneck= and ?sect= (sect ID) filter,
+    ?sort=id|combat_power|qi_ratio|breakthrough_chance|age with ?order=asc|desc
+    orders, ?limit= and ?cursor= page, and ?fields=a,b,c picks the returned fields.
+    
+    Args:
+        listed (list): Disciples in the plain listing
+        default_fields (list): Fields returned when ?fields= is not given
+        sect (Sect, optional): Restrict pages to this sect
+    """
+    args = request.args
+    if not LISTING_PARAMS.intersection(args):
+        return jsonify([project(member, default_fields) for member in listed])
+    
+    fields = args['fields'].split(',') if args.get('fields') else default_fields
+    unknown = [field for field in fields if field not in DISCIPLE_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    
+    filters = {}
+    try:
+        for name in ('realm', 'stage'):
+            if name in args:
+                filters[name] = int(args[name])
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        if 'sect' in args and sect is None:
+            sect_id = int(args['sect'])
+            if sect_id < 0 or sect_id >= len(sects):
+                return jsonify({'error': 'Sect not found'}), 404
+            filters['sect'] = sects[sect_id]
+    except ValueError:
+        return jsonify({'error': 'realm, stage, sect and limit must be integers'}), 400
+    for name in ('path', 'bottleneck'):
+        if name in args:
+            filters[name] = args[name]
+    if sect is not None:
+        filters['sect'] = sect
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    try:
+        page, next_cursor, total = disciple_index.query(
+            filters,
+            sort=args.get('sort', 'id'),
+            descending=args.get('order', 'asc') == 'desc',
+            cursor=args.get('cursor'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'disciples': [project(member, fields) for member in page],
+        'next_cursor': next_cursor,
+        'total': total
+    })
 
 # API Routes
 
 @app.route('/api/player-sect', methods=['GET'])
+@response_cache.cached
 def get_player_sect():
     """Get the player's sect (the main sect being managed)"""
     if player_sect_id < 0 or player_sect_id >= len(sects):
@@ -128,21 +380,13 @@ def get_player_sect():
     })
 
 @app.route('/api/player-sect/disciples', methods=['GET'])
+@response_cache.cached
 def get_player_sect_disciples():
     """Get all disciples in the player's sect"""
     if player_sect_id < 0 or player_sect_id >= len(sects):
         return jsonify({'error': 'Player sect not found'}), 404
     
-    sect = sects[player_sect_id]
-    return jsonify([{
-        'id': members.index(member),
-        'name': member.name,
-        'age': member.age,
-        'path': member.path,
-        'realm': member.get_realm_name(),
-        'stage': member.get_stage_name(),
-        'combat_power': member.get_combat_power()
-    } for member in sect.members])
+    return list_disciples(sects[player_sect_id].members, PLAYER_SECT_DISCIPLE_FIELDS, sect=sects[player_sect_id])
 
 @app.route('/api/player-sect/resources', methods=['GET'])
 def get_player_sect_resources():
@@ -190,7 +434,7 @@ def collect_player_sect_resources():
     sect.spirit_stones += monthly_income
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'initial_stones': initial_stones,
@@ -199,6 +443,7 @@ def collect_player_sect_resources():
     })
 
 @app.route('/api/sects', methods=['GET'])
+@response_cache.cached
 def get_sects():
     """Get all sects"""
     return jsonify([{
@@ -233,7 +478,7 @@ def get_sect(sect_id):
         'territories': sect.territories,
         'formation_strength': sect.formation_strength,
         'disciples': [{
-            'id': members.index(member),
+            'id': member.id,
             'name': member.name
         } for member in sect.members],
         'techniques': sect.techniques,
@@ -243,26 +488,90 @@ def get_sect(sect_id):
         'artifact_blueprints': sect.artifact_blueprints
     })
 
+# Largest leaderboard served by the /api/leaderboards routes
+MAX_LEADERBOARD_SIZE = 1000
+
+def leaderboard_size():
+    """Parse ?k= for the leaderboard routes (None if invalid)"""
+    try:
+        k = int(request.args.get('k', 10))
+    except ValueError:
+        return None
+    return k if 1 <= k <= MAX_LEADERBOARD_SIZE else None
+
+@app.route('/api/leaderboards/disciples', methods=['GET'])
+@response_cache.cached
+def get_disciple_leaderboard():
+    """Rank disciples world-wide (?by=combat_power|qi_ratio|breakthrough_chance|age, ?k=, ?sect=)"""
+    k = leaderboard_size()
+    if k is None:
+        return jsonify({'error': f'k must be between 1 and {MAX_LEADERBOARD_SIZE}'}), 400
+    
+    filters = {}
+    if 'sect' in request.args:
+        sect_id = request.args.get('sect', -1, type=int)
+        if sect_id < 0 or sect_id >= len(sects):
+            return jsonify({'error': 'Sect not found'}), 404
+        filters['sect'] = sects[sect_id]
+    
+    by = request.args.get('by', 'combat_power')
+    try:
+        ranked = top_disciples(disciple_index, by, k, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'by': by,
+        'entries': [{
+            'rank': rank,
+            'id': member.id,
+            'name': member.name,
+            'sect': member.sect.name if member.sect else None,
+            'realm': member.get_realm_name(),
+            'stage': member.get_stage_name(),
+            'value': score
+        } for rank, (member, score) in enumerate(ranked, 1)]
+    })
+
+@app.route('/api/leaderboards/sects', methods=['GET'])
+@response_cache.cached
+def get_sect_leaderboard():
+    """Rank sects (?by=total_power|average_power|disciples|spirit_stones|reputation|influence|tier, ?k=)"""
+    k = leaderboard_size()
+    if k is None:
+        return jsonify({'error': f'k must be between 1 and {MAX_LEADERBOARD_SIZE}'}), 400
+    
+    by = request.args.get('by', 'total_power')
+    try:
+        ranked = sect_leaderboard.top(by, k)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'by': by,
+        'entries': [{
+            'rank': rank,
+            'id': sect_id,
+            'name': sect.name,
+            'tier': sect.tier,
+            'disciples_count': len(sect.members),
+            'value': score
+        } for rank, (sect_id, sect, score) in enumerate(ranked, 1)]
+    })
+
 @app.route('/api/disciples', methods=['GET'])
+@response_cache.cached
 def get_disciples():
-    """Get all disciples"""
-    return jsonify([{
-        'id': i,
-        'name': member.name,
-        'age': member.age,
-        'path': member.path,
-        'realm': member.get_realm_name(),
-        'stage': member.get_stage_name(),
-        'sect': member.sect.name if member.sect else None
-    } for i, member in enumerate(members)])
+    """Get all disciples (paged, filtered and sorted when listing parameters are given)"""
+    return list_disciples(members, DISCIPLE_LIST_FIELDS)
 
 @app.route('/api/disciples/<int:disciple_id>', methods=['GET'])
 def get_disciple(disciple_id):
     """Get details for a specific disciple"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     return jsonify({
         'id': disciple_id,
         'name': member.name,
@@ -287,17 +596,17 @@ def get_disciple(disciple_id):
 @app.route('/api/disciples/<int:disciple_id>/cultivate', methods=['POST'])
 def cultivate(disciple_id):
     """Cultivate for a disciple using the legacy hour-based method"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
     data = request.get_json()
     hours = data.get('hours', 1)
     
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     qi_gained = member.cultivate(hours)
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'qi_gained': qi_gained,
@@ -306,6 +615,25 @@ def cultivate(disciple_id):
         'breakthrough_chance': member.breakthrough_chance
     })
 
+def session_resources(sect):
+    """Sect resources reported after cultivation sessions"""
+    return {
+        'spirit_stones': sect.spirit_stones,
+        'spirit_herbs': sect.spirit_herbs,
+        'dao_crystals': sect.dao_crystals
+    }
+
+def session_stats(member):
+    """Disciple stats reported after a cultivation session"""
+    return {
+        'qi': member.qi,
+        'max_qi': member.max_qi,
+        'breakthrough_chance': member.breakthrough_chance,
+        'physical': member.physical,
+        'spiritual': member.spiritual,
+        'comprehension': member.comprehension
+    }
+
 @app.route('/api/disciples/<int:disciple_id>/cultivate-method', methods=['POST'])
 def cultivate_with_method(disciple_id):
     """Cultivate for a disciple using a specific cultivation method"""
@@ -316,7 +644,7 @@ def cultivate_with_method(disciple_id):
         response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
         
-        if disciple_id < 0 or disciple_id >= len(members):
+        if disciple_id not in member_registry:
             response.status_code = 404
             response.data = json.dumps({'error': 'Disciple not found', 'success': False})
             return response
@@ -329,25 +657,10 @@ def cultivate_with_method(disciple_id):
         
         # Get the player sect
         sect = sects[game_state.sect_id]
-        member = members[disciple_id]
-        
-        # Check if sect has enough resources
-        method_costs = {
-            'qi_circulation': {'spirit_stones': 50},
-            'essence_refinement': {'spirit_stones': 200},
-            'dao_heart_tempering': {'spirit_stones': 400, 'spirit_herbs': 1},
-            'heavenly_tribulation': {'spirit_stones': 800, 'dao_crystals': 1}
-        }
+        member = member_registry.get(disciple_id)
         
         # Get the cost for the selected method
-        cost = method_costs.get(method, {'spirit_stones': 50})
-        
-        # Initialize resources if they don't exist
-        if not hasattr(sect, 'spirit_herbs'):
-            sect.spirit_herbs = 0
-        
-        if not hasattr(sect, 'dao_crystals'):
-            sect.dao_crystals = 0
+        cost = get_session_cost(method)
         
         # Check spirit stones
         if sect.spirit_stones < cost.get('spirit_stones', 0):
@@ -396,30 +709,17 @@ def cultivate_with_method(disciple_id):
         print(f"Member: {member.name}, Sect: {sect.name}")
         
         # Apply cultivation effects
-        results = member.cultivate_with_method(method, sect)
+        results = member.cultivate_with_method(method, sect, rng=game_state.action_rng("cultivate", disciple_id))
         
         # Debug print after calling cultivation method
         print(f"Cultivation results: {results}")
         
-        # Add resource info to results
-        results['resources'] = {
-            'spirit_stones': sect.spirit_stones,
-            'spirit_herbs': getattr(sect, 'spirit_herbs', 0),
-            'dao_crystals': getattr(sect, 'dao_crystals', 0)
-        }
-        
-        # Add disciple current stats to results
-        results['disciple'] = {
-            'qi': member.qi,
-            'max_qi': member.max_qi,
-            'breakthrough_chance': member.breakthrough_chance,
-            'physical': member.physical,
-            'spiritual': member.spiritual,
-            'comprehension': member.comprehension
-        }
+        # Add resource info and the disciple's current stats to results
+        results['resources'] = session_resources(sect)
+        results['disciple'] = session_stats(member)
         
         # Save the updated data
-        data_manager.save_data(sects, members, "example_data.json")
+        world_saver.request_save()
         
         # Return successful response
         response.status_code = 200
@@ -444,19 +744,94 @@ def cultivate_with_method(disciple_id):
         })
         return response
 
+# Most sessions one batch cultivation request may hold
+MAX_CULTIVATION_BATCH = 1000
+
+@app.route('/api/disciples/cultivate-batch', methods=['POST'])
+def cultivate_batch():
+    """
+    Run cultivation sessions for many disciples, paid for by the player sect
+    
+    Takes {"sessions": [{"disciple_id": 1, "method": "qi_circulation"}, ...]};
+    the method defaults to qi_circulation and a disciple may appear more than
+    once. The batch runs whole or not at all: an unknown disciple or method,
+    or a total cost above the sect's resources, rejects every session. The
+    world is saved once for the batch.
+    """
+    data = request.get_json(silent=True) or {}
+    sessions = data.get('sessions')
+    if not isinstance(sessions, list) or not sessions:
+        return jsonify({'success': False, 'error': 'sessions must be a non-empty list'}), 400
+    if len(sessions) > MAX_CULTIVATION_BATCH:
+        return jsonify({'success': False, 'error': f'At most {MAX_CULTIVATION_BATCH} sessions per batch'}), 400
+    
+    # Validate every session before anything changes
+    planned = []
+    errors = []
+    for index, session in enumerate(sessions):
+        if not isinstance(session, dict):
+            errors.append({'index': index, 'error': 'Session must be an object'})
+            continue
+        disciple_id = session.get('disciple_id')
+        method = session.get('method', 'qi_circulation')
+        if type(disciple_id) is not int or disciple_id not in member_registry:
+            errors.append({'index': index, 'disciple_id': disciple_id, 'error': 'Disciple not found'})
+        elif not isinstance(method, str) or method not in SESSION_METHODS:
+            errors.append({'index': index, 'disciple_id': disciple_id, 'error': f"Unknown cultivation method '{method}'"})
+        else:
+            planned.append((member_registry.get(disciple_id), method))
+    if errors:
+        return jsonify({'success': False, 'error': 'Invalid sessions', 'errors': errors}), 400
+    
+    # Charge the whole batch at once
+    sect = sects[game_state.sect_id]
+    cost = {}
+    for _, method in planned:
+        for resource, amount in get_session_cost(method).items():
+            cost[resource] = cost.get(resource, 0) + amount
+    shortfalls = {
+        resource: {'required': amount, 'available': getattr(sect, resource)}
+        for resource, amount in cost.items() if getattr(sect, resource) < amount
+    }
+    if shortfalls:
+        return jsonify({'success': False, 'error': 'Not enough resources', 'shortfalls': shortfalls}), 400
+    for resource, amount in cost.items():
+        setattr(sect, resource, getattr(sect, resource) - amount)
+    
+    results = []
+    for member, method in planned:
+        result = member.cultivate_with_method(method, sect, rng=game_state.action_rng("cultivate", member.id))
+        result['disciple_id'] = member.id
+        result['disciple'] = session_stats(member)
+        results.append(result)
+    
+    # Recount each disciple's combat power once for the whole batch
+    for member in {member.id: member for member, _ in planned}.values():
+        if member.sect is not None:
+            member.sect.power_stats.update(member)
+    
+    world_saver.request_save()
+    
+    return jsonify({
+        'success': True,
+        'results': results,
+        'cost': cost,
+        'resources': session_resources(sect)
+    })
+
 @app.route('/api/disciples/<int:disciple_id>/force-peak', methods=['POST'])
 def force_peak(disciple_id):
     """Force a disciple to Peak stage for testing realm advancement"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     member.realm_stage = 4  # Set to Peak stage
     member.qi = member.max_qi  # Fill qi to maximum
     member.breakthrough_chance = 100  # Ensure breakthrough success
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'message': f'Disciple {member.name} has been forced to Peak stage',
@@ -468,10 +843,10 @@ def force_peak(disciple_id):
 @app.route('/api/disciples/<int:disciple_id>/clear-bottleneck', methods=['POST'])
 def clear_bottleneck(disciple_id):
     """Clear any bottlenecks for a disciple"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     
     # Print current bottleneck status
     print(f"\nCLEARING BOTTLENECK FOR {member.name}:")
@@ -484,7 +859,7 @@ def clear_bottleneck(disciple_id):
     member.insights_required = 0
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'message': f'Bottleneck cleared for {member.name}',
@@ -495,10 +870,10 @@ def clear_bottleneck(disciple_id):
 @app.route('/api/disciples/<int:disciple_id>/breakthrough', methods=['POST'])
 def breakthrough(disciple_id):
     """Attempt breakthrough for a disciple"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     
     # Print debug info before breakthrough
     print(f"\nBREAKTHROUGH ATTEMPT FOR {member.name}:")
@@ -506,25 +881,25 @@ def breakthrough(disciple_id):
     print(f"Qi: {member.qi}/{member.max_qi}, Breakthrough chance: {member.breakthrough_chance}")
     
     # Attempt breakthrough
-    results = member.attempt_breakthrough()
+    results = member.attempt_breakthrough(game_state.action_rng("breakthrough", disciple_id))
     
     # Print debug info after breakthrough
     print(f"After: Realm {member.realm} ({member.get_realm_name()}), Stage {member.realm_stage} ({member.get_stage_name()})")
     print(f"Success: {results['success']}, Message: {results['message']}\n")
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify(results)
 
 @app.route('/api/disciples/<int:disciple_id>/meditate', methods=['POST'])
 def meditate_for_insight(disciple_id):
     """Meditate to gain insights for overcoming minor bottlenecks"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    member = members[disciple_id]
-    results = member.meditate_for_insight()
+    member = member_registry.get(disciple_id)
+    results = member.meditate_for_insight(game_state.action_rng("meditate", disciple_id))
     
     # Add disciple current stats to results
     results['disciple'] = {
@@ -535,7 +910,7 @@ def meditate_for_insight(disciple_id):
     }
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify(results)
 
@@ -567,18 +942,15 @@ def add_treasure():
     # Get the player sect
     sect = sects[game_state.sect_id]
     
-    # Initialize treasures if needed
-    if not hasattr(sect, 'treasures'):
-        sect.treasures = {}
-    
     # Add the treasure
     if treasure_type not in sect.treasures:
         sect.treasures[treasure_type] = 0
     
     sect.treasures[treasure_type] += quantity
+    sect.mark_dirty()
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'success': True,
@@ -589,7 +961,7 @@ def add_treasure():
 @app.route('/api/disciples/<int:disciple_id>/use-treasure', methods=['POST'])
 def use_treasure(disciple_id):
     """Use a treasure to overcome a major bottleneck"""
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
     data = request.get_json()
@@ -599,12 +971,9 @@ def use_treasure(disciple_id):
     
     # Get the player sect
     sect = sects[game_state.sect_id]
-    member = members[disciple_id]
+    member = member_registry.get(disciple_id)
     
     # Check if sect has the treasure
-    if not hasattr(sect, 'treasures'):
-        sect.treasures = {}
-    
     if treasure_type not in sect.treasures or sect.treasures.get(treasure_type, 0) <= 0:
         return jsonify({
             'success': False,
@@ -617,6 +986,7 @@ def use_treasure(disciple_id):
     # If successful, consume the treasure
     if results['success']:
         sect.treasures[treasure_type] -= 1
+        sect.mark_dirty()
     
     # Add disciple current stats to results
     results['disciple'] = {
@@ -628,7 +998,7 @@ def use_treasure(disciple_id):
     results['treasures'] = sect.treasures
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify(results)
 
@@ -636,10 +1006,10 @@ def use_treasure(disciple_id):
 def update_disciple_attributes(disciple_id):
     """Update attributes for a specific disciple"""
     # Find the disciple
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    disciple = members[disciple_id]
+    disciple = member_registry.get(disciple_id)
     data = request.get_json()
     
     # Update attributes with validation
@@ -664,7 +1034,7 @@ def update_disciple_attributes(disciple_id):
         disciple.breakthrough_chance = max(0, min(100, data['breakthrough_chance']))
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     # Return the updated disciple
     return jsonify(disciple.to_dict())
@@ -673,10 +1043,10 @@ def update_disciple_attributes(disciple_id):
 def create_bottleneck(disciple_id):
     """Create a bottleneck for a specific disciple (for testing)"""
     # Find the disciple
-    if disciple_id < 0 or disciple_id >= len(members):
+    if disciple_id not in member_registry:
         return jsonify({'error': 'Disciple not found'}), 404
     
-    disciple = members[disciple_id]
+    disciple = member_registry.get(disciple_id)
     data = request.get_json()
     
     # Get bottleneck type from request (default to minor)
@@ -691,11 +1061,11 @@ def create_bottleneck(disciple_id):
     
     # For minor bottlenecks, set random insights required
     if bottleneck_type == 'minor':
-        disciple.insights_required = random.randint(3, 7)
+        disciple.insights_required = game_state.action_rng("create-bottleneck", disciple_id).randint(3, 7)
         disciple.bottleneck_insights = 0
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     # Return the updated disciple
     return jsonify({
@@ -717,7 +1087,7 @@ def collect_resources(sect_id):
     sect.spirit_stones += monthly_income
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     return jsonify({
         'initial_stones': initial_stones,
@@ -731,6 +1101,7 @@ def get_recruitment_candidates():
     """Generate random disciples for recruitment"""
     # Generate 3 random disciples as recruitment candidates
     candidates = []
+    rng = game_state.action_rng("recruitment-candidates")
     
     # Define possible paths and their attributes tendencies
     paths = {
@@ -755,23 +1126,23 @@ def get_recruitment_candidates():
         candidate_id = str(uuid.uuid4())
         
         # Generate a random name
-        name = f"{random.choice(last_names)} {random.choice(first_names)}"
+        name = f"{rng.choice(last_names)} {rng.choice(first_names)}"
         
         # Generate a random age (16-25 for new disciples)
-        age = random.randint(16, 25)
+        age = rng.randint(16, 25)
         
         # Select a random path
-        path = random.choice(list(paths.keys()))
+        path = rng.choice(list(paths.keys()))
         path_attributes = paths[path]
         
         # Generate attributes based on the path's tendencies
-        physical = random.randint(path_attributes["physical"][0], path_attributes["physical"][1])
-        spiritual = random.randint(path_attributes["spiritual"][0], path_attributes["spiritual"][1])
-        dao_comprehension = random.randint(path_attributes["comprehension"][0], path_attributes["comprehension"][1])
+        physical = rng.randint(path_attributes["physical"][0], path_attributes["physical"][1])
+        spiritual = rng.randint(path_attributes["spiritual"][0], path_attributes["spiritual"][1])
+        dao_comprehension = rng.randint(path_attributes["comprehension"][0], path_attributes["comprehension"][1])
         
         # All new recruits start at Mortal realm
         realm = 0  # Mortal
-        realm_stage = random.randint(0, 3)  # Random stage within Mortal realm
+        realm_stage = rng.randint(0, 3)  # Random stage within Mortal realm
         
         # Calculate a basic combat power
         combat_power = int((physical + spiritual + dao_comprehension) / 3)
@@ -821,32 +1192,35 @@ def select_recruit():
     # Create a new disciple with random but reasonable stats
     # In a real implementation, we would retrieve the actual candidate data
     # For now, we'll generate a new disciple with random stats
+    rng = game_state.action_rng("recruitment")
     
     # Chinese-inspired first and last names
     first_names = ["Wei", "Li", "Zhang", "Liu", "Chen", "Yang", "Huang", "Zhao", "Wu", "Zhou"]
     last_names = ["Xiao", "Ming", "Feng", "Yu", "Hui", "Jie", "Ling", "Cheng", "Yun", "Hao"]
     
-    name = f"{random.choice(last_names)} {random.choice(first_names)}"
-    age = random.randint(16, 25)
-    path = random.choice(["Sword", "Fire", "Water", "Earth", "Wind", "Lightning", "Alchemy", "Formation"])
-    physical = random.randint(50, 90)
-    spiritual = random.randint(50, 90)
-    comprehension = random.randint(50, 90)
+    name = f"{rng.choice(last_names)} {rng.choice(first_names)}"
+    age = rng.randint(16, 25)
+    path = rng.choice(["Sword", "Fire", "Water", "Earth", "Wind", "Lightning", "Alchemy", "Formation"])
+    physical = rng.randint(50, 90)
+    spiritual = rng.randint(50, 90)
+    comprehension = rng.randint(50, 90)
     
     new_disciple = Member(name, age, path, physical, spiritual, comprehension)
     
     # Add the new disciple to the sect and global members list
     sect.add_member(new_disciple)
     members.append(new_disciple)
+    member_registry.add(new_disciple)
+    disciple_index.add(new_disciple)
     
     # Save the updated data
-    data_manager.save_data(sects, members, "example_data.json")
+    world_saver.request_save()
     
     # Return the new disciple's information
     return jsonify({
         'success': True,
         'disciple': {
-            'id': len(members) - 1,  # Index of the new disciple
+            'id': new_disciple.id,
             'name': new_disciple.name,
             'age': new_disciple.age,
             'path': new_disciple.path,
@@ -875,13 +1249,13 @@ def assign_cultivation_method(disciple_id):
             }), 400
             
         # Find the disciple
-        if disciple_id < 0 or disciple_id >= len(members):
+        if disciple_id not in member_registry:
             return jsonify({
                 "success": False,
                 "message": "Invalid disciple ID"
             }), 400
             
-        disciple = members[disciple_id]
+        disciple = member_registry.get(disciple_id)
         
         # Get available methods to validate the requested method
         try:
@@ -950,13 +1324,13 @@ def get_cultivation_methods(disciple_id):
     """Get available cultivation methods for a disciple with effectiveness ratings"""
     try:
         # Find the disciple
-        if disciple_id < 0 or disciple_id >= len(members):
+        if disciple_id not in member_registry:
             return jsonify({
                 "success": False,
                 "message": "Invalid disciple ID"
             }), 400
             
-        disciple = members[disciple_id]
+        disciple = member_registry.get(disciple_id)
         
         # Get available methods with effectiveness ratings
         try:
@@ -976,8 +1350,8 @@ def get_cultivation_methods(disciple_id):
             }
         
         # Get currently assigned method if any
-        assigned_method = getattr(disciple, 'assigned_cultivation_method', None)
-        resource_allocation = getattr(disciple, 'allocated_resources', 0)
+        assigned_method = disciple.assigned_cultivation_method
+        resource_allocation = disciple.allocated_resources
         
         return jsonify({
             "success": True,
@@ -1001,6 +1375,7 @@ def get_cultivation_methods(disciple_id):
 
 # Turn-based system endpoints
 @app.route('/api/game-state', methods=['GET'])
+@response_cache.cached
 def get_game_state():
     """Get the current game state"""
     return jsonify({
@@ -1010,28 +1385,26 @@ def get_game_state():
         'spirit_stones': sects[game_state.sect_id].spirit_stones if game_state.sect_id < len(sects) else 0
     })
 
+# Longest fast-forward accepted by /api/end-turn?turns=N (100 years)
+MAX_FAST_FORWARD_TURNS = 1200
+
 @app.route('/api/end-turn', methods=['POST'])
 def end_turn():
-    """End the current turn and process all turn-end events"""
+    """End the current turn and process all turn-end events (?turns=N fast-forwards N turns)"""
     try:
+        try:
+            turns = int(request.args.get('turns', 1))
+        except ValueError:
+            turns = 0
+        if turns < 1 or turns > MAX_FAST_FORWARD_TURNS:
+            return jsonify({'error': f'turns must be between 1 and {MAX_FAST_FORWARD_TURNS}'}), 400
+        if turns > 1:
+            return fast_forward_turns(turns)
+        
         # Get the player sect for reference
         player_sect = sects[game_state.sect_id]
         
-        # Store initial state for comparison
-        initial_state = {
-            'spirit_stones': player_sect.spirit_stones,
-            'disciples': [{
-                'id': i,
-                'name': member.name,
-                'qi': member.qi,
-                'max_qi': member.max_qi,
-                'breakthrough_chance': member.breakthrough_chance,
-                'realm': member.realm,
-                'realm_name': member.get_realm_name(),
-                'realm_stage': member.realm_stage,
-                'stage_name': member.get_stage_name()
-            } for i, member in enumerate(members) if member.sect and member.sect.name == player_sect.name]
-        }
+        initial_stones = player_sect.spirit_stones
         
         # Process turn end
         results = game_state.process_turn_end(sects, members)
@@ -1039,28 +1412,28 @@ def end_turn():
         # Advance to next turn
         new_turn = game_state.advance_turn()
         
-        # Compare with new state to identify changes
+        # The turn engine reports only the disciples it changed, as [old, new] pairs
         changes = {
-            'spirit_stones': player_sect.spirit_stones - initial_state['spirit_stones'],
+            'spirit_stones': player_sect.spirit_stones - initial_stones,
             'disciples': []
         }
-        
-        # Track disciple changes
-        for initial_disciple in initial_state['disciples']:
-            disciple_id = initial_disciple['id']
-            if disciple_id < len(members):
-                current_disciple = members[disciple_id]
-                disciple_changes = {
-                    'id': disciple_id,
-                    'name': current_disciple.name,
-                    'qi_change': current_disciple.qi - initial_disciple['qi'],
-                    'breakthrough_chance_change': current_disciple.breakthrough_chance - initial_disciple['breakthrough_chance'],
-                    'realm_changed': current_disciple.realm != initial_disciple['realm'] or current_disciple.realm_stage != initial_disciple['realm_stage'],
-                    'new_realm_name': current_disciple.get_realm_name(),
-                    'new_stage_name': current_disciple.get_stage_name()
-                }
-                if any(value != 0 for key, value in disciple_changes.items() if key not in ['id', 'name', 'new_realm_name', 'new_stage_name', 'realm_changed']):
-                    changes['disciples'].append(disciple_changes)
+        for disciple_id, delta in results.pop('disciple_changes', {}).items():
+            if 'qi' not in delta and 'breakthrough_chance' not in delta:
+                continue
+            current_disciple = member_registry.get(disciple_id)
+            if current_disciple is None:
+                continue
+            qi = delta.get('qi', [0, 0])
+            breakthrough_chance = delta.get('breakthrough_chance', [0, 0])
+            changes['disciples'].append({
+                'id': disciple_id,
+                'name': delta['name'],
+                'qi_change': qi[1] - qi[0],
+                'breakthrough_chance_change': breakthrough_chance[1] - breakthrough_chance[0],
+                'realm_changed': 'realm' in delta or 'realm_stage' in delta,
+                'new_realm_name': current_disciple.get_realm_name(),
+                'new_stage_name': current_disciple.get_stage_name()
+            })
         
         # Add changes to results
         results['changes'] = changes
@@ -1073,7 +1446,7 @@ def end_turn():
         }
         
         # Save the updated data
-        data_manager.save_data(sects, members, "example_data.json")
+        world_saver.flush()
         
         # Return the results
         return jsonify({
@@ -1094,7 +1467,31 @@ def end_turn():
             'details': str(e)
         }), 500
 
+def fast_forward_turns(turns):
+    """Run several turns in memory, save once and return aggregated results"""
+    sample_every = request.args.get('sample', type=int)
+    
+    results = game_state.advance_turns(sects, members, turns, sample_every=sample_every)
+    if "error" in results and results["turns"] == 0:
+        return jsonify({'error': results["error"]}), 400
+    
+    results['game_state'] = {
+        'current_turn': game_state.current_turn,
+        'game_date': game_state.get_game_date_string(),
+        'sect_spirit_stones': sects[game_state.sect_id].spirit_stones
+    }
+    
+    # One save for the whole batch
+    world_saver.flush()
+    
+    return jsonify({
+        'new_turn': game_state.current_turn,
+        'game_date': game_state.get_game_date_string(),
+        'results': results
+    })
+
 @app.route('/api/events', methods=['GET'])
+@response_cache.cached
 def get_events():
     """Get current events for the player's sect"""
     try:
@@ -1125,38 +1522,37 @@ def get_events():
             })
         
         # 2. Disciple-related events
-        for i, member in enumerate(members):
-            if member.sect and member.sect.name == player_sect.name:
-                # Check for disciples close to breakthrough
-                if member.qi >= member.max_qi * 0.9 and member.breakthrough_chance >= 70:
-                    active_events.append({
-                        'id': 100 + i,
-                        'title': f'{member.name} Approaching Breakthrough',
-                        'type': 'Opportunity',
-                        'description': f'{member.name} is close to breaking through to the next stage. Consider providing resources to assist.',
-                        'timeRemaining': '5 days',
-                        'location': 'Cultivation Chamber',
-                        'urgency': 'Medium',
-                        'requiresDecision': False,
-                        'canAssignDisciples': False
-                    })
-                
-                # Check for disciples with bottlenecks
-                if hasattr(member, 'bottleneck') and member.bottleneck != 'none':
-                    active_events.append({
-                        'id': 200 + i,
-                        'title': f'{member.name} Cultivation Bottleneck',
-                        'type': 'Challenge',
-                        'description': f'{member.name} has encountered a {member.bottleneck} bottleneck in their cultivation.',
-                        'timeRemaining': '7 days',
-                        'location': 'Meditation Chamber',
-                        'urgency': 'High',
-                        'requiresDecision': True,
-                        'canAssignDisciples': False
-                    })
-        
+        for member in player_sect.members:
+            # Check for disciples close to breakthrough
+            if member.qi >= member.max_qi * 0.9 and member.breakthrough_chance >= 70:
+                active_events.append({
+                    'id': 100 + member.id,
+                    'title': f'{member.name} Approaching Breakthrough',
+                    'type': 'Opportunity',
+                    'description': f'{member.name} is close to breaking through to the next stage. Consider providing resources to assist.',
+                    'timeRemaining': '5 days',
+                    'location': 'Cultivation Chamber',
+                    'urgency': 'Medium',
+                    'requiresDecision': False,
+                    'canAssignDisciples': False
+                })
+            
+            # Check for disciples with bottlenecks
+            if member.bottleneck != 'none':
+                active_events.append({
+                    'id': 200 + member.id,
+                    'title': f'{member.name} Cultivation Bottleneck',
+                    'type': 'Challenge',
+                    'description': f'{member.name} has encountered a {member.bottleneck} bottleneck in their cultivation.',
+                    'timeRemaining': '7 days',
+                    'location': 'Meditation Chamber',
+                    'urgency': 'High',
+                    'requiresDecision': True,
+                    'canAssignDisciples': False
+                })
+    
         # 3. Sect development opportunities
-        if not hasattr(player_sect, 'cultivation_chambers') or player_sect.cultivation_chambers < 3:
+        if player_sect.cultivation_chambers < 3:
             upcoming_events.append({
                 'id': 300,
                 'title': 'Cultivation Chamber Construction',
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Background persistence for the Sectomie system
+
+Mutating requests used to save the world before responding, so every
+response waited for the disk and a burst of requests meant a burst of
+writes. BackgroundSaver moves that work to a writer thread: requests only
+note that the world needs saving, and the thread performs one save for
+everything that accumulated, either once the oldest unsaved change is
+`max_latency` seconds old or once `max_pending` changes are waiting.
+Callers that need the world on disk right away (turn end, shutdown) call
+flush().
+"""
+
+import threading
+import time
+
+
+class BackgroundSaver:
+    """
+    Coalesces save requests into periodic saves on a writer thread
+    """
+
+    def __init__(self, save, max_latency=1.0, max_pending=500, guard=None, background=True):
+        """
+        Initialize the saver (the writer thread starts on the first request)
+
+        Args:
+            save (callable): Saves the whole world, e.g. DataManager.save_data
+            max_latency (float): Seconds an unsaved change may wait
+            max_pending (int): Save requests that trigger a save without waiting
+            guard (callable, optional): Returns a context manager (e.g. a lock)
+                                        held while the writer thread saves
+            background (bool): False leaves saving to save_pending, called
+                               after every request instead of by a thread
+        """
+        self.save = save
+        self.max_latency = max_latency
+        self.max_pending = max_pending
+        self.guard = guard
+        self.background = background
+        self.pending = 0  # Save requests since the last save
+        self.last_error = None
+        self.stats = {"requests": 0, "saves": 0}
+        self._first_pending = None  # time.monotonic() of the oldest unsaved request
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()  # One save at a time
+        self._thread = None
+        self._closed = False
+
+    def request_save(self):
+        """Note that the world changed; it is saved within max_latency seconds"""
+        with self._condition:
+            self.stats["requests"] += 1
+            if self._closed:
+                run_now = True
+            else:
+                run_now = False
+                if not self.pending:
+                    self._first_pending = time.monotonic()
+                self.pending += 1
+                if not self.background:
+                    return
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sectomie-saver", daemon=True)
+                    self._thread.start()
+                if self.pending == 1 or self.pending >= self.max_pending:
+                    self._condition.notify()
+        if run_now:
+            self._save_now()
+
+    def flush(self):
+        """
+        Save everything now in the calling thread
+
+        The caller must keep the world from changing during the save (e.g.
+        hold the world lock), since flush() does not take the guard.
+        """
+        self._save_now()
+
+    def save_pending(self):
+        """
+        Save anything pending now in the calling thread, holding the guard
+
+        Without a writer thread this is called after every request, once
+        the request's own locks are released. A failed save stays pending
+        for the next call.
+        """
+        if not self.pending:
+            return
+        try:
+            self._guarded_save()
+        except Exception:
+            pass  # Already reported by _save_now
+
+    def close(self):
+        """Stop the writer thread and save anything still pending"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        if self.pending:
+            self._save_now()
+
+    def _save_now(self):
+        with self._save_lock:
+            with self._condition:
+                self.pending = 0
+                self._first_pending = None
+            try:
+                self.save()
+            except Exception as e:
+                # Keep the change pending so the next save retries it
+                self.last_error = e
+                print(f"Error saving world: {str(e)}")
+                with self._condition:
+                    if not self.pending:
+                        self._first_pending = time.monotonic()
+                    self.pending += 1
+                raise
+            self.stats["saves"] += 1
+
+    def _guarded_save(self):
+        if self.guard is None:
+            self._save_now()
+            return
+        with self.guard():
+            # A flush may have saved everything while we waited for the guard
+            if self.pending:
+                self._save_now()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self.pending >= self.max_pending:
+                        break
+                    if self.pending:
+                        remaining = self._first_pending + self.max_latency - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            try:
+                self._guarded_save()
+            except Exception:
+                time.sleep(self.max_latency)  # Back off before retrying a failing save
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Sectomie backend
+
+Usage:
+    python benchmarks.py methods [--disciples N]
+    python benchmarks.py memory [--disciples N]
+    python benchmarks.py catchup [--disciples N]
+    python benchmarks.py persistence [--disciples N]
+    python benchmarks.py throughput [--url URL] [--requests N] [--concurrency C] [--write-ratio R]
+    python benchmarks.py stress [--requests N] [--concurrency C]
+
+throughput loads an already running server, e.g. `python app.py` (dev server)
+or `gunicorn -c gunicorn.conf.py wsgi:application`, and reports requests per
+second for cached reads, ETag revalidation and (with --write-ratio) a mix
+with POST /api/player-sect/collect-resources, which changes the saved world.
+
+stress runs the app in-process on a generated world in a scratch directory,
+hammers it with concurrent recruit, cultivate, breakthrough, read and end-turn requests,
+then checks that the world, its indexes and the saved file still agree.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from change_tracker import change_tracker
+from member import Member
+from member_table import MemberTable
+from cultivation_methods import MONTHLY_METHODS
+from data_manager import DataManager
+from lazy_cultivation import catch_up
+from sect import Sect
+from turn_engine import new_turn_results, process_sect_cultivation
+
+
+def _legacy_monthly_method_table():
+    """The per-call method table calculate_monthly_cultivation used to build"""
+    return {
+        "qi_circulation": {
+            "qi_multiplier": 1.0, "breakthrough_increase": 1.0, "attribute_chance": 0.05,
+            "attribute": "physical", "attribute_increase": 1, "deviation_chance": 0.01,
+            "description": "A balanced method focusing on steady qi accumulation"
+        },
+        "essence_refinement": {
+            "qi_multiplier": 1.5, "breakthrough_increase": 1.2, "attribute_chance": 0.08,
+            "attribute": "spiritual", "attribute_increase": 1, "deviation_chance": 0.03,
+            "description": "Focuses on refining spiritual essence, increasing qi gain but with higher deviation risk"
+        },
+        "dao_heart_tempering": {
+            "qi_multiplier": 0.8, "breakthrough_increase": 2.0, "attribute_chance": 0.15,
+            "attribute": "comprehension", "attribute_increase": 1, "deviation_chance": 0.02,
+            "description": "Focuses on understanding the Dao, improving breakthrough chance and comprehension at the cost of slower qi accumulation"
+        },
+        "foundation_building": {
+            "qi_multiplier": 0.7, "breakthrough_increase": 1.5, "attribute_chance": 0.1,
+            "attribute": "all", "attribute_increase": 0.5, "deviation_chance": 0.005,
+            "description": "A slow but safe method that builds a solid foundation and reduces deviation chance"
+        },
+        "heavenly_tribulation": {
+            "qi_multiplier": 2.0, "breakthrough_increase": 3.0, "attribute_chance": 0.2,
+            "attribute": "random", "attribute_increase": 2, "deviation_chance": 0.15,
+            "description": "A dangerous but powerful method that greatly accelerates cultivation at the risk of severe deviation"
+        }
+    }
+
+
+def _make_disciples(count, seed=0):
+    rng = random.Random(seed)
+    methods = list(MONTHLY_METHODS)
+    disciples = []
+    for i in range(count):
+        member = Member(f"Disciple {i}", 20, "Sword", rng.randint(40, 90), rng.randint(40, 90), rng.randint(40, 90))
+        member.assigned_cultivation_method = methods[i % len(methods)]
+        disciples.append(member)
+    return disciples
+
+
+def bench_methods(disciples_count):
+    """Compare per-call method table allocations and monthly cultivation time"""
+    print(f"Cultivation method table ({disciples_count} disciples, one turn)")
+
+    # Bytes allocated by a single method lookup
+    tracemalloc.start()
+    table = _legacy_monthly_method_table()
+    legacy_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del table
+
+    tracemalloc.start()
+    effects = MONTHLY_METHODS["qi_circulation"]
+    registry_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del effects
+
+    print(f"  legacy literal table : {legacy_bytes:>10} bytes allocated per call, "
+          f"{legacy_bytes * disciples_count / 1024 / 1024:.1f} MiB per turn")
+    print(f"  compiled registry    : {registry_bytes:>10} bytes allocated per call")
+
+    # Lookup cost on its own
+    methods = [m.assigned_cultivation_method for m in _make_disciples(disciples_count)]
+    start = time.perf_counter()
+    for method in methods:
+        _legacy_monthly_method_table()[method]
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for method in methods:
+        MONTHLY_METHODS[method]
+    registry_time = time.perf_counter() - start
+    print(f"  lookup time          : legacy {legacy_time * 1000:.1f} ms, registry {registry_time * 1000:.1f} ms")
+
+    # End-to-end monthly cultivation with the registry
+    disciples = _make_disciples(disciples_count)
+    start = time.perf_counter()
+    for member in disciples:
+        member.calculate_monthly_cultivation(member.assigned_cultivation_method)
+    print(f"  calculate_monthly_cultivation: {(time.perf_counter() - start) * 1000:.1f} ms total")
+
+
+class _DictMember:
+    """Stand-in for the pre-__slots__ Member layout: the same fields in a per-instance __dict__"""
+
+
+def _to_dict_member(member):
+    legacy = _DictMember()
+    for field in Member.__slots__:
+        legacy.__dict__[field] = getattr(member, field)
+    legacy.qi = float(member.qi)
+    legacy.breakthrough_chance = float(member.breakthrough_chance)
+    return legacy
+
+
+def _traced_bytes(build):
+    """Bytes still allocated after build() returns, with the result kept alive"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def bench_memory(disciples_count):
+    """Compare the per-disciple footprint of the dict, __slots__ and columnar layouts"""
+    print(f"Disciple memory footprint ({disciples_count} disciples)")
+    template = _make_disciples(disciples_count)
+
+    def build_dict_members():
+        return [_to_dict_member(member) for member in template]
+
+    def build_slot_members():
+        members = []
+        for source in template:
+            member = Member(source.name, source.age, source.path, source.physical, source.spiritual, source.comprehension, member_id=source.id)
+            member.techniques = source.techniques
+            member.bottleneck_treasures = source.bottleneck_treasures
+            member.qi = float(source.qi)
+            member.breakthrough_chance = float(source.breakthrough_chance)
+            members.append(member)
+        return members
+
+    def build_table():
+        return MemberTable(template)
+
+    # Strings and lists are shared with the template in every layout, so the
+    # comparison covers per-disciple object overhead and numeric values
+    layouts = [
+        ("__dict__ members (before)", build_dict_members),
+        ("__slots__ members", build_slot_members),
+        ("MemberTable + views", build_table)
+    ]
+    baseline = None
+    change_tracker.enabled = False  # Keep the dirty set out of the measurement
+    for label, build in layouts:
+        size = _traced_bytes(build)
+        per_disciple = size / disciples_count
+        baseline = baseline or per_disciple
+        print(f"  {label:<26}: {per_disciple:>7.1f} bytes/disciple, "
+              f"{size / 1024 / 1024:>7.1f} MiB total ({per_disciple / baseline:.0%} of before)")
+    change_tracker.enabled = True
+
+
+def bench_catchup(disciples_count, months=120):
+    """Compare month-by-month cultivation of idle disciples with closed-form catch-up"""
+    print(f"Idle disciple catch-up ({disciples_count} disciples, {months} months)")
+    change_tracker.enabled = False
+
+    def summary(sect):
+        count = len(sect.members)
+        return (sum(m.qi for m in sect.members) / count,
+                sum(m.realm * 4 + m.realm_stage for m in sect.members) / count,
+                sum(m.comprehension for m in sect.members) / count)
+
+    timings = []
+    for label in ("monthly", "catch-up"):
+        sect = Sect("Idle Sect", "Benchmark", 3)
+        for member in _make_disciples(disciples_count):
+            sect.add_member(member)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        if label == "monthly":
+            for _ in range(months):
+                process_sect_cultivation(sect, new_turn_results(), rng)
+        else:
+            for member in sect.members:
+                catch_up(member, months, rng)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        qi, level, comprehension = summary(sect)
+        print(f"  {label:<9}: {elapsed:>7.2f} s | mean qi {qi:>9.1f}, realm level {level:.2f}, comprehension {comprehension:.2f}")
+    print(f"  speedup  : {timings[0] / timings[1]:.1f}x (per end-turn cost for idle disciples drops to zero)")
+    change_tracker.enabled = True
+
+
+def _make_world(disciples_count, sects_count=10):
+    """A saved-world sized set of sects with the disciples spread across them"""
+    disciples = _make_disciples(disciples_count)
+    sects = [Sect(f"Benchmark Sect {i}", "Sword Dao", 3) for i in range(sects_count)]
+    for i, disciple in enumerate(disciples):
+        sects[i % sects_count].add_member(disciple)
+    return sects, disciples
+
+
+def bench_persistence(disciples_count):
+    """Compare file size, time and peak memory of saving and loading each save format"""
+    print(f"World save/load ({disciples_count} disciples)")
+    change_tracker.enabled = False
+    sects, members = _make_world(disciples_count)
+    workdir = tempfile.mkdtemp(prefix="sectomie-persistence-")
+    try:
+        for save_format in DataManager.SAVE_FORMATS:
+            filename = os.path.join(workdir, f"world.{save_format}")
+            manager = DataManager(save_format=save_format)
+
+            # Timed untraced; tracemalloc slows allocation-heavy code several times over
+            start = time.perf_counter()
+            manager.save_data(sects, members, filename)
+            save_time = time.perf_counter() - start
+            start = time.perf_counter()
+            manager.load_data(filename)
+            load_time = time.perf_counter() - start
+
+            tracemalloc.start()
+            manager.save_data(sects, members, filename)
+            save_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tracemalloc.start()
+            loaded = manager.load_data(filename)
+            load_size, load_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del loaded
+
+            print(f"  {save_format:<7}: {os.path.getsize(filename) / 1024 / 1024:>7.1f} MiB | "
+                  f"save {save_time:>6.2f} s, peak {save_peak / 1024 / 1024:>7.1f} MiB | "
+                  f"load {load_time:>6.2f} s, peak {load_peak / 1024 / 1024:>7.1f} MiB "
+                  f"({load_peak / load_size:.1f}x the loaded world)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        change_tracker.enabled = True
+
+
+# Read endpoints the frontend dashboards poll
+THROUGHPUT_READS = [
+    "/api/game-state",
+    "/api/player-sect",
+    "/api/player-sect/disciples",
+    "/api/sects",
+    "/api/events",
+    "/api/disciples?limit=50&sort=combat_power&order=desc"
+]
+
+
+def _timed_request(url, method="GET", headers=None):
+    request = urllib.request.Request(url, method=method, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status, etag = response.status, response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        status, etag = e.code, None
+    return time.perf_counter() - start, status, etag
+
+
+def bench_throughput(url, requests_count, concurrency, write_ratio=0.0):
+    """Measure requests per second and latency against a running server"""
+    print(f"HTTP throughput against {url} ({requests_count} requests per phase, {concurrency} clients)")
+    etags = {path: _timed_request(url + path)[2] for path in THROUGHPUT_READS}
+
+    phases = [
+        ("cached reads", lambda i: (THROUGHPUT_READS[i % len(THROUGHPUT_READS)], "GET", None)),
+        ("revalidation", lambda i: (THROUGHPUT_READS[i % len(THROUGHPUT_READS)], "GET",
+                                    {"If-None-Match": etags[THROUGHPUT_READS[i % len(THROUGHPUT_READS)]] or ""}))
+    ]
+    if write_ratio > 0:
+        every = max(1, round(1 / write_ratio))
+        phases.append(("mixed", lambda i: ("/api/player-sect/collect-resources", "POST", None) if i % every == 0
+                       else (THROUGHPUT_READS[i % len(THROUGHPUT_READS)], "GET", None)))
+
+    for label, make_request in phases:
+        def run(i):
+            path, method, headers = make_request(i)
+            return _timed_request(url + path, method, headers)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run, range(requests_count)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _, _ in results)
+        errors = sum(1 for _, status, _ in results if status >= 400)
+        print(f"  {label:<13}: {requests_count / elapsed:>8.0f} req/s | p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms | {errors} errors")
+
+
+STRESS_READS = ["/api/sects", "/api/disciples", "/api/player-sect", "/api/leaderboards/sects", "/api/game-state"]
+
+
+def _check_world(app_module):
+    """Check the invariants the locks protect; returns a list of failures"""
+    failures = []
+    sects, members = app_module.sects, app_module.members
+    ids = [member.id for member in members]
+    if len(set(ids)) != len(ids):
+        failures.append("duplicate disciple IDs")
+    if len(app_module.member_registry) != len(members):
+        failures.append(f"registry holds {len(app_module.member_registry)} of {len(members)} disciples")
+    if sum(len(sect.members) for sect in sects) != len(members):
+        failures.append("sect rosters do not add up to the disciple list")
+    for sect in sects:
+        if list(sect.member_ids) != [member.id for member in sect.members]:
+            failures.append(f"{sect.name}: member_ids out of sync with members")
+        if any(member.sect is not sect for member in sect.members):
+            failures.append(f"{sect.name}: disciple pointing at another sect")
+        expected = sum(member.get_combat_power() for member in sect.members)
+        if sect.power_stats.total != expected:
+            failures.append(f"{sect.name}: power total {sect.power_stats.total} != {expected}")
+    _, _, total = app_module.disciple_index.query(limit=1)
+    if total != len(members):
+        failures.append(f"disciple index holds {total} of {len(members)} disciples")
+    return failures
+
+
+def bench_stress(requests_count, concurrency, sects_count=4, disciples_per_sect=50):
+    """Hammer the app from many threads and verify the world stays consistent"""
+    workdir = tempfile.mkdtemp(prefix="sectomie-stress-")
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    quiet = io.StringIO()  # The routes print debug output for every request
+    try:
+        world, disciples = _make_world(sects_count * disciples_per_sect, sects_count)
+        world[0].spirit_stones = 1000000  # Enough for every recruit
+        DataManager().save_data(world, disciples, "example_data.json")
+
+        with contextlib.redirect_stdout(quiet):
+            import app as app_module
+        client_app = app_module.app
+        start_turn = app_module.game_state.current_turn
+        ids = [member.id for member in app_module.sects[app_module.player_sect_id].members]
+        turns = 0
+        turns_lock = threading.Lock()
+
+        def make_request(i):
+            nonlocal turns
+            rng = random.Random(i)
+            roll = rng.random()
+            if roll < 0.02:
+                path, body = "/api/end-turn", None
+            elif roll < 0.12:
+                path, body = "/api/recruitment/select", {"candidate_id": f"stress-{i}"}
+            elif roll < 0.25:
+                path, body = "/api/player-sect/collect-resources", None
+            elif roll < 0.40:
+                path, body = f"/api/disciples/{rng.choice(ids)}/cultivate-method", {"method": "qi_circulation"}
+            elif roll < 0.45:
+                path, body = "/api/disciples/cultivate-batch", {"sessions": [{"disciple_id": disciple_id} for disciple_id in rng.sample(ids, 5)]}
+            elif roll < 0.55:
+                path, body = f"/api/disciples/{rng.choice(ids)}/breakthrough", None
+            else:
+                return rng.choice(STRESS_READS), client_app.test_client().get(rng.choice(STRESS_READS)).status_code
+            response = client_app.test_client().post(path, json=body)
+            if path == "/api/end-turn" and response.status_code == 200:
+                with turns_lock:
+                    turns += 1
+            return path, response.status_code
+
+        print(f"Stress test: {requests_count} requests from {concurrency} threads in {workdir}")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(quiet), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(make_request, range(requests_count)))
+        elapsed = time.perf_counter() - start
+        saver = app_module.world_saver
+        print(f"  {requests_count / elapsed:.0f} req/s, {turns} turns ended, "
+              f"{saver.stats['requests']} save requests written in {saver.stats['saves']} saves")
+
+        failures = [f"{path} answered {status}" for path, status in results if status >= 500]
+        failures += _check_world(app_module)
+        if app_module.game_state.current_turn != start_turn + turns:
+            failures.append(f"turn {app_module.game_state.current_turn}, expected {start_turn + turns}")
+
+        # After a shutdown the saved file must reload into the world held in memory
+        with contextlib.redirect_stdout(quiet):
+            saver.close()
+            loader = DataManager()
+            saved_sects, saved_members = loader.load_data(app_module.DATA_FILE)
+        if loader.last_load_world != app_module.game_state.to_dict():
+            failures.append(f"saved game state {loader.last_load_world} differs from the one in memory")
+        if [member.to_dict() for member in saved_members] != [member.to_dict() for member in app_module.members]:
+            failures.append("saved disciples differ from the world in memory")
+        if [sect.to_dict() for sect in saved_sects] != [sect.to_dict() for sect in app_module.sects]:
+            failures.append("saved sects differ from the world in memory")
+
+        for failure in failures[:20]:
+            print(f"  FAIL: {failure}")
+        print("  OK: world consistent" if not failures else f"  {len(failures)} failures")
+        return not failures
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "catchup": bench_catchup,
+    "memory": bench_memory,
+    "methods": bench_methods,
+    "persistence": bench_persistence
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run Sectomie backend micro-benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS) + ["stress", "throughput"])
+    parser.add_argument("--disciples", type=int, default=100000, help="Number of disciples to simulate")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Server to load (throughput)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per phase (throughput, stress)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (throughput, stress)")
+    parser.add_argument("--write-ratio", type=float, default=0.0, help="Share of POST requests in the mixed phase (throughput)")
+    args = parser.parse_args()
+    if args.benchmark == "throughput":
+        bench_throughput(args.url.rstrip("/"), args.requests, args.concurrency, args.write_ratio)
+    elif args.benchmark == "stress":
+        sys.exit(0 if bench_stress(args.requests, args.concurrency) else 1)
+    else:
+        BENCHMARKS[args.benchmark](args.disciples)
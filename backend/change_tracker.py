@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Dirty-object tracking for the Sectomie system
+"""
+
+import threading
+
+
+class ChangeTracker:
+    """
+    Collects the Sect and Member objects mutated since the last save
+
+    Entities register themselves here whenever one of their attributes is
+    assigned, so persistence only has to look at what actually changed.
+    Marks and drains are atomic with respect to each other, so no change is
+    lost when request threads mutate while another thread saves.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()  # Also held while listeners run
+        self._dirty = {}  # id(entity) -> entity, in first-mutation order
+        self._listeners = []
+
+    def mark(self, entity):
+        """
+        Record that an entity has been modified
+
+        Args:
+            entity: Sect or Member object that changed
+        """
+        if self.enabled:
+            with self.lock:
+                self._dirty[id(entity)] = entity
+                if self._listeners:
+                    for listener in self._listeners:
+                        listener(entity)
+
+    def mark_all(self, entities):
+        """
+        Record several modified entities under one lock acquisition
+
+        For bulk updates that assign fields without going through tracking
+        (e.g. the batch turn engine's write-back).
+
+        Args:
+            entities (iterable): Sect or Member objects that changed
+        """
+        if self.enabled:
+            with self.lock:
+                listeners = self._listeners
+                for entity in entities:
+                    self._dirty[id(entity)] = entity
+                    for listener in listeners:
+                        listener(entity)
+
+    def add_listener(self, listener):
+        """
+        Call a function on every recorded mutation, e.g. to keep an index current
+
+        Args:
+            listener (callable): Called with the changed entity while the
+                                 tracker's lock is held; must not mutate entities
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling a listener added with add_listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def is_dirty(self, entity):
+        """Check whether an entity changed since the last drain"""
+        return id(entity) in self._dirty
+
+    def drain(self):
+        """
+        Return all dirty entities and reset the tracker
+
+        Returns:
+            list: Entities modified since the previous drain
+        """
+        with self.lock:
+            dirty, self._dirty = self._dirty, {}
+        return list(dirty.values())
+
+    def clear(self):
+        """Forget every pending change"""
+        with self.lock:
+            self._dirty = {}
+
+    def __len__(self):
+        return len(self._dirty)
+
+
+# Shared tracker used by Sect and Member instances
+change_tracker = ChangeTracker()
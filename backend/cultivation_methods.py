@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Cultivation method registry for the Sectomie cultivation system
+
+Method definitions are read once from cultivation_methods.json (or the file
+named by SECTOMIE_CULTIVATION_METHODS) and compiled into immutable tables,
+so cultivation code never rebuilds per-call effect dictionaries.
+"""
+
+import json
+import os
+import random
+from collections import namedtuple
+from types import MappingProxyType
+
+
+DEFAULT_METHODS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cultivation_methods.json")
+
+# Base qi units per point of spiritual / 10: a session is 24 hours, a month 30 days
+SESSION_BASE = 24
+MONTHLY_BASE = 30
+
+ATTRIBUTE_NAMES = ("physical", "spiritual", "comprehension")
+
+# Resource cost of a cultivation session when the method does not define one
+DEFAULT_SESSION_COST = MappingProxyType({"spirit_stones": 50})
+
+# Compiled effects of one method for one kind of cultivation (session or monthly)
+MethodEffects = namedtuple("MethodEffects", [
+    "key",
+    "qi_multiplier",
+    "qi_factor",              # Precomputed qi gained per point of spiritual at realm 0 (base / 10 * qi_multiplier)
+    "breakthrough_increase",
+    "attribute_chance",
+    "attribute",              # "physical", "spiritual", "comprehension", "all", "random" or None
+    "attribute_increase",
+    "apply_attribute",        # callable(member, increase, rng) -> (attribute_name, new_value), or None
+    "deviation_chance",
+    "description",
+    "cost"
+])
+
+# Catalog entry shown to players when choosing a method
+MethodInfo = namedtuple("MethodInfo", [
+    "key", "name", "description", "recommended_for", "min_realm", "effectiveness"
+])
+
+
+# Attribute setters, one per attribute rule
+
+def _make_single_attribute_setter(attribute):
+    def apply(member, increase, rng=random):
+        value = min(getattr(member, attribute) + increase, 100)
+        setattr(member, attribute, value)
+        return attribute, value
+    return apply
+
+
+def _apply_all_attributes(member, increase, rng=random):
+    member.physical = min(member.physical + increase, 100)
+    member.spiritual = min(member.spiritual + increase, 100)
+    member.comprehension = min(member.comprehension + increase, 100)
+    return "all", 0
+
+
+_single_attribute_setters = {name: _make_single_attribute_setter(name) for name in ATTRIBUTE_NAMES}
+
+
+def _apply_random_attribute(member, increase, rng=random):
+    return _single_attribute_setters[rng.choice(ATTRIBUTE_NAMES)](member, increase)
+
+
+ATTRIBUTE_SETTERS = dict(_single_attribute_setters, all=_apply_all_attributes, random=_apply_random_attribute)
+
+
+# Effectiveness rules (1-5 scale), referenced by name from the data file
+
+def _balance_effectiveness(member):
+    balance = 100 - (abs(member.physical - member.spiritual) + abs(member.spiritual - member.comprehension) + abs(member.comprehension - member.physical)) / 3
+    return min(5, max(1, int(balance / 20)))
+
+
+EFFECTIVENESS_RULES = {
+    "balance": _balance_effectiveness,
+    "spiritual": lambda member: min(5, max(1, int(member.spiritual / 20))),
+    "comprehension": lambda member: min(5, max(1, int(member.comprehension / 20))),
+    "lowest": lambda member: min(5, max(1, int(min(member.physical, member.spiritual, member.comprehension) / 20))),
+    "comprehension_realm": lambda member: min(5, max(1, int((member.comprehension + member.realm * 10) / 25)))
+}
+
+
+def _compile_effects(key, spec, base):
+    """Compile one session/monthly effects entry from the data file"""
+    attribute = spec.get("attribute")
+    if attribute is not None and attribute not in ATTRIBUTE_SETTERS:
+        raise ValueError(f"Cultivation method '{key}' has unknown attribute '{attribute}'")
+    return MethodEffects(
+        key=key,
+        qi_multiplier=spec["qi_multiplier"],
+        qi_factor=base / 10 * spec["qi_multiplier"],
+        breakthrough_increase=spec["breakthrough_increase"],
+        attribute_chance=spec.get("attribute_chance", 0),
+        attribute=attribute,
+        attribute_increase=spec.get("attribute_increase", 0),
+        apply_attribute=ATTRIBUTE_SETTERS[attribute] if attribute else None,
+        deviation_chance=spec.get("deviation_chance", 0),
+        description=spec.get("description", ""),
+        cost=MappingProxyType(dict(spec["cost"])) if "cost" in spec else DEFAULT_SESSION_COST
+    )
+
+
+def load_methods(filename=None):
+    """
+    Load and compile cultivation methods from a JSON data file
+
+    Args:
+        filename (str, optional): Path of the data file (defaults to the bundled one)
+
+    Returns:
+        tuple: (catalog, session_methods, monthly_methods) read-only mappings keyed by method
+    """
+    with open(filename or DEFAULT_METHODS_FILE, 'r') as file:
+        data = json.load(file)
+
+    catalog, session_methods, monthly_methods = {}, {}, {}
+    for key, spec in data.items():
+        rule = spec.get("effectiveness", "balance")
+        if rule not in EFFECTIVENESS_RULES:
+            raise ValueError(f"Cultivation method '{key}' has unknown effectiveness rule '{rule}'")
+        catalog[key] = MethodInfo(
+            key=key,
+            name=spec["name"],
+            description=spec["description"],
+            recommended_for=spec.get("recommended_for", ""),
+            min_realm=spec.get("min_realm", 0),
+            effectiveness=EFFECTIVENESS_RULES[rule]
+        )
+        if "session" in spec:
+            session_methods[key] = _compile_effects(key, spec["session"], SESSION_BASE)
+        if "monthly" in spec:
+            monthly_methods[key] = _compile_effects(key, spec["monthly"], MONTHLY_BASE)
+
+    return MappingProxyType(catalog), MappingProxyType(session_methods), MappingProxyType(monthly_methods)
+
+
+CATALOG, SESSION_METHODS, MONTHLY_METHODS = load_methods(os.environ.get("SECTOMIE_CULTIVATION_METHODS"))
+
+
+def get_session_cost(method):
+    """
+    Get the sect resources consumed by one cultivation session
+
+    Args:
+        method (str): Cultivation method key
+
+    Returns:
+        Mapping: Resource name -> amount
+    """
+    effects = SESSION_METHODS.get(method)
+    return effects.cost if effects is not None else DEFAULT_SESSION_COST
@@ -5,8 +5,17 @@ Data Manager for the Sectomie system
 
 import json
 import os
+import threading
+import time
 from member import Member
 from sect import Sect
+from change_tracker import change_tracker
+from journal import WorldJournal, patch_records, write_json_atomic
+from world_stream import WorldStreamReader, is_world_stream, write_world_stream
+from world_binary import COMPRESSIONS, HAS_ZSTD, WorldBinaryReader, is_world_binary, write_world_binary
+from mapped_world import MappedWorld, is_world_mapped, write_world_mapped
+from schema import SCHEMA_VERSION, migrate_member, migrate_records, migrate_sect
+from sqlite_storage import SqliteStorage
 
 
 class DataManager:
@@ -14,70 +23,378 @@ class DataManager:
     Handles data persistence for the Sectomie system
     """
     
-    def save_data(self, sects, members, filename):
+    STORAGE_BACKENDS = ("json", "sqlite")
+    SAVE_FORMATS = ("json", "ndjson", "binary", "mapped")
+    PROGRESS_EVERY = 10000  # Records between load progress reports
+    
+    def __init__(self, incremental=False, compact_every=1000, backend="json", save_format="json",
+                 compression="gzip"):
+        """
+        Initialize the data manager
+        
+        Args:
+            incremental (bool): Append changed entities to a log instead of rewriting the whole file
+            compact_every (int): Log records to accumulate before folding them into the snapshot
+            backend (str): Storage backend, "json" (default) or "sqlite"
+            save_format (str): Snapshot layout of the JSON backend, "json" (one
+                               document, default), "ndjson" (one record per line,
+                               streamed; see world_stream.py), "binary" (see
+                               world_binary.py) or "mapped" (memory-mapped
+                               columns; see mapped_world.py). Loading detects
+                               any of them.
+            compression (str): Compression of binary snapshots, "none", "gzip"
+                               (default) or "zstd" (needs the zstandard package)
+        """
+        if backend not in self.STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {backend}")
+        if save_format not in self.SAVE_FORMATS:
+            raise ValueError(f"Unknown save format: {save_format}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and not HAS_ZSTD:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.incremental = incremental
+        self.compact_every = compact_every
+        self.backend = backend
+        self.save_format = save_format
+        self.compression = compression
+        self._journals = {}  # filename -> WorldJournal
+        self._databases = {}  # filename -> SqliteStorage
+        self.last_load_metrics = None  # Filled in by every load_data call
+        self.last_load_world = None  # Game state saved with the last loaded world
+        self._save_lock = threading.Lock()  # Request threads save one at a time
+    
+    def _get_journal(self, filename):
+        """Get (or create) the journal for a snapshot file"""
+        if filename not in self._journals:
+            self._journals[filename] = WorldJournal(filename, self.compact_every, writer=self._write_snapshot)
+        return self._journals[filename]
+    
+    def _write_snapshot(self, filename, sects, members, world=None):
+        """Write a full snapshot in the configured save format"""
+        if self.save_format == "binary":
+            write_world_binary(filename, sects, members, self.compression, world)
+        elif self.save_format == "mapped":
+            write_world_mapped(filename, sects, members, world)
+        elif self.save_format == "ndjson":
+            write_world_stream(filename, sects, members, world)
+        else:
+            write_json_atomic(filename, {
+                "schema": SCHEMA_VERSION,
+                "world": world,
+                "sects": [sect.to_dict() for sect in sects],
+                "members": [member.to_dict() for member in members]
+            })
+    
+    @staticmethod
+    def detect_format(filename):
+        """
+        Tell which save format a snapshot file uses
+        
+        Args:
+            filename (str): Path of the snapshot
+            
+        Returns:
+            str: One of SAVE_FORMATS
+        """
+        if is_world_mapped(filename):
+            return "mapped"
+        if is_world_binary(filename):
+            return "binary"
+        if is_world_stream(filename):
+            return "ndjson"
+        return "json"
+    
+    def get_storage(self, filename):
+        """
+        Get (or open) the SQLite storage for a database file
+        
+        Args:
+            filename (str): Path of the database file
+            
+        Returns:
+            SqliteStorage: Storage object for the database
+        """
+        if filename not in self._databases:
+            self._databases[filename] = SqliteStorage(filename)
+        return self._databases[filename]
+    
+    def save_data(self, sects, members, filename, world=None):
         """
-        Save sects and members data to a JSON file
+        Save sects and members data to a JSON file (or SQLite database)
+        
+        In incremental mode only the entities changed since the last save are
+        appended to the file's change log; the first save (and every
+        compaction) writes a full snapshot. The SQLite backend always saves
+        incrementally, one transaction per call.
         
         Args:
             sects (list): List of Sect objects
             members (list): List of Member objects
             filename (str): Path to save the data
+            world (dict, optional): Game state to save with the world (see
+                                    GameState.to_dict); read back into
+                                    last_load_world
         """
-        data = {
-            "sects": [sect.to_dict() for sect in sects],
-            "members": [member.to_dict() for member in members]
-        }
+        with self._save_lock:
+            self._save_data(sects, members, filename, world)
+    
+    def _save_data(self, sects, members, filename, world):
+        if self.backend == "sqlite":
+            self.get_storage(filename).save(sects, members, world)
+            return
+        
+        if self.incremental:
+            self._get_journal(filename).save(sects, members, world)
+            return
         
-        with open(filename, 'w') as file:
-            json.dump(data, file, indent=4)
+        self._write_snapshot(filename, sects, members, world)
+        
+        # The full file supersedes any change log left by an incremental save
+        journal = self._get_journal(filename)
+        if os.path.exists(journal.log_filename):
+            os.remove(journal.log_filename)
     
-    def load_data(self, filename):
+    def load_data(self, filename, progress=None):
         """
-        Load sects and members data from a JSON file
+        Load sects and members data from a JSON file (or SQLite database)
         
         Args:
             filename (str): Path to the data file
+            progress (callable, optional): Called as progress(loaded, total) with
+                                           entity counts while objects are built
             
         Returns:
             tuple: (sects, members) lists of loaded objects
         """
+        self.last_load_world = None
         if not os.path.exists(filename):
             return [], []
         
-        with open(filename, 'r') as file:
-            data = json.load(file)
+        start = time.perf_counter()
         
-        # First pass: Create all members and sects without relationships
-        members = []
-        for member_data in data.get("members", []):
-            member = Member.from_dict(member_data)
-            members.append(member)
+        if self.backend == "sqlite":
+            storage = self.get_storage(filename)
+            data = storage.read()
+            read_time = time.perf_counter() - start
+            sects, members = self._build_world(data, progress)
+            self.last_load_world = data["world"]
+            storage.attach(sects, members, self.last_load_world)
+            self._finish_load_metrics(start, read_time)
+            return sects, members
+        
+        journal = self._get_journal(filename)
+        save_format = self.detect_format(filename)
+        if save_format in ("binary", "mapped"):
+            changes, replayed_records = journal.read_log()
+            reader = (MappedWorld if save_format == "mapped" else WorldBinaryReader)(filename)
+            read_time = time.perf_counter() - start
+            sects, members = self._build_records_from(reader, changes, progress)
+            self.last_load_world = changes["world"].get(0, reader.header["world"])
+        elif save_format == "ndjson":
+            # Records are parsed while objects are built, so "read" only covers the log
+            changes, replayed_records = journal.read_log()
+            read_time = time.perf_counter() - start
+            with open(filename, 'r') as file:
+                reader = WorldStreamReader(file)
+                sects, members = self._build_records_from(reader, changes, progress)
+            self.last_load_world = changes["world"].get(0, reader.header["world"])
+        else:
+            with open(filename, 'r') as file:
+                data = json.load(file)
+            
+            # Bring the snapshot up to date with any logged changes
+            replayed_records = journal.replay(data)
+            read_time = time.perf_counter() - start
+            
+            sects, members = self._build_world(data, progress)
+            self.last_load_world = data["world"]
+        
+        # A world loaded from an older schema is rewritten in full at its first save,
+        # so the log never mixes records of two schemas
+        if self.incremental and self.last_load_metrics["schema"] == SCHEMA_VERSION:
+            journal.attach(sects, members, replayed_records, self.last_load_world)
         
+        self.last_load_metrics["replayed_records"] = replayed_records
+        self.last_load_metrics["format"] = save_format
+        self._finish_load_metrics(start, read_time)
+        return sects, members
+    
+    def _finish_load_metrics(self, start, read_time):
+        """Record phase timings and throughput, and report dangling references"""
+        metrics = self.last_load_metrics
+        metrics["phases"]["read"] = read_time
+        metrics["total_time"] = time.perf_counter() - start
+        entities = metrics["sects"] + metrics["members"]
+        metrics["entities_per_second"] = entities / metrics["total_time"] if metrics["total_time"] > 0 else 0
+        
+        dangling = metrics["dangling_references"]
+        if dangling:
+            print(f"Warning: {len(dangling)} dangling reference(s) while loading, e.g. "
+                  f"{dangling[0]['type']} '{dangling[0]['source']}' -> '{dangling[0]['target']}'")
+    
+    def _build_world(self, data, progress=None):
+        """
+        Create Sect and Member objects from raw data and wire their relationships
+        
+        Args:
+            data (dict): {"schema": ..., "sects": [...], "members": [...]} in the save file layout
+            progress (callable, optional): See load_data
+            
+        Returns:
+            tuple: (sects, members) lists of objects
+        """
+        sect_records = data.get("sects", [])
+        member_records = data.get("members", [])
+        return self._build_world_records(sect_records, member_records, progress,
+                                         len(sect_records) + len(member_records), data.get("schema", 0))
+    
+    def _build_records_from(self, reader, changes, progress):
+        """Build the world from a stream, binary or mapped reader, patching in logged changes"""
+        return self._build_world_records(
+            patch_records(reader.sects(), changes["sect"]),
+            patch_records(reader.members(), changes["member"]),
+            progress,
+            reader.header["sects"] + reader.header["members"],
+            reader.header["schema"]
+        )
+    
+    def _build_world_records(self, sect_records, member_records, progress=None, total=None, schema=SCHEMA_VERSION):
+        """
+        Create the world from record iterables in a single pass
+        
+        Each sect and member record is migrated to the current schema right
+        before its object is created and dropped right after, so records can
+        be streamed straight from disk.
+        
+        Args:
+            sect_records (iterable): Sect records, consumed first
+            member_records (iterable): Member records, or (member, sect name)
+                                       pairs for disciples that already exist
+                                       (e.g. views over a mapped snapshot)
+            progress (callable, optional): See load_data
+            total (int, optional): Number of records, passed on to progress
+            schema (int): Save schema version of the records (see schema.py)
+            
+        Returns:
+            tuple: (sects, members) lists of objects
+        """
+        phases = {}
+        dangling = []
+        
+        # Phase 1: Create sects, then members attached to their sect as they are created
+        # (freshly loaded objects are clean, so skip dirty tracking meanwhile)
+        phase_start = time.perf_counter()
+        sect_records = migrate_records(sect_records, schema, migrate_sect)
+        member_records = migrate_records(member_records, schema, migrate_member)
         sects = []
-        for sect_data in data.get("sects", []):
-            sect = Sect.from_dict(sect_data)
-            sects.append(sect)
-        
-        # Second pass: Establish relationships
-        for i, member_data in enumerate(data.get("members", [])):
-            if member_data.get("sect"):
-                for sect in sects:
-                    if sect.name == member_data["sect"]:
-                        sect.add_member(members[i])
-                        break
-        
-        # Handle sect alliances and rivalries
-        for i, sect_data in enumerate(data.get("sects", [])):
-            for alliance_name in sect_data.get("alliances", []):
-                for other_sect in sects:
-                    if other_sect.name == alliance_name and other_sect != sects[i]:
-                        if other_sect not in sects[i].alliances:
-                            sects[i].alliances.append(other_sect)
+        sect_relations = []  # Alliance and rival names, resolved once every sect exists
+        members = []
+        change_tracker.enabled = False
+        try:
+            for sect_data in sect_records:
+                sects.append(Sect.from_dict(sect_data))
+                sect_relations.append((sect_data["alliances"], sect_data["rivals"]))
             
-            for rival_name in sect_data.get("rivals", []):
-                for other_sect in sects:
-                    if other_sect.name == rival_name and other_sect != sects[i]:
-                        if other_sect not in sects[i].rivals:
-                            sects[i].rivals.append(other_sect)
+            # Build the name index once; the first sect with a given name wins, as before
+            sects_by_name = {}
+            for sect in sects:
+                sects_by_name.setdefault(sect.name, sect)
+            
+            for member_data in member_records:
+                if isinstance(member_data, dict):
+                    member = Member.from_dict(member_data)
+                    sect_name = member_data["sect"]
+                else:
+                    member, sect_name = member_data
+                Member._assign_id(member.id)  # Keep new IDs clear of the loaded ones
+                members.append(member)
+                if progress is not None and len(members) % self.PROGRESS_EVERY == 0:
+                    progress(len(sects) + len(members), total)
+                
+                if not sect_name:
+                    continue
+                sect = sects_by_name.get(sect_name)
+                if sect is None:
+                    dangling.append({"type": "member_sect", "source": member.name, "target": sect_name})
+                    continue
+                # Records are unique, so skip add_member's membership check
+                sect.members.append(member)
+                sect.member_ids[member.id] = None
+                sect.power_stats.add(member)
+                member.sect = sect
+        finally:
+            change_tracker.enabled = True
+        phases["construct"] = time.perf_counter() - phase_start
+        
+        # Phase 2: Resolve sect relationships
+        phase_start = time.perf_counter()
+        for sect, relations in zip(sects, sect_relations):
+            for relation, names in zip(("alliances", "rivals"), relations):
+                resolved = getattr(sect, relation)
+                seen = set(id(other) for other in resolved)
+                for other_name in names:
+                    other_sect = sects_by_name.get(other_name)
+                    if other_sect is None:
+                        dangling.append({"type": relation, "source": sect.name, "target": other_name})
+                    elif other_sect is not sect and id(other_sect) not in seen:
+                        resolved.append(other_sect)
+                        seen.add(id(other_sect))
+        phases["resolve"] = time.perf_counter() - phase_start
+        
+        self.last_load_metrics = {
+            "sects": len(sects),
+            "members": len(members),
+            "schema": schema,
+            "phases": phases,
+            "dangling_references": dangling
+        }
         
         return sects, members
+
+
+def convert_world_file(source, target, save_format="binary", compression="gzip"):
+    """
+    Rewrite a save file (with its change log folded in) in another format
+    
+    Args:
+        source (str): Existing save file, in any format
+        target (str): File to write; may be the source itself
+        save_format (str): One of DataManager.SAVE_FORMATS
+        compression (str): Compression for the binary format
+        
+    Returns:
+        dict: Sizes in bytes and timings in seconds
+    """
+    manager = DataManager(save_format=save_format, compression=compression)
+    source_size = os.path.getsize(source)
+    start = time.perf_counter()
+    sects, members = manager.load_data(source)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    manager.save_data(sects, members, target, manager.last_load_world)
+    return {
+        "source_format": manager.last_load_metrics["format"],
+        "source_size": source_size,
+        "target_size": os.path.getsize(target),
+        "load_time": load_time,
+        "save_time": time.perf_counter() - start,
+        "members": len(members)
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Convert a Sectomie save file between formats")
+    parser.add_argument("source", help="Save file to read (format is detected)")
+    parser.add_argument("target", help="File to write")
+    parser.add_argument("--format", choices=DataManager.SAVE_FORMATS, default="binary")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="gzip", help="Binary format only")
+    args = parser.parse_args()
+    
+    result = convert_world_file(args.source, args.target, args.format, args.compression)
+    print(f"{args.source} ({result['source_format']}, {result['source_size'] / 1024:.0f} KiB) -> "
+          f"{args.target} ({args.format}, {result['target_size'] / 1024:.0f} KiB): "
+          f"{result['source_size'] / max(result['target_size'], 1):.1f}x smaller, {result['members']} disciples, "
+          f"load {result['load_time']:.2f} s, save {result['save_time']:.2f} s")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes over disciples for the Sectomie system
+
+Backs the paginated disciple listings: hash indexes answer filters (realm,
+stage, path, bottleneck, sect) and sorted (key, id) lists answer orderings
+(combat power, qi ratio, breakthrough chance, age), so a page costs time
+proportional to its size rather than to the number of disciples.
+
+Indexes follow Member mutations through the change tracker. A changed
+disciple is only marked stale; its index entries are recomputed the next
+time the index is queried.
+"""
+
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from change_tracker import change_tracker
+
+
+# Filter name -> function computing a disciple's value
+FILTERS = {
+    "realm": lambda member: member.realm,
+    "stage": lambda member: member.realm_stage,
+    "path": lambda member: member.path,
+    "bottleneck": lambda member: member.bottleneck,
+    "sect": lambda member: member.sect  # Sect objects hash by identity
+}
+
+# Sort name -> function computing a disciple's sort key, always a number (ties are broken by ID)
+SORTS = {
+    "id": lambda member: member.id,
+    "combat_power": lambda member: member.get_combat_power(),
+    "qi_ratio": lambda member: member.qi / member.max_qi if member.max_qi else 0.0,
+    "breakthrough_chance": lambda member: member.breakthrough_chance,
+    "age": lambda member: member.age
+}
+
+# Field name -> function computing the value returned for ?fields=...
+FIELDS = {
+    "id": lambda member: member.id,
+    "name": lambda member: member.name,
+    "age": lambda member: member.age,
+    "path": lambda member: member.path,
+    "realm": lambda member: member.get_realm_name(),
+    "stage": lambda member: member.get_stage_name(),
+    "realm_level": lambda member: member.realm,
+    "realm_stage": lambda member: member.realm_stage,
+    "sect": lambda member: member.sect.name if member.sect else None,
+    "status": lambda member: member.status,
+    "physical": lambda member: member.physical,
+    "spiritual": lambda member: member.spiritual,
+    "comprehension": lambda member: member.comprehension,
+    "qi": lambda member: member.qi,
+    "max_qi": lambda member: member.max_qi,
+    "qi_ratio": SORTS["qi_ratio"],
+    "breakthrough_chance": lambda member: member.breakthrough_chance,
+    "bottleneck": lambda member: member.bottleneck,
+    "combat_power": lambda member: member.get_combat_power(),
+    "cultivation_method": lambda member: member.assigned_cultivation_method
+}
+
+# A filtered query sorts its matches directly when they are this much rarer than a full scan
+DIRECT_SORT_RATIO = 8
+
+
+def project(member, fields):
+    """
+    Build the JSON dict for a disciple with only the requested fields
+
+    Args:
+        member: Member to describe
+        fields (list): Names from FIELDS
+
+    Returns:
+        dict: {field: value}
+    """
+    return {field: FIELDS[field](member) for field in fields}
+
+
+def encode_cursor(key, member_id):
+    """Opaque cursor pointing just past a (sort key, disciple ID) position"""
+    return base64.urlsafe_b64encode(json.dumps([key, member_id]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed or does not hold a numeric key and a disciple ID
+    """
+    try:
+        key, member_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii") + b"=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    # Anything else would fail to compare with the sorted (key, ID) entries
+    if type(key) not in (int, float) or type(member_id) is not int:
+        raise ValueError("Invalid cursor")
+    return key, member_id
+
+
+class DiscipleIndex:
+    """
+    Filter and sort indexes over a set of disciples
+    """
+
+    def __init__(self, members=None):
+        """
+        Initialize the index and start following disciple mutations
+
+        Args:
+            members (list, optional): Members to index
+        """
+        self._members = {}  # member ID -> Member
+        self._values = {}  # member ID -> (filter values, sort keys) currently indexed
+        self._filters = {name: {} for name in FILTERS}  # filter -> value -> set of IDs
+        self._sorted = {name: [] for name in SORTS}  # sort -> sorted list of (key, ID)
+        self._stale = {}  # id(entity) -> entity changed since the last refresh
+        self._lock = threading.RLock()  # Serializes index updates between request threads
+        change_tracker.add_listener(self._on_change)
+        if members:
+            self.rebuild(members)
+
+    def close(self):
+        """Stop following mutations"""
+        change_tracker.remove_listener(self._on_change)
+
+    def _on_change(self, entity):
+        self._stale[id(entity)] = entity
+
+    def rebuild(self, members):
+        """
+        Replace the index contents with a new member list
+
+        Args:
+            members (list): List of Member objects
+        """
+        with self._lock:
+            with change_tracker.lock:
+                self._stale = {}
+            self._members = {member.id: member for member in members}
+            self._values = {}
+            self._filters = {name: {} for name in FILTERS}
+            sorted_entries = {name: [] for name in SORTS}
+            for member_id, member in self._members.items():
+                filter_values, sort_keys = self._compute(member)
+                self._values[member_id] = (filter_values, sort_keys)
+                for name, value in zip(FILTERS, filter_values):
+                    self._filters[name].setdefault(value, set()).add(member_id)
+                for name, key in zip(SORTS, sort_keys):
+                    sorted_entries[name].append((key, member_id))
+            self._sorted = {name: sorted(entries) for name, entries in sorted_entries.items()}
+
+    def add(self, member):
+        """
+        Index a member
+
+        Args:
+            member: Member object to index
+        """
+        with self._lock:
+            self.remove(member)
+            self._members[member.id] = member
+            self._insert(member)
+
+    def remove(self, member):
+        """
+        Stop indexing a member
+
+        Args:
+            member: Member object to remove
+        """
+        with self._lock:
+            if self._members.pop(member.id, None) is not None:
+                self._delete(member.id)
+
+    def refresh(self):
+        """Re-index every disciple changed since the last refresh"""
+        with self._lock:
+            with change_tracker.lock:
+                stale, self._stale = self._stale, {}
+            for entity in stale.values():
+                member_id = getattr(entity, "id", None)
+                if self._members.get(member_id) is not entity:
+                    continue  # Sects and members outside the index
+                filter_values, sort_keys = self._compute(entity)
+                if (filter_values, sort_keys) != self._values[member_id]:
+                    self._delete(member_id)
+                    self._insert(entity)
+
+    def _compute(self, member):
+        return (
+            tuple(value(member) for value in FILTERS.values()),
+            tuple(key(member) for key in SORTS.values())
+        )
+
+    def _insert(self, member):
+        filter_values, sort_keys = self._compute(member)
+        self._values[member.id] = (filter_values, sort_keys)
+        for name, value in zip(FILTERS, filter_values):
+            self._filters[name].setdefault(value, set()).add(member.id)
+        for name, key in zip(SORTS, sort_keys):
+            insort(self._sorted[name], (key, member.id))
+
+    def _delete(self, member_id):
+        filter_values, sort_keys = self._values.pop(member_id)
+        for name, value in zip(FILTERS, filter_values):
+            ids = self._filters[name][value]
+            ids.discard(member_id)
+            if not ids:
+                del self._filters[name][value]
+        for name, key in zip(SORTS, sort_keys):
+            entries = self._sorted[name]
+            del entries[bisect_left(entries, (key, member_id))]
+
+    def query(self, filters=None, sort="id", descending=False, cursor=None, limit=100):
+        """
+        Get one page of disciples
+
+        Args:
+            filters (dict, optional): {filter name: required value}, all of which must match
+            sort (str): Sort name from SORTS
+            descending (bool): Largest keys first
+            cursor (str, optional): next_cursor from the previous page
+            limit (int): Page size
+
+        Returns:
+            tuple: (members, next_cursor, total) where next_cursor is None on
+                   the last page and total counts every matching disciple
+
+        Raises:
+            ValueError: For an unknown filter or sort, or a malformed cursor
+        """
+        with self._lock:
+            if sort not in SORTS:
+                raise ValueError(f"Unknown sort '{sort}'")
+            self.refresh()
+
+            # Intersect the filter sets, smallest first
+            matches = None
+            if filters:
+                id_sets = []
+                for name, value in filters.items():
+                    if name not in FILTERS:
+                        raise ValueError(f"Unknown filter '{name}'")
+                    id_sets.append(self._filters[name].get(value, set()))
+                id_sets.sort(key=len)
+                matches = id_sets[0].intersection(*id_sets[1:])
+
+            entries = self._sorted[sort]
+            total = len(entries) if matches is None else len(matches)
+            if matches is not None and total * DIRECT_SORT_RATIO < len(entries):
+                # Few matches: sorting them beats skipping through the full order
+                sort_position = list(SORTS).index(sort)
+                entries = sorted((self._values[member_id][1][sort_position], member_id) for member_id in matches)
+                matches = None
+
+            if descending:
+                end = len(entries) if cursor is None else bisect_left(entries, tuple(decode_cursor(cursor)))
+                positions = range(end - 1, -1, -1)
+            else:
+                start = 0 if cursor is None else bisect_right(entries, tuple(decode_cursor(cursor)))
+                positions = range(start, len(entries))
+
+            page = []
+            last = None
+            for position in positions:
+                entry = entries[position]
+                if matches is not None and entry[1] not in matches:
+                    continue
+                if len(page) == limit:
+                    return page, encode_cursor(*last), total
+                page.append(self._members[entry[1]])
+                last = entry
+            return page, None, total
+
+    def __len__(self):
+        return len(self._members)
@@ -3,10 +3,15 @@ Game State Manager for Sectomie Cultivation System
 Handles turn-based mechanics and global game state
 """
 
-import random
+import threading
+
+from lazy_cultivation import catch_up
+from rng import RandomStreams
+from turn_engine import HAS_NUMPY, BatchTurnEngine
+from world_tick import WorldTicker, merge_results, run_sect_turn, sect_turn_key
 
 class GameState:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.current_turn = 1
         self.turn_length = 30  # 30 days per turn
         self.game_date = {
@@ -17,10 +22,191 @@ class GameState:
         self.events = []
         self.available_missions = []
         self.sect_id = 0  # Player's sect ID
+        self.random_streams = RandomStreams(seed)  # All game randomness derives from the world seed
+        self.batch_engine = None  # Vectorized cultivation engine (see enable_batch_engine)
+        self.world_ticker = None  # Advances every sect each turn (see enable_world_simulation)
+        self.lazy_cultivation = False  # Other sects' disciples catch up when read (see enable_lazy_cultivation)
+        self.world_version = 0  # Bumped on every change to the world (see mark_changed)
+        self._caught_up_turn = None  # Turn at which every idle disciple was last caught up
+        self._lock = threading.Lock()  # Guards the version counter between request threads
+        
+    def seed_world(self, seed):
+        """
+        Restart all game randomness from a world seed
+        
+        Args:
+            seed (int): World seed; the same seed and actions replay identically
+        """
+        self.random_streams = RandomStreams(seed)
+        if self.world_ticker is not None:
+            self.world_ticker.streams = self.random_streams
+        
+    def action_rng(self, action, *keys):
+        """
+        Get a random stream for a player action during the current turn
+        
+        Args:
+            action (str): Action name, e.g. "breakthrough" or "recruitment"
+            *keys: Further key parts, e.g. the disciple ID
+            
+        Returns:
+            random.Random: A reproducible stream for this occurrence of the action
+        """
+        return self.random_streams.next_stream(action, self.current_turn, *keys)
+        
+    def enable_batch_engine(self):
+        """
+        Process disciple cultivation with the vectorized NumPy engine
+        
+        Returns:
+            bool: True if the engine is active, False if numpy is unavailable
+        """
+        if not HAS_NUMPY:
+            return False
+        self.batch_engine = BatchTurnEngine()
+        return True
+        
+    def enable_world_simulation(self, workers=None):
+        """
+        Advance every sect at the end of each turn, not just the player's
+        
+        Args:
+            workers (int, optional): Worker processes to shard sects across (by default sects run in-process)
+        """
+        self.world_ticker = WorldTicker(workers=workers, streams=self.random_streams)
+        
+    def enable_lazy_cultivation(self, sects):
+        """
+        Stop cultivating other sects' disciples every turn; catch them up when read instead
+        
+        Only the player sect is cultivated turn by turn. Everyone else keeps
+        the state they had at their last_turn until materialize() is called
+        (the API does so before any read that shows them), so end-turn cost no
+        longer grows with the number of idle disciples. Used with the world
+        simulation.
+        
+        Args:
+            sects (list): List of Sect objects; their idle disciples start counting from this turn
+        """
+        self.lazy_cultivation = True
+        for index, sect in enumerate(sects):
+            if index != self.sect_id:
+                for member in sect.members:
+                    if member.last_turn is None:
+                        member.last_turn = self.current_turn
+        
+    def needs_catch_up(self, member):
+        """Check whether a lazily cultivated disciple is behind the current turn"""
+        return self.lazy_cultivation and member.last_turn is not None and member.last_turn < self.current_turn
+        
+    def settle_idle(self, members):
+        """
+        Catch up disciples left idle by a world saved with lazy cultivation
+        
+        Without lazy cultivation every disciple is cultivated each turn, so
+        anyone still carrying a last_turn is brought up to date once and then
+        processed like everyone else. Call on load, before any request.
+        
+        Args:
+            members (list): List of all Member objects
+        """
+        for member in members:
+            if member.last_turn is not None:
+                self._catch_up(member)
+                member.last_turn = None
+        
+    def materialize(self, member):
+        """
+        Bring a lazily cultivated disciple up to date with the current turn
+        
+        Catch-up rewrites several of the disciple's fields, so the caller must
+        hold the disciple exclusively (its sect's write lock or the world's).
+        
+        Args:
+            member: Member to update (disciples processed every turn are left alone)
+            
+        Returns:
+            list: Breakthrough events that happened while the disciple was idle
+        """
+        if not self.needs_catch_up(member):
+            return []
+        return self._catch_up(member)
+        
+    def _catch_up(self, member):
+        rng = self.random_streams.stream("catch-up", member.id, member.last_turn, self.current_turn)
+        events = catch_up(member, self.current_turn - member.last_turn, rng)
+        member.last_turn = self.current_turn
+        if member.sect is not None:
+            member.sect.power_stats.update(member)
+        self.mark_changed()
+        return events
+        
+    def materialize_all(self, members):
+        """
+        Catch up every lazily cultivated disciple; the caller holds the world exclusively
+        
+        Args:
+            members (list): List of all Member objects
+        """
+        for member in members:
+            self.materialize(member)
+        self._caught_up_turn = self.current_turn
+        
+    def caught_up(self):
+        """Check whether every disciple is up to date with the current turn"""
+        return not self.lazy_cultivation or self._caught_up_turn == self.current_turn
+        
+    def to_dict(self):
+        """Convert the turn counter, calendar and random streams to a dictionary saved with the world"""
+        return {
+            "current_turn": self.current_turn,
+            "game_date": dict(self.game_date),
+            "random": self.random_streams.to_dict()
+        }
+        
+    def restore(self, data, members=(), seed=None):
+        """
+        Resume the turn counter, calendar and random streams saved with a world
+        
+        The saved world seed and this turn's action counters are restored, so
+        the rest of the turn draws the same numbers it would have without the
+        restart.
+        
+        Args:
+            data (dict): State from to_dict, or None for saves made before it was kept
+            members (list, optional): Loaded Member objects; without saved state the
+                                      turn resumes at the latest one a disciple reached
+            seed (int, optional): World seed to use instead of the saved one
+        """
+        if data is not None:
+            self.current_turn = data["current_turn"]
+            self.game_date = dict(data["game_date"])
+            self.seed_world(data["random"]["seed"] if seed is None else seed)
+            self.random_streams.restore_counters(data["random"]["counters"])
+        else:
+            self.current_turn = max((member.last_turn for member in members if member.last_turn is not None),
+                                    default=self.current_turn)
+            # Every turn is one month from year 1, month 1
+            self.game_date["year"] = (self.current_turn - 1) // 12 + 1
+            self.game_date["month"] = (self.current_turn - 1) % 12 + 1
+        self._caught_up_turn = None
+        
+    def mark_changed(self):
+        """
+        Record that the world changed, invalidating responses built from the old state
+        
+        Returns:
+            int: The new world version
+        """
+        with self._lock:
+            self.world_version += 1
+            return self.world_version
         
     def advance_turn(self):
         """Advance the game by one turn"""
+        self.mark_changed()
         self.current_turn += 1
+        self.random_streams.reset_counters()  # Action streams are keyed by turn
         
         # Advance game date
         self.game_date["month"] += 1
@@ -32,122 +218,113 @@ class GameState:
     
     def process_turn_end(self, sects, members):
         """Process all end-of-turn events and calculations"""
-        results = {
-            "resource_income": {},
-            "cultivation_progress": {},
-            "events": [],
-            "new_missions": [],
-            "cultivation_deviations": [],
-            "attribute_increases": []
-        }
-        
         # Get player sect
         if self.sect_id < 0 or self.sect_id >= len(sects):
             return {"error": "Invalid sect ID"}
+        self.mark_changed()
         
+        # Advance every sect when the world simulation is on
+        if self.world_ticker is not None:
+            return self._process_world_turn(sects, members)
+        
+        # Income and automatic cultivation for the player sect's disciples
         player_sect = sects[self.sect_id]
+        seed = self.random_streams.seed_for(*sect_turn_key(self.current_turn, player_sect))
+        results = run_sect_turn(player_sect, seed, self.batch_engine)
+        
+        # Generate new missions/opportunities (placeholder)
+        # TODO: Implement mission generation
+        
+        return results
+    
+    def _process_world_turn(self, sects, members):
+        """Advance every sect; the player sect's results are returned with a world summary"""
+        idle = set()
+        if self.lazy_cultivation:
+            idle = set(range(len(sects))) - {self.sect_id}
+            # Disciples who moved into the player sect are cultivated every turn from now on
+            for member in sects[self.sect_id].members:
+                if member.last_turn is not None:
+                    self.materialize(member)
+                    member.last_turn = None
         
-        # Calculate resource income
-        spirit_stone_income = sum(vein["output"] for vein in player_sect.spirit_veins)
-        player_sect.spirit_stones += spirit_stone_income
-        results["resource_income"]["spirit_stones"] = spirit_stone_income
-        
-        # Generate spirit herbs from elixir fields
-        if player_sect.elixir_fields > 0:
-            # Each elixir field has a chance to produce 0-2 spirit herbs
-            herb_income = 0
-            for _ in range(player_sect.elixir_fields):
-                herb_income += random.randint(0, 2)
-                
-            # Initialize spirit_herbs if it doesn't exist
-            if not hasattr(player_sect, 'spirit_herbs'):
-                player_sect.spirit_herbs = 0
-                
-            player_sect.spirit_herbs += herb_income
-            results["resource_income"]["spirit_herbs"] = herb_income
-        
-        # Process automatic cultivation for disciples
-        for member in player_sect.members:
-            # Skip disciples that are not active or are in seclusion
-            if hasattr(member, 'status') and member.status not in ['active', None]:
-                continue
-                
-            # Get assigned cultivation method (default to qi_circulation if none assigned)
-            assigned_method = getattr(member, 'assigned_cultivation_method', 'qi_circulation')
+        per_sect = self.world_ticker.run(sects, self.current_turn, use_batch=self.batch_engine is not None, idle=idle)
+        world = merge_results(sects, per_sect)
+        
+        results = per_sect[self.sect_id]
+        results["world"] = {
+            "sects_processed": len(sects),
+            "disciples_cultivated": len(world["cultivation_progress"]),
+            "resource_income": world["resource_income"],
+            "events": world["events"]
+        }
+        return results
+    
+    def advance_turns(self, sects, members, turns, sample_every=None):
+        """
+        Fast-forward several turns in memory and aggregate their results
+        
+        Nothing is saved here; callers persist once after the whole batch.
+        
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            turns (int): Number of turns to process
+            sample_every (int, optional): Keep the full results of every Nth turn
             
-            # Calculate facility bonus based on sect buildings
-            facility_bonus = 1.0
-            if hasattr(player_sect, 'cultivation_chambers') and player_sect.cultivation_chambers > 0:
-                facility_bonus += player_sect.cultivation_chambers * 0.05  # 5% bonus per chamber
-                
-            # Calculate manual bonus based on sect technique manuals
-            manual_bonus = 1.0
-            if hasattr(player_sect, 'technique_manuals') and player_sect.technique_manuals:
-                # Check if there's a manual for this specific method
-                for manual in player_sect.technique_manuals:
-                    if manual.get('method') == assigned_method:
-                        manual_bonus += manual.get('bonus', 0.1)  # Default 10% bonus per manual
+        Returns:
+            dict: Turn range, totals, breakthrough events and deviations (tagged
+                  with their turn), world totals and any sampled per-turn results
+        """
+        summary = {
+            "turns": 0,
+            "start_turn": self.current_turn,
+            "end_turn": self.current_turn,
+            "totals": {
+                "resource_income": {},
+                "qi_gained": 0,
+                "breakthroughs": 0,
+                "cultivation_deviations": 0,
+                "attribute_increases": 0
+            },
+            "events": [],
+            "cultivation_deviations": [],
+            "samples": {}
+        }
+        totals = summary["totals"]
+        
+        for _ in range(turns):
+            turn = self.current_turn
+            results = self.process_turn_end(sects, members)
+            if "error" in results:
+                summary["error"] = results["error"]
+                break
             
-            # Calculate resource bonus based on allocated resources
-            resource_bonus = 1.0
-            if hasattr(member, 'allocated_resources'):
-                resource_bonus += member.allocated_resources * 0.1  # 10% bonus per resource point
+            for resource, amount in results["resource_income"].items():
+                totals["resource_income"][resource] = totals["resource_income"].get(resource, 0) + amount
+            totals["qi_gained"] += sum(progress["qi_gained"] for progress in results["cultivation_progress"].values())
+            totals["breakthroughs"] += sum(1 for event in results["events"] if event["type"] == "breakthrough")
+            totals["cultivation_deviations"] += len(results["cultivation_deviations"])
+            totals["attribute_increases"] += len(results["attribute_increases"])
+            summary["events"].extend(dict(event, turn=turn) for event in results["events"])
+            summary["cultivation_deviations"].extend(dict(deviation, turn=turn) for deviation in results["cultivation_deviations"])
             
-            # Apply monthly cultivation with all bonuses
-            cultivation_result = member.calculate_monthly_cultivation(
-                assigned_method=assigned_method,
-                facility_bonus=facility_bonus,
-                manual_bonus=manual_bonus,
-                resource_bonus=resource_bonus
-            )
+            if "world" in results:
+                world = summary.setdefault("world", {"resource_income": {}, "events": []})
+                for sect_name, income in results["world"]["resource_income"].items():
+                    sect_totals = world["resource_income"].setdefault(sect_name, {})
+                    for resource, amount in income.items():
+                        sect_totals[resource] = sect_totals.get(resource, 0) + amount
+                world["events"].extend(dict(event, turn=turn) for event in results["world"]["events"])
             
-            # Record cultivation progress
-            results["cultivation_progress"][members.index(member)] = {
-                "name": member.name,
-                "qi_gained": cultivation_result["qi_gained"],
-                "current_qi": member.qi,
-                "max_qi": member.max_qi,
-                "breakthrough_chance": member.breakthrough_chance,
-                "method_used": assigned_method,
-                "method_description": cultivation_result.get("method_description", "")
-            }
+            summary["turns"] += 1
+            if sample_every and summary["turns"] % sample_every == 0:
+                summary["samples"][turn] = results
             
-            # Record cultivation deviations
-            if cultivation_result["cultivation_deviation"]:
-                results["cultivation_deviations"].append({
-                    "disciple_id": members.index(member),
-                    "name": member.name,
-                    "message": cultivation_result["message"]
-                })
-                
-            # Record attribute increases
-            if cultivation_result["attribute_increase"]:
-                results["attribute_increases"].append({
-                    "disciple_id": members.index(member),
-                    "name": member.name,
-                    "attribute": cultivation_result["attribute_increase"],
-                    "value": cultivation_result["attribute_value"]
-                })
-                
-            # Check for automatic breakthrough attempts
-            if member.qi >= member.max_qi and member.bottleneck == "none":
-                # 10% chance to automatically attempt breakthrough when qi is full
-                if random.random() < 0.1:
-                    breakthrough_result = member.attempt_breakthrough()
-                    if breakthrough_result["success"]:
-                        results["events"].append({
-                            "type": "breakthrough",
-                            "disciple_id": members.index(member),
-                            "name": member.name,
-                            "message": breakthrough_result["message"],
-                            "new_realm": member.realm,
-                            "new_stage": member.stage
-                        })
+            self.advance_turn()
         
-        # Generate new missions/opportunities (placeholder)
-        # TODO: Implement mission generation
-        
-        return results
+        summary["end_turn"] = self.current_turn
+        return summary
     
     def get_game_date_string(self):
         """Return formatted game date string"""
@@ -0,0 +1,32 @@
+"""
+Gunicorn settings for serving wsgi:application
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+SECTOMIE_BIND sets the address (default 0.0.0.0:5000) and
+SECTOMIE_HTTP_THREADS the request threads (default 8).
+"""
+
+import os
+
+
+bind = os.environ.get('SECTOMIE_BIND', '0.0.0.0:5000')
+
+# The world is held in one process; a second worker would load its own copy and diverge
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('SECTOMIE_HTTP_THREADS', '8'))
+
+# Fast-forwarding many turns can take a while
+timeout = 120
+
+
+def on_starting(server):
+    if server.cfg.workers != 1:
+        raise RuntimeError("Sectomie keeps the world in memory and must run with a single worker (use --threads to scale)")
+
+
+def worker_exit(server, worker):
+    # Write out changes the background saver has not saved yet
+    from app import world_saver
+    world_saver.close()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Append-only change log for the Sectomie system
+"""
+
+import json
+import os
+from change_tracker import change_tracker
+from schema import SCHEMA_VERSION
+
+
+def write_json_atomic(filename, data):
+    """
+    Write a JSON file so readers (and crashes) see either the old or the new content
+
+    The data goes to "<filename>.tmp", is flushed to disk, then renamed over
+    the target in one step.
+
+    Args:
+        filename (str): Path of the file to replace
+        data: JSON-serializable data
+    """
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'w') as file:
+        json.dump(data, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+def patch_records(records, changes):
+    """
+    Apply logged changes to a stream of snapshot records
+
+    Args:
+        records (iterable): Records in snapshot order
+        changes (dict): index -> latest logged record (consumed)
+
+    Yields:
+        dict: Each record as of the end of the log, then logged records past
+              the end of the snapshot in index order (gaps are dropped)
+    """
+    count = 0
+    for index, record in enumerate(records):
+        yield changes.pop(index, record)
+        count = index + 1
+    for index in sorted(changes):
+        if index >= count:
+            yield changes[index]
+
+
+class WorldJournal:
+    """
+    Write-ahead log layered over a full JSON snapshot
+
+    The snapshot file keeps the regular {"sects": [...], "members": [...]}
+    layout unless another snapshot writer is given (see DataManager). Every
+    save after that appends one JSON line per changed entity to
+    "<snapshot>.log", so a mutation costs O(changed entities) instead of a
+    full rewrite, plus a "world" line whenever the game state saved with the
+    world changed. The log is folded back into the snapshot (compaction)
+    once it grows past `compact_every` records.
+    """
+
+    def __init__(self, filename, compact_every=1000, writer=None):
+        """
+        Initialize a journal for a snapshot file
+
+        Args:
+            filename (str): Path of the JSON snapshot
+            compact_every (int): Number of log records before compaction
+            writer (callable, optional): writer(filename, sects, members, world)
+                                         writing a full snapshot; a JSON document
+                                         by default
+        """
+        self.filename = filename
+        self.writer = writer
+        self.log_filename = filename + ".log"
+        self.compact_every = compact_every
+        self.records_since_compaction = 0
+        self.attached = False
+        self._member_positions = {}  # id(member) -> index in the members list
+        self._sect_positions = {}    # id(sect) -> index in the sects list
+        self._world = None           # Game state as of the last save
+
+    def attach(self, sects, members, replayed_records=0, world=None):
+        """
+        Start journaling against an in-memory world that matches the files on disk
+
+        Args:
+            sects (list): Loaded Sect objects
+            members (list): Loaded Member objects
+            replayed_records (int): Log records already present on disk
+            world (dict, optional): Game state saved with the world
+        """
+        self._sect_positions = {id(sect): i for i, sect in enumerate(sects)}
+        self._member_positions = {id(member): i for i, member in enumerate(members)}
+        self._world = world
+        self.records_since_compaction = replayed_records
+        self.attached = True
+        change_tracker.clear()
+
+    def write_snapshot(self, sects, members, world=None):
+        """
+        Rewrite the full snapshot and truncate the log (compaction)
+
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            world (dict, optional): Game state saved with the world
+        """
+        if self.writer is not None:
+            self.writer(self.filename, sects, members, world)
+        else:
+            write_json_atomic(self.filename, {
+                "schema": SCHEMA_VERSION,
+                "world": world,
+                "sects": [sect.to_dict() for sect in sects],
+                "members": [member.to_dict() for member in members]
+            })
+
+        # The snapshot now contains everything, so the old log is obsolete
+        if os.path.exists(self.log_filename):
+            os.remove(self.log_filename)
+
+        self.attach(sects, members, world=world)
+
+    def append_changes(self, sects, members, world=None):
+        """
+        Append delta records for new and modified entities
+
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            world (dict, optional): Game state saved with the world
+
+        Returns:
+            int: Number of records written
+        """
+        records = []
+
+        # Entities created since the last save sit at the end of the lists
+        for i in range(len(self._sect_positions), len(sects)):
+            self._sect_positions[id(sects[i])] = i
+        for i in range(len(self._member_positions), len(members)):
+            self._member_positions[id(members[i])] = i
+
+        for entity in change_tracker.drain():
+            if id(entity) in self._member_positions:
+                records.append({
+                    "type": "member",
+                    "index": self._member_positions[id(entity)],
+                    "data": entity.to_dict()
+                })
+            elif id(entity) in self._sect_positions:
+                records.append({
+                    "type": "sect",
+                    "index": self._sect_positions[id(entity)],
+                    "data": entity.to_dict()
+                })
+            # Anything else is not part of this world (e.g. a discarded candidate)
+
+        if world is not None and world != self._world:
+            records.append({"type": "world", "index": 0, "data": world})
+            self._world = world
+
+        if not records:
+            return 0
+
+        with open(self.log_filename, 'a') as file:
+            file.write("".join(json.dumps(record) + "\n" for record in records))
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.records_since_compaction += len(records)
+        if self.records_since_compaction >= self.compact_every:
+            self.write_snapshot(sects, members, self._world)
+
+        return len(records)
+
+    def save(self, sects, members, world=None):
+        """
+        Persist the world, appending to the log when a snapshot is attached
+
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            world (dict, optional): Game state saved with the world
+        """
+        if not self.attached:
+            self.write_snapshot(sects, members, world)
+        else:
+            self.append_changes(sects, members, world)
+
+    def replay(self, data):
+        """
+        Apply the log on top of raw snapshot data
+
+        Args:
+            data (dict): Parsed snapshot with "sects" and "members" lists
+
+        Returns:
+            int: Number of records applied
+        """
+        changes, applied = self.read_log()
+        data["world"] = changes["world"].get(0, data.get("world"))
+        # Gaps can only come from a damaged log; patch_records drops them rather than crash on load
+        data["members"] = list(patch_records(data.get("members", []), changes["member"]))
+        data["sects"] = list(patch_records(data.get("sects", []), changes["sect"]))
+        return applied
+
+    def read_log(self):
+        """
+        Collect the latest logged record for every changed entity
+
+        Returns:
+            tuple: ({"member": {index: data}, "sect": {index: data},
+                    "world": {0: data}}, records read)
+        """
+        changes = {"member": {}, "sect": {}, "world": {}}
+        applied = 0
+        if not os.path.exists(self.log_filename):
+            return changes, applied
+
+        with open(self.log_filename, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write; everything before it is intact
+                    break
+                changes[record["type"]][record["index"]] = record["data"]
+                applied += 1
+
+        return changes, applied
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Lazy cultivation catch-up for idle disciples
+
+Disciples of sects the player is not managing need not be simulated month
+by month. Their state is left as it was at Member.last_turn and brought up
+to date when it is next needed, by jumping from one random event to the
+next instead of stepping through every month.
+
+Each monthly roll (attribute increase, deviation, automatic breakthrough
+attempt) is an independent trial, so the wait until the next success is
+geometric and can be drawn directly, while qi and breakthrough chance grow
+linearly (capped) in between. The result has the same distribution as
+monthly processing at a cost proportional to the number of events.
+"""
+
+import math
+from cultivation_methods import MONTHLY_METHODS
+from turn_engine import calculate_facility_bonus, calculate_manual_bonus
+
+
+# Monthly chance that a disciple with full qi attempts a breakthrough (as in the turn engines)
+AUTO_BREAKTHROUGH_CHANCE = 0.1
+
+NEVER = math.inf
+
+
+def _months_until(rng, chance):
+    """Months until the first success of a monthly trial (1 = this coming month)"""
+    if chance <= 0:
+        return NEVER
+    if chance >= 1:
+        return 1
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - chance)) + 1
+
+
+def _deviation_chance(member, effects, manual_bonus):
+    # Deviation roll, then a comprehension check that must fail
+    return min(1.0, effects.deviation_chance / manual_bonus) * max(0.0, 1.0 - member.comprehension / 100)
+
+
+def catch_up(member, months, rng, sect=None):
+    """
+    Apply several months of automatic cultivation without stepping month by month
+
+    Sect bonuses are taken from the sect's current facilities and manuals
+    for the whole period.
+
+    Args:
+        member: Member to advance
+        months (int): Months of cultivation to apply
+        rng (random.Random): Random stream to draw from
+        sect (Sect, optional): Sect providing bonuses (defaults to the member's sect)
+
+    Returns:
+        list: Breakthrough events, each with the month (1-based) it happened in
+    """
+    events = []
+    if months <= 0 or member.status not in ['active', None]:
+        return events
+
+    method = member.assigned_cultivation_method or "qi_circulation"
+    effects = MONTHLY_METHODS.get(method)
+    if effects is None:  # Monthly cultivation fails without changes for unknown methods
+        return events
+
+    sect = sect or member.sect
+    facility_bonus = calculate_facility_bonus(sect) if sect else 1.0
+    manual_bonus = calculate_manual_bonus(sect, method) if sect else 1.0
+    resource_bonus = 1.0 + member.allocated_resources * 0.1
+    breakthrough_step = effects.breakthrough_increase * facility_bonus * manual_bonus
+    attribute_chance = effects.attribute_chance if effects.apply_attribute is not None else 0
+
+    month = 0
+    while month < months:
+        qi_step = member.spiritual * (1 + member.realm * 0.5) * effects.qi_factor * facility_bonus * manual_bonus * resource_bonus
+        deviation_chance = _deviation_chance(member, effects, manual_bonus)
+
+        # Next month in which each kind of event happens
+        next_attribute = _months_until(rng, attribute_chance)
+        next_deviation = _months_until(rng, deviation_chance)
+        next_attempt = NEVER
+        if member.bottleneck == "none":
+            if member.qi >= member.max_qi:
+                months_to_full = 1
+            elif qi_step > 0:
+                months_to_full = math.ceil((member.max_qi - member.qi) / qi_step)
+            else:
+                months_to_full = NEVER
+            next_attempt = months_to_full - 1 + _months_until(rng, AUTO_BREAKTHROUGH_CHANCE)
+
+        step = min(next_attribute, next_deviation, next_attempt, months - month)
+
+        # Steady growth up to and including the event month
+        member.qi = min(member.qi + qi_step * step, member.max_qi)
+        member.breakthrough_chance = min(member.breakthrough_chance + breakthrough_step * step, 99)
+        month += step
+
+        # Resolve the month's events in the same order as monthly processing
+        if step == next_attribute:
+            effects.apply_attribute(member, effects.attribute_increase, rng)
+
+        if step == next_deviation:
+            # Higher comprehension after this month's increase lowers the chance; thin the event to match
+            if rng.random() * deviation_chance < _deviation_chance(member, effects, manual_bonus):
+                member.qi -= member.qi * rng.uniform(0.1, 0.3)
+
+        if step == next_attempt and member.qi >= member.max_qi and member.bottleneck == "none":
+            breakthrough_result = member.attempt_breakthrough(rng)
+            if breakthrough_result["success"]:
+                events.append({
+                    "type": "breakthrough",
+                    "disciple_id": member.id,
+                    "name": member.name,
+                    "message": breakthrough_result["message"],
+                    "new_realm": member.realm,
+                    "new_stage": member.get_stage_name(),
+                    "month": month
+                })
+
+    return events
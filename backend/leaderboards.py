@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Leaderboards for the Sectomie system
+
+Disciple rankings read the sorted orders kept by DiscipleIndex. Sect
+rankings keep one sorted list per metric; a mutation only marks the sect it
+touched (directly or through one of its disciples) and only those sects are
+re-ranked when a leaderboard is next read.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+from change_tracker import change_tracker
+from disciple_index import SORTS
+from sect import Sect
+
+
+# Metric name -> function computing a sect's score
+SECT_METRICS = {
+    "total_power": lambda sect: sect.get_total_power(),
+    "average_power": lambda sect: sect.get_average_power(),
+    "disciples": lambda sect: len(sect.members),
+    "spirit_stones": lambda sect: sect.spirit_stones,
+    "reputation": lambda sect: sect.reputation,
+    "influence": lambda sect: sect.sect_influence,
+    "tier": lambda sect: sect.tier
+}
+
+
+def top_disciples(index, by="combat_power", count=10, filters=None):
+    """
+    Rank disciples by one of the DiscipleIndex orders
+
+    Args:
+        index (DiscipleIndex): Index over the disciples
+        by (str): Sort name from disciple_index.SORTS
+        count (int): Number of disciples to return
+        filters (dict, optional): DiscipleIndex filters, e.g. {"sect": sect}
+
+    Returns:
+        list: (member, score) pairs, highest first
+
+    Raises:
+        ValueError: For an unknown ranking
+    """
+    if by not in SORTS:
+        raise ValueError(f"Unknown ranking '{by}'")
+    members, _, _ = index.query(filters, sort=by, descending=True, limit=count)
+    score = SORTS[by]
+    return [(member, score(member)) for member in members]
+
+
+class SectLeaderboard:
+    """
+    Sorted sect rankings for every metric in SECT_METRICS
+    """
+
+    def __init__(self, sects):
+        """
+        Initialize the rankings and start following mutations
+
+        Args:
+            sects (list): List of Sect objects; a sect's position is its ID
+        """
+        self._stale = {}  # id(sect) -> sect changed since the last refresh
+        self._lock = threading.RLock()  # Serializes re-ranking between request threads
+        change_tracker.add_listener(self._on_change)
+        self.rebuild(sects)
+
+    def close(self):
+        """Stop following mutations"""
+        change_tracker.remove_listener(self._on_change)
+
+    def _on_change(self, entity):
+        sect = entity if isinstance(entity, Sect) else getattr(entity, "sect", None)
+        if sect is not None:
+            self._stale[id(sect)] = sect
+
+    def rebuild(self, sects):
+        """
+        Rank a new list of sects from scratch
+
+        Args:
+            sects (list): List of Sect objects
+        """
+        with self._lock:
+            with change_tracker.lock:
+                self._stale = {}
+            self.sects = list(sects)
+            self._positions = {id(sect): position for position, sect in enumerate(self.sects)}
+            self._scores = {position: self._compute(sect) for position, sect in enumerate(self.sects)}
+            # Entries are (-score, sect ID) so the highest score comes first and ties go to the older sect
+            self._rankings = {
+                metric: sorted((-scores[i], position) for position, scores in self._scores.items())
+                for i, metric in enumerate(SECT_METRICS)
+            }
+
+    def refresh(self):
+        """Re-rank every sect changed since the last refresh"""
+        with self._lock:
+            with change_tracker.lock:
+                stale, self._stale = self._stale, {}
+            for key, sect in stale.items():
+                position = self._positions.get(key)
+                if position is None:
+                    continue
+                scores = self._compute(sect)
+                old_scores = self._scores[position]
+                if scores == old_scores:
+                    continue
+                for metric, old, new in zip(SECT_METRICS, old_scores, scores):
+                    if old != new:
+                        ranking = self._rankings[metric]
+                        del ranking[bisect_left(ranking, (-old, position))]
+                        insort(ranking, (-new, position))
+                self._scores[position] = scores
+
+    def _compute(self, sect):
+        return tuple(score(sect) for score in SECT_METRICS.values())
+
+    def top(self, by="total_power", count=10):
+        """
+        Get the highest ranked sects
+
+        Args:
+            by (str): Metric name from SECT_METRICS
+            count (int): Number of sects to return
+
+        Returns:
+            list: (sect ID, sect, score) tuples, highest first
+
+        Raises:
+            ValueError: For an unknown metric
+        """
+        if by not in SECT_METRICS:
+            raise ValueError(f"Unknown ranking '{by}'")
+        with self._lock:
+            self.refresh()
+            return [(position, self.sects[position], -score) for score, position in self._rankings[by][:count]]
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar world snapshots for the Sectomie system
+
+Every other snapshot format has to parse each record and build a Member
+before the app can serve anything. A mapped snapshot stores disciple fields
+as fixed-width little-endian columns that are mapped into memory (copy on
+write) and read in place, so loading one parses no disciple records:
+
+    b"SECTMMAP" | u32 header size | JSON header | padding | column data
+
+The JSON header holds the sect records, the game state saved alongside
+(see GameState.to_dict), a string table and the position of every column. Columns are:
+
+    number  int64 ("q") or float64 ("d") per disciple: id, age, attributes,
+            realm, realm_stage, qi, max_qi, breakthrough_chance, counters
+            (a column mixing ints and floats reads back as floats)
+    coded   u32 string table index per disciple: path, bottleneck state
+    list    u32 lengths + u32 string table indexes: techniques, treasures
+    sect    int32 position in the sect list (-1 for none)
+    records JSON object per disciple for the remaining fields (name,
+            last_turn, ...), decoded the first time one of them is read
+
+MappedWorld.member_table() wraps the columns in a MemberTable, whose views
+stand in for Member objects; values written through a view stay in this
+process (the file is never modified) and reach disk through the journal.
+Needs a POSIX system: compaction replaces the file while it is mapped.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from member import Member
+from member_table import MemberTable, NUMERIC_COLUMNS
+from schema import SCHEMA_VERSION
+
+
+MAGIC = b"SECTMMAP"
+VERSION = 1
+
+NUMBER_FIELDS = (
+    "id", "age", "physical", "spiritual", "comprehension", "realm", "realm_stage", "qi", "max_qi",
+    "spirit_stones", "breakthrough_chance", "elixirs_refined", "formations_mastered", "weapons_forged",
+    "missions_completed", "bottleneck_insights", "insights_required"
+)
+CODED_FIELDS = ("path", "bottleneck")
+LIST_FIELDS = ("techniques", "bottleneck_treasures")
+
+# Member fields no snapshot stores
+RUNTIME_FIELDS = ("sect", "status", "assigned_cultivation_method", "allocated_resources")
+
+_ALIGNMENT = 8
+_NO_SECT = -1
+
+
+def is_world_mapped(filename):
+    """Check whether a file starts with the mapped snapshot magic"""
+    with open(filename, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _le_bytes(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_world_mapped(filename, sects, members, world=None):
+    """
+    Write a world as a mapped snapshot, replacing the file atomically
+
+    Args:
+        filename (str): Path of the snapshot
+        sects (list): List of Sect objects
+        members (list): List of Member objects (or views)
+        world (dict, optional): Game state saved with the world
+    """
+    sect_records = [sect.to_dict() for sect in sects]
+    sect_positions = {}
+    for position, record in enumerate(sect_records):
+        sect_positions.setdefault(record["name"], position)
+
+    # Gather every field column by column, one member dict at a time
+    values_by_name = {}
+    for member in members:
+        record = member.to_dict()
+        if not values_by_name:
+            values_by_name = {name: [] for name in record}
+        for name, values in values_by_name.items():
+            values.append(record.get(name))
+
+    strings = {}
+
+    def code(value):
+        return strings.setdefault(value, len(strings))
+
+    columns = []  # (name, kind, typecode, data)
+    handled = set()
+    for name in NUMBER_FIELDS:
+        values = values_by_name.get(name)
+        if values is None:
+            continue
+        types = set(map(type, values))
+        if types <= {int}:
+            columns.append((name, "number", "q", _le_bytes("q", values)))
+        elif types <= {int, float}:
+            columns.append((name, "number", "d", _le_bytes("d", values)))
+        else:
+            continue  # Kept in the per-disciple records
+        handled.add(name)
+    for name in CODED_FIELDS:
+        values = values_by_name.get(name)
+        if values is not None and set(map(type, values)) <= {str}:
+            columns.append((name, "coded", "I", _le_bytes("I", [code(value) for value in values])))
+            handled.add(name)
+    for name in LIST_FIELDS:
+        values = values_by_name.get(name)
+        if values is not None and all(type(value) is list and all(type(item) is str for item in value) for value in values):
+            data = (_le_bytes("I", [len(value) for value in values])
+                    + _le_bytes("I", [code(item) for value in values for item in value]))
+            columns.append((name, "list", "I", data))
+            handled.add(name)
+    sect_names = values_by_name.get("sect")
+    if sect_names is not None and all(name is None or name in sect_positions for name in sect_names):
+        positions = [_NO_SECT if name is None else sect_positions[name] for name in sect_names]
+        columns.append(("sect", "sect", "i", _le_bytes("i", positions)))
+        handled.add("sect")
+
+    # Whatever is left goes into one JSON object per disciple
+    rest = [name for name in values_by_name if name not in handled]
+    encoded = [json.dumps({name: values_by_name[name][row] for name in rest}).encode("utf-8")
+               for row in range(len(members))]
+    offsets = [0]
+    for record in encoded:
+        offsets.append(offsets[-1] + len(record))
+    columns.append(("records", "records", "q", _le_bytes("q", offsets) + b"".join(encoded)))
+    del values_by_name, encoded
+
+    # Lay the columns out back to back, each aligned for in-place reads
+    layout = []
+    position = 0
+    for name, kind, typecode, data in columns:
+        layout.append([name, kind, typecode, position, len(data)])
+        position += len(data) + (-len(data) % _ALIGNMENT)
+    header = json.dumps({
+        "version": VERSION,
+        "schema": SCHEMA_VERSION,
+        "world": world,
+        "members": len(members),
+        "sects": sect_records,
+        "strings": list(strings),
+        "columns": layout
+    }).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % _ALIGNMENT)
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'wb') as file:
+        file.write(prefix)
+        for _, _, _, data in columns:
+            file.write(data)
+            file.write(b"\0" * (-len(data) % _ALIGNMENT))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+class MappedColumn:
+    """
+    A number column read in place from the mapping
+
+    Rows appended after loading, and values the mapped type cannot hold
+    (e.g. a fraction in an integer column), are kept in Python objects.
+    """
+
+    __slots__ = ("base", "count", "overrides", "tail")
+
+    def __init__(self, base):
+        self.base = base
+        self.count = len(base)
+        self.overrides = {}  # row -> value that does not fit the mapped type
+        self.tail = []  # Rows appended after loading
+
+    def __getitem__(self, row):
+        if row < self.count:
+            if self.overrides and row in self.overrides:
+                return self.overrides[row]
+            return self.base[row]
+        return self.tail[row - self.count]
+
+    def __setitem__(self, row, value):
+        if row >= self.count:
+            self.tail[row - self.count] = value
+            return
+        try:
+            if type(value) is float and self.base.format == "q":
+                raise TypeError
+            self.base[row] = value
+            if self.overrides:
+                self.overrides.pop(row, None)
+        except TypeError:
+            self.overrides[row] = value
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def __len__(self):
+        return self.count + len(self.tail)
+
+    def gather(self, rows):
+        """
+        Read many rows at once as a NumPy array, straight from the mapping
+
+        Args:
+            rows (numpy.ndarray): Row positions
+
+        Returns:
+            numpy.ndarray: float64 values
+        """
+        in_base = rows < self.count
+        values = np.empty(len(rows), dtype=np.float64)
+        mapped = np.frombuffer(self.base, dtype="<i8" if self.base.format == "q" else "<f8")
+        values[in_base] = mapped[rows[in_base]]
+        if self.overrides or not in_base.all():
+            for i in np.flatnonzero(~in_base | np.isin(rows, list(self.overrides))).tolist():
+                values[i] = self[int(rows[i])]
+        return values
+
+
+class CodedColumn:
+    """A string column decoded through the string table on access"""
+
+    __slots__ = ("codes", "strings", "count", "overrides", "tail")
+
+    def __init__(self, codes, strings):
+        self.codes = codes
+        self.strings = strings
+        self.count = len(codes)
+        self.overrides = {}
+        self.tail = []
+
+    def __getitem__(self, row):
+        if row < self.count:
+            if self.overrides and row in self.overrides:
+                return self.overrides[row]
+            return self.strings[self.codes[row]]
+        return self.tail[row - self.count]
+
+    def __setitem__(self, row, value):
+        if row < self.count:
+            self.overrides[row] = value
+        else:
+            self.tail[row - self.count] = value
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def __len__(self):
+        return self.count + len(self.tail)
+
+
+class ListColumn(CodedColumn):
+    """A string-list column; each list is built once, on first access, so in-place edits stick"""
+
+    __slots__ = ("starts",)
+
+    def __init__(self, lengths, codes, strings):
+        super().__init__(codes, strings)
+        self.count = len(lengths)
+        self.starts = array("q", accumulate(lengths, initial=0))
+
+    def __getitem__(self, row):
+        if row < self.count:
+            value = self.overrides.get(row)
+            if value is None:
+                strings = self.strings
+                value = self.overrides[row] = [strings[code] for code in self.codes[self.starts[row]:self.starts[row + 1]]]
+            return value
+        return self.tail[row - self.count]
+
+
+class RecordColumn:
+    """One field of the per-disciple JSON records"""
+
+    __slots__ = ("records", "field")
+
+    def __init__(self, records, field):
+        self.records = records
+        self.field = field
+
+    def __getitem__(self, row):
+        return self.records.get(row).get(self.field)
+
+    def __setitem__(self, row, value):
+        self.records.get(row)[self.field] = value
+
+    def append(self, value):
+        self.records.append_field(self.field, value)
+
+    def __len__(self):
+        return len(self.records)
+
+
+class _Records:
+    """The per-disciple JSON records, decoded row by row as they are read"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self.count = len(offsets) - 1
+        self.decoded = {}
+        self.tail = []  # Rows appended after loading, one dict each
+
+    def get(self, row):
+        if row >= self.count:
+            return self.tail[row - self.count]
+        record = self.decoded.get(row)
+        if record is None:
+            record = self.decoded[row] = json.loads(bytes(self.data[self.offsets[row]:self.offsets[row + 1]]))
+        return record
+
+    def append_field(self, field, value):
+        # MemberTable.append fills every column of the new row in turn
+        if not self.tail or field in self.tail[-1]:
+            self.tail.append({})
+        self.tail[-1][field] = value
+
+    def __len__(self):
+        return self.count + len(self.tail)
+
+
+class MappedWorld:
+    """
+    Records of a mapped snapshot, read the same way as a WorldStreamReader
+
+    members() yields (view, sect name) pairs instead of dicts: the views
+    come from member_table() and read their fields from the mapping, so no
+    per-disciple work happens until a field is used. Snapshots from an
+    older schema yield plain records instead, to be migrated and loaded
+    like any other format. The mapping stays
+    open as long as any view into it is alive.
+    """
+
+    def __init__(self, filename):
+        """
+        Map a snapshot
+
+        Args:
+            filename (str): Path of the snapshot
+
+        Raises:
+            ValueError: If the file is not a snapshot this version can read
+        """
+        if sys.byteorder == "big":
+            raise ValueError("Mapped snapshots are little-endian and cannot be mapped on this machine")
+        with open(filename, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a Sectomie mapped snapshot")
+            (header_size,) = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(header_size))
+            if header["version"] > VERSION:
+                raise ValueError(f"Mapped snapshot version {header['version']} is newer than this version ({VERSION})")
+            # ACCESS_COPY: writes land in private pages and never reach the file
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        data_start = len(MAGIC) + 4 + header_size
+        data_start += -data_start % _ALIGNMENT
+        memory = memoryview(self._map)
+        self._strings = header["strings"]
+        self._sect_records = header["sects"]
+        self._columns = {
+            name: (kind, memory[data_start + offset:data_start + offset + size], typecode)
+            for name, kind, typecode, offset, size in header["columns"]
+        }
+        count = header["members"]
+        _, data, _ = self._columns["records"]
+        self._records = _Records(data[:(count + 1) * 8].cast("q"), data[(count + 1) * 8:])
+        self.header = {
+            "format": "mapped",
+            "version": header["version"],
+            "schema": header.get("schema", 0),
+            "world": header.get("world"),
+            "sects": len(self._sect_records),
+            "members": count
+        }
+
+    def sects(self):
+        """Yield the sect records"""
+        return iter(self._sect_records)
+
+    def members(self):
+        """Yield a (view, sect name) pair per disciple"""
+        table = self.member_table()
+        sect = self._columns.get("sect")
+        if sect is None:
+            # Sect names the writer could not resolve are kept in the records
+            sect_names = (self._records.get(row).get("sect") for row in range(len(table)))
+        else:
+            names = [record["name"] for record in self._sect_records]
+            sect_names = (None if position == _NO_SECT else names[position] for position in sect[1].cast("i"))
+        if self.header["schema"] < SCHEMA_VERSION:
+            # Views only have current fields; hand out what was stored so it can be migrated
+            return (dict(self._stored_record(table, view._row), sect=sect_name)
+                    for view, sect_name in zip(table.views, sect_names))
+        return zip(table.views, sect_names)
+
+    def _stored_record(self, table, row):
+        record = dict(self._records.get(row))
+        for name in self._columns:
+            if name not in ("records", "sect"):
+                record[name] = table.columns[name][row]
+        return record
+
+    def member_table(self):
+        """
+        Wrap the mapped columns in a MemberTable
+
+        Returns:
+            MemberTable: One view per disciple, in save order
+        """
+        count = self.header["members"]
+        columns = {}
+        for field in Member.__slots__:
+            kind, data, typecode = self._columns.get(field, (None, None, None))
+            if kind == "number":
+                columns[field] = MappedColumn(data.cast(typecode))
+            elif kind == "coded":
+                columns[field] = CodedColumn(data.cast("I"), self._strings)
+            elif kind == "list":
+                columns[field] = ListColumn(data[:count * 4].cast("I"), data[count * 4:].cast("I"), self._strings)
+            elif field == "allocated_resources":
+                columns[field] = array(NUMERIC_COLUMNS[field], bytes(8 * count))
+            elif field in RUNTIME_FIELDS:
+                columns[field] = [None] * count  # Not saved; the loader links sects
+            else:
+                columns[field] = RecordColumn(self._records, field)
+        return MemberTable.from_columns(columns, count)
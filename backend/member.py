@@ -4,13 +4,45 @@ Cultivator class for the Sectomie cultivation system
 """
 
 import random
+from change_tracker import change_tracker
+from cultivation_methods import CATALOG, SESSION_METHODS, MONTHLY_METHODS
+
 
 class Member:
     """
     Represents a cultivator in the sect with cultivation attributes
     """
     
-    def __init__(self, name, age, path, physical, spiritual, comprehension):
+    # Every field is declared up front so disciples carry no per-instance __dict__
+    __slots__ = (
+        "id", "name", "age", "path", "physical", "spiritual", "comprehension", "sect",
+        "realm", "realm_stage", "qi", "max_qi", "techniques", "spirit_stones",
+        "breakthrough_chance", "elixirs_refined", "formations_mastered", "weapons_forged",
+        "bottleneck", "bottleneck_insights", "insights_required", "bottleneck_treasures",
+        "status", "assigned_cultivation_method", "allocated_resources", "missions_completed",
+        "last_turn"
+    )
+    
+    # Next unused disciple ID; IDs are never reused within a process
+    _next_id = 0
+    
+    @classmethod
+    def _assign_id(cls, member_id=None):
+        """
+        Allocate a new disciple ID, or reserve an existing one loaded from a save
+        
+        Args:
+            member_id (int, optional): Existing ID to keep
+            
+        Returns:
+            int: The disciple ID
+        """
+        if member_id is None:
+            member_id = cls._next_id
+        cls._next_id = max(cls._next_id, member_id + 1)
+        return member_id
+    
+    def __init__(self, name, age, path, physical, spiritual, comprehension, member_id=None):
         """
         Initialize a new Cultivator
         
@@ -21,7 +53,10 @@ class Member:
             physical (int): Physical foundation attribute (0-100)
             spiritual (int): Spiritual sensitivity attribute (0-100)
             comprehension (int): Dao comprehension attribute (0-100)
+            member_id (int, optional): Stable disciple ID (a new one is allocated if omitted;
+                                       loaders reserve given IDs with _assign_id)
         """
+        self.id = Member._assign_id() if member_id is None else member_id
         self.name = name
         self.age = age
         self.path = path
@@ -48,6 +83,24 @@ class Member:
         self.insights_required = 0  # Insights needed to overcome current bottleneck
         self.bottleneck_treasures = []  # Special items for overcoming major bottlenecks
         
+        # Sect management
+        self.status = None  # None or "active" takes part in monthly cultivation; anything else (e.g. "seclusion") skips it
+        self.assigned_cultivation_method = None  # Monthly cultivation method (None means qi_circulation)
+        self.allocated_resources = 0  # Spirit stones allocated per month, +10% qi gain each
+        self.missions_completed = 0
+        self.last_turn = None  # Turn the state was last brought up to date for lazily cultivated disciples (None = processed every turn)
+        
+    def __setattr__(self, name, value):
+        """Assign an attribute and flag the cultivator as changed for persistence"""
+        object.__setattr__(self, name, value)
+        change_tracker.mark(self)
+    
+    def mark_dirty(self):
+        """Flag the cultivator as changed after an in-place mutation (e.g. techniques.append) and recount its power"""
+        change_tracker.mark(self)
+        if self.sect is not None:
+            self.sect.power_stats.update(self)
+        
     def _validate_stat(self, value):
         """Ensure stats are within the valid range (0-100)"""
         return max(0, min(100, value))
@@ -69,17 +122,20 @@ class Member:
         # Return qi gained
         return qi_gain
         
-    def cultivate_with_method(self, method, sect=None):
+    def cultivate_with_method(self, method, sect=None, rng=None):
         """
         Cultivate using a specific method
         
         Args:
             method (str): Cultivation method to use
             sect (Sect, optional): The sect object for resource verification
+            rng (random.Random, optional): Random stream to draw from (defaults to the global random module)
             
         Returns:
             dict: Results of the cultivation session
         """
+        rng = rng or random
+        
         results = {
             "qi_gained": 0,
             "breakthrough_increase": 0,
@@ -90,77 +146,33 @@ class Member:
             "message": ""
         }
         
-        # Define base effects for different methods
-        method_effects = {
-            "qi_circulation": {
-                "qi_multiplier": 1.0,
-                "breakthrough_increase": 1.0,
-                "attribute_chance": 0,
-                "deviation_chance": 0
-            },
-            "essence_refinement": {
-                "qi_multiplier": 2.0,
-                "breakthrough_increase": 2.0,
-                "attribute_chance": 0,
-                "deviation_chance": 0
-            },
-            "dao_heart_tempering": {
-                "qi_multiplier": 3.0,
-                "breakthrough_increase": 4.0,
-                "attribute_chance": 0.15,  # 15% chance to improve comprehension
-                "attribute": "comprehension",
-                "attribute_increase": 1,
-                "deviation_chance": 0.02  # 2% chance of deviation
-            },
-            "heavenly_tribulation": {
-                "qi_multiplier": 1.5,
-                "breakthrough_increase": 10.0,
-                "attribute_chance": 0,
-                "deviation_chance": 0.1  # 10% chance of deviation
-            }
-        }
-        
         # Check if method exists
-        if method not in method_effects:
+        effects = SESSION_METHODS.get(method)
+        if effects is None:
             results["success"] = False
             results["message"] = "Unknown cultivation method"
             return results
-            
-        effects = method_effects[method]
         
-        # Calculate qi gain based on method
-        base_qi_gain = (self.spiritual / 10) * (1 + self.realm * 0.5) * 24  # Base is 24 hours
-        qi_gain = base_qi_gain * effects["qi_multiplier"]
+        # Calculate qi gain based on method (base is 24 hours)
+        qi_gain = self.spiritual * (1 + self.realm * 0.5) * effects.qi_factor
         self.qi = min(self.qi + qi_gain, self.max_qi)
         results["qi_gained"] = qi_gain
         
         # Calculate breakthrough chance increase
-        breakthrough_increase = effects["breakthrough_increase"]
+        breakthrough_increase = effects.breakthrough_increase
         self.breakthrough_chance = min(self.breakthrough_chance + breakthrough_increase, 99)
         results["breakthrough_increase"] = breakthrough_increase
         
         # Check for attribute increase
-        if "attribute" in effects and random.random() < effects["attribute_chance"]:
-            attribute = effects["attribute"]
-            increase = effects["attribute_increase"]
-            
-            if attribute == "physical":
-                self.physical = min(self.physical + increase, 100)
-                results["attribute_increase"] = "physical"
-                results["attribute_value"] = self.physical
-            elif attribute == "spiritual":
-                self.spiritual = min(self.spiritual + increase, 100)
-                results["attribute_increase"] = "spiritual"
-                results["attribute_value"] = self.spiritual
-            elif attribute == "comprehension":
-                self.comprehension = min(self.comprehension + increase, 100)
-                results["attribute_increase"] = "comprehension"
-                results["attribute_value"] = self.comprehension
+        if effects.apply_attribute is not None and rng.random() < effects.attribute_chance:
+            attribute, value = effects.apply_attribute(self, effects.attribute_increase, rng)
+            results["attribute_increase"] = attribute
+            results["attribute_value"] = value
                 
         # Check for cultivation deviation
-        if random.random() < effects["deviation_chance"]:
+        if rng.random() < effects.deviation_chance:
             # Higher comprehension reduces deviation chance
-            if random.random() * 100 > self.comprehension:
+            if rng.random() * 100 > self.comprehension:
                 results["cultivation_deviation"] = True
                 # Reduce qi by 20%
                 qi_loss = self.qi * 0.2
@@ -169,7 +181,7 @@ class Member:
         
         return results
     
-    def calculate_monthly_cultivation(self, assigned_method=None, facility_bonus=1.0, manual_bonus=1.0, resource_bonus=1.0):
+    def calculate_monthly_cultivation(self, assigned_method=None, facility_bonus=1.0, manual_bonus=1.0, resource_bonus=1.0, rng=None):
         """
         Calculate monthly automatic cultivation progress based on the assigned method and bonuses
         
@@ -178,10 +190,13 @@ class Member:
             facility_bonus (float, optional): Bonus from sect facilities (1.0 = no bonus)
             manual_bonus (float, optional): Bonus from technique manuals (1.0 = no bonus)
             resource_bonus (float, optional): Bonus from allocated resources (1.0 = no bonus)
+            rng (random.Random, optional): Random stream to draw from (defaults to the global random module)
             
         Returns:
             dict: Results of the monthly cultivation progress
         """
+        rng = rng or random
+        
         results = {
             "qi_gained": 0,
             "breakthrough_increase": 0,
@@ -196,128 +211,45 @@ class Member:
         if not assigned_method:
             assigned_method = "qi_circulation"
         
-        # Define base effects for different methods
-        method_effects = {
-            "qi_circulation": {
-                "qi_multiplier": 1.0,
-                "breakthrough_increase": 1.0,
-                "attribute_chance": 0.05,  # 5% chance to improve physical
-                "attribute": "physical",
-                "attribute_increase": 1,
-                "deviation_chance": 0.01,  # 1% chance of deviation
-                "description": "A balanced method focusing on steady qi accumulation"
-            },
-            "essence_refinement": {
-                "qi_multiplier": 1.5,
-                "breakthrough_increase": 1.2,
-                "attribute_chance": 0.08,  # 8% chance to improve spiritual
-                "attribute": "spiritual",
-                "attribute_increase": 1,
-                "deviation_chance": 0.03,  # 3% chance of deviation
-                "description": "Focuses on refining spiritual essence, increasing qi gain but with higher deviation risk"
-            },
-            "dao_heart_tempering": {
-                "qi_multiplier": 0.8,
-                "breakthrough_increase": 2.0,
-                "attribute_chance": 0.15,  # 15% chance to improve comprehension
-                "attribute": "comprehension",
-                "attribute_increase": 1,
-                "deviation_chance": 0.02,  # 2% chance of deviation
-                "description": "Focuses on understanding the Dao, improving breakthrough chance and comprehension at the cost of slower qi accumulation"
-            },
-            "foundation_building": {
-                "qi_multiplier": 0.7,
-                "breakthrough_increase": 1.5,
-                "attribute_chance": 0.1,  # 10% chance to improve all attributes slightly
-                "attribute": "all",
-                "attribute_increase": 0.5,
-                "deviation_chance": 0.005,  # 0.5% chance of deviation
-                "description": "A slow but safe method that builds a solid foundation and reduces deviation chance"
-            },
-            "heavenly_tribulation": {
-                "qi_multiplier": 2.0,
-                "breakthrough_increase": 3.0,
-                "attribute_chance": 0.2,  # 20% chance to improve random attribute
-                "attribute": "random",
-                "attribute_increase": 2,
-                "deviation_chance": 0.15,  # 15% chance of deviation
-                "description": "A dangerous but powerful method that greatly accelerates cultivation at the risk of severe deviation"
-            }
-        }
-        
         # Check if method exists
-        if assigned_method not in method_effects:
+        effects = MONTHLY_METHODS.get(assigned_method)
+        if effects is None:
             results["success"] = False
             results["message"] = "Unknown cultivation method"
             return results
-            
-        effects = method_effects[assigned_method]
         
-        # Calculate monthly qi gain based on method and bonuses
-        base_qi_gain = (self.spiritual / 10) * (1 + self.realm * 0.5) * 30  # Base for 30 days
-        qi_gain = base_qi_gain * effects["qi_multiplier"] * facility_bonus * manual_bonus * resource_bonus
+        # Calculate monthly qi gain based on method and bonuses (base is 30 days)
+        qi_gain = self.spiritual * (1 + self.realm * 0.5) * effects.qi_factor * facility_bonus * manual_bonus * resource_bonus
         
         # Apply the qi gain
         self.qi = min(self.qi + qi_gain, self.max_qi)
         results["qi_gained"] = qi_gain
         
         # Calculate breakthrough chance increase with bonuses
-        breakthrough_increase = effects["breakthrough_increase"] * facility_bonus * manual_bonus
+        breakthrough_increase = effects.breakthrough_increase * facility_bonus * manual_bonus
         self.breakthrough_chance = min(self.breakthrough_chance + breakthrough_increase, 99)
         results["breakthrough_increase"] = breakthrough_increase
         
         # Check for attribute increase
-        if random.random() < effects["attribute_chance"]:
-            attribute = effects["attribute"]
-            increase = effects["attribute_increase"]
-            
-            if attribute == "physical":
-                self.physical = min(self.physical + increase, 100)
-                results["attribute_increase"] = "physical"
-                results["attribute_value"] = self.physical
-            elif attribute == "spiritual":
-                self.spiritual = min(self.spiritual + increase, 100)
-                results["attribute_increase"] = "spiritual"
-                results["attribute_value"] = self.spiritual
-            elif attribute == "comprehension":
-                self.comprehension = min(self.comprehension + increase, 100)
-                results["attribute_increase"] = "comprehension"
-                results["attribute_value"] = self.comprehension
-            elif attribute == "all":
-                self.physical = min(self.physical + increase, 100)
-                self.spiritual = min(self.spiritual + increase, 100)
-                self.comprehension = min(self.comprehension + increase, 100)
-                results["attribute_increase"] = "all"
-            elif attribute == "random":
-                # Choose a random attribute to increase
-                random_attr = random.choice(["physical", "spiritual", "comprehension"])
-                if random_attr == "physical":
-                    self.physical = min(self.physical + increase, 100)
-                    results["attribute_increase"] = "physical"
-                    results["attribute_value"] = self.physical
-                elif random_attr == "spiritual":
-                    self.spiritual = min(self.spiritual + increase, 100)
-                    results["attribute_increase"] = "spiritual"
-                    results["attribute_value"] = self.spiritual
-                elif random_attr == "comprehension":
-                    self.comprehension = min(self.comprehension + increase, 100)
-                    results["attribute_increase"] = "comprehension"
-                    results["attribute_value"] = self.comprehension
+        if effects.apply_attribute is not None and rng.random() < effects.attribute_chance:
+            attribute, value = effects.apply_attribute(self, effects.attribute_increase, rng)
+            results["attribute_increase"] = attribute
+            results["attribute_value"] = value
                 
         # Check for cultivation deviation (reduced by comprehension and manual_bonus)
-        deviation_chance = effects["deviation_chance"] / manual_bonus  # Better manuals reduce deviation
-        if random.random() < deviation_chance:
+        deviation_chance = effects.deviation_chance / manual_bonus  # Better manuals reduce deviation
+        if rng.random() < deviation_chance:
             # Higher comprehension reduces deviation chance
-            if random.random() * 100 > self.comprehension:
+            if rng.random() * 100 > self.comprehension:
                 results["cultivation_deviation"] = True
                 # Reduce qi by 10-30% based on severity
-                severity = random.uniform(0.1, 0.3)
+                severity = rng.uniform(0.1, 0.3)
                 qi_loss = self.qi * severity
                 self.qi -= qi_loss
                 results["message"] = f"Cultivation deviation occurred! Lost {int(severity * 100)}% of accumulated qi."
         
         # Add method description to results
-        results["method_description"] = effects["description"]
+        results["method_description"] = effects.description
         
         return results
 
@@ -328,89 +260,32 @@ class Member:
         Returns:
             dict: Dictionary of available methods with their effectiveness ratings
         """
-        # Ensure attributes are initialized
-        if not hasattr(self, 'physical') or not hasattr(self, 'spiritual') or not hasattr(self, 'comprehension'):
-            # Set default values if attributes are missing
-            if not hasattr(self, 'physical'):
-                self.physical = 50
-            if not hasattr(self, 'spiritual'):
-                self.spiritual = 50
-            if not hasattr(self, 'comprehension'):
-                self.comprehension = 50
-        
-        # Ensure realm is initialized
-        if not hasattr(self, 'realm'):
-            self.realm = 0
-        
-        methods = {
-            "qi_circulation": {
-                "name": "Qi Circulation",
-                "description": "A balanced method focusing on steady qi accumulation",
-                "effectiveness": 3,  # 1-5 scale
-                "recommended_for": "beginners"
-            },
-            "essence_refinement": {
-                "name": "Essence Refinement",
-                "description": "Focuses on refining spiritual essence, increasing qi gain but with higher deviation risk",
-                "effectiveness": 3,  # Base effectiveness
-                "recommended_for": "disciples with high spiritual attribute"
-            },
-            "dao_heart_tempering": {
-                "name": "Dao Heart Tempering",
-                "description": "Focuses on understanding the Dao, improving breakthrough chance and comprehension",
-                "effectiveness": 3,  # Base effectiveness
-                "recommended_for": "disciples approaching breakthrough"
-            },
-            "foundation_building": {
-                "name": "Foundation Building",
-                "description": "A slow but safe method that builds a solid foundation and reduces deviation chance",
-                "effectiveness": 3,  # Base effectiveness
-                "recommended_for": "disciples with balanced attributes"
-            }
-        }
-        
-        # Add heavenly tribulation method only for higher realms
-        if self.realm >= 3:  # Core Formation or higher
-            methods["heavenly_tribulation"] = {
-                "name": "Heavenly Tribulation",
-                "description": "A dangerous but powerful method that greatly accelerates cultivation at the risk of severe deviation",
-                "effectiveness": 3,  # Base effectiveness
-                "recommended_for": "advanced disciples with high comprehension"
-            }
-        
-        # Adjust effectiveness based on disciple attributes
-        for method_key, method_info in methods.items():
-            if method_key == "qi_circulation":
-                # Balanced method, effectiveness based on overall balance
-                balance = 100 - (abs(self.physical - self.spiritual) + abs(self.spiritual - self.comprehension) + abs(self.comprehension - self.physical)) / 3
-                methods[method_key]["effectiveness"] = min(5, max(1, int(balance / 20)))
-                
-            elif method_key == "essence_refinement":
-                # Effectiveness based on spiritual attribute
-                methods[method_key]["effectiveness"] = min(5, max(1, int(self.spiritual / 20)))
-                
-            elif method_key == "dao_heart_tempering":
-                # Effectiveness based on comprehension attribute
-                methods[method_key]["effectiveness"] = min(5, max(1, int(self.comprehension / 20)))
-                
-            elif method_key == "foundation_building":
-                # Effectiveness based on lowest attribute
-                lowest_attr = min(self.physical, self.spiritual, self.comprehension)
-                methods[method_key]["effectiveness"] = min(5, max(1, int(lowest_attr / 20)))
-                
-            elif method_key == "heavenly_tribulation":
-                # Effectiveness based on comprehension and current realm
-                methods[method_key]["effectiveness"] = min(5, max(1, int((self.comprehension + self.realm * 10) / 25)))
+        # Methods unlock by realm (e.g. Heavenly Tribulation needs Core Formation);
+        # effectiveness is rated from the disciple's attributes
+        methods = {}
+        for method_key, info in CATALOG.items():
+            if self.realm >= info.min_realm:
+                methods[method_key] = {
+                    "name": info.name,
+                    "description": info.description,
+                    "effectiveness": info.effectiveness(self),  # 1-5 scale
+                    "recommended_for": info.recommended_for
+                }
         
         return methods
         
-    def attempt_breakthrough(self):
+    def attempt_breakthrough(self, rng=None):
         """
         Attempt to break through to the next cultivation stage or realm
         
+        Args:
+            rng (random.Random, optional): Random stream to draw from (defaults to the global random module)
+            
         Returns:
             dict: Results of the breakthrough attempt including success status and realm information
         """
+        rng = rng or random
+        
         results = {
             "success": False,
             "realm": self.realm,
@@ -450,7 +325,7 @@ class Member:
             major_bottleneck_chance = 0  # Force to 0 for testing
         
         # Check for bottlenecks first
-        if random.random() < major_bottleneck_chance:
+        if rng.random() < major_bottleneck_chance:
             # Encounter major bottleneck
             self.bottleneck = "major"
             self.insights_required = 5 + (self.realm * 2)  # More insights needed at higher realms
@@ -465,7 +340,7 @@ class Member:
             results["message"] = f"You've encountered a major bottleneck! Your cultivation has reached a fundamental barrier. You need special treasures to overcome this and advance to the next realm."
             return results
         
-        elif random.random() < bottleneck_chance:
+        elif rng.random() < bottleneck_chance:
             # Encounter minor bottleneck
             self.bottleneck = "minor"
             self.insights_required = 3 + self.realm  # More insights needed at higher realms
@@ -514,13 +389,18 @@ class Member:
             results["message"] = "Breakthrough failed. Your foundation is not solid enough yet."
             return results
     
-    def meditate_for_insight(self):
+    def meditate_for_insight(self, rng=None):
         """
         Meditate to gain insights for overcoming minor bottlenecks
         
+        Args:
+            rng (random.Random, optional): Random stream to draw from (defaults to the global random module)
+            
         Returns:
             dict: Results of the meditation session
         """
+        rng = rng or random
+        
         results = {
             "success": False,
             "insights_gained": 0,
@@ -546,9 +426,9 @@ class Member:
         final_chance = insight_chance + technique_bonus
         
         # Determine insights gained
-        if random.random() < final_chance:
+        if rng.random() < final_chance:
             insights_gained = 1
-            if random.random() < (self.comprehension / 200):  # Chance for extra insight
+            if rng.random() < (self.comprehension / 200):  # Chance for extra insight
                 insights_gained += 1
                 
             self.bottleneck_insights += insights_gained
@@ -631,13 +511,16 @@ class Member:
         
         return results
     
-    def complete_mission(self, difficulty=1):
+    def complete_mission(self, difficulty=1, rng=None):
         """
         Complete a sect mission and gain resources
         
         Args:
             difficulty (int): Difficulty level of the mission (1-5)
+            rng (random.Random, optional): Random stream to draw from (defaults to the global random module)
         """
+        rng = rng or random
+        
         # Base rewards
         spirit_stones = difficulty * 50 * (1 + self.realm * 0.5)
         
@@ -648,7 +531,7 @@ class Member:
         insight_chance = difficulty * 0.1
         insights_gained = 0
         
-        if self.bottleneck == "minor" and random.random() < insight_chance:
+        if self.bottleneck == "minor" and rng.random() < insight_chance:
             insights_gained = 1
             self.bottleneck_insights += 1
             
@@ -662,7 +545,7 @@ class Member:
         treasure_chance = difficulty * 0.05
         treasure_found = None
         
-        if random.random() < treasure_chance:
+        if rng.random() < treasure_chance:
             # Determine treasure type based on realm
             if self.realm <= 2:
                 treasure_found = "spirit_pill"
@@ -672,14 +555,12 @@ class Member:
                 treasure_found = "heaven_and_earth_spirit_fruit"
         
         # Add mission completion count
-        if not hasattr(self, 'missions_completed'):
-            self.missions_completed = 0
         self.missions_completed += 1
         
         # Return rewards
         return {
             "spirit_stones": int(spirit_stones),
-            "special_reward": random.random() < special_reward_chance,
+            "special_reward": rng.random() < special_reward_chance,
             "insights_gained": insights_gained,
             "treasure_found": treasure_found
         }
@@ -704,6 +585,7 @@ class Member:
     def to_dict(self):
         """Convert cultivator data to dictionary for serialization"""
         return {
+            "id": self.id,
             "name": self.name,
             "age": self.age,
             "path": self.path,
@@ -720,25 +602,27 @@ class Member:
             "elixirs_refined": self.elixirs_refined,
             "formations_mastered": self.formations_mastered,
             "weapons_forged": self.weapons_forged,
-            "missions_completed": getattr(self, 'missions_completed', 0),
+            "missions_completed": self.missions_completed,
             "sect": self.sect.name if self.sect else None,
             # Bottleneck system properties
             "bottleneck": self.bottleneck,
             "bottleneck_insights": self.bottleneck_insights,
             "insights_required": self.insights_required,
-            "bottleneck_treasures": self.bottleneck_treasures
+            "bottleneck_treasures": self.bottleneck_treasures,
+            "last_turn": self.last_turn
         }
     
     @classmethod
     def from_dict(cls, data, sects=None):
-        """Create a Member instance from dictionary data"""
+        """Create a Member instance from a record of the current schema (see schema.py)"""
         member = cls(
             data["name"],
             data["age"],
             data["path"],
             data["physical"],
             data["spiritual"],
-            data["comprehension"]
+            data["comprehension"],
+            member_id=data["id"]  # None (from a save predating IDs) allocates one in load order
         )
         member.realm = data["realm"]
         member.realm_stage = data["realm_stage"]
@@ -750,13 +634,14 @@ class Member:
         member.elixirs_refined = data["elixirs_refined"]
         member.formations_mastered = data["formations_mastered"]
         member.weapons_forged = data["weapons_forged"]
-        member.missions_completed = data.get("missions_completed", 0)
+        member.missions_completed = data["missions_completed"]
         
         # Load bottleneck system properties
-        member.bottleneck = data.get("bottleneck", "none")
-        member.bottleneck_insights = data.get("bottleneck_insights", 0)
-        member.insights_required = data.get("insights_required", 0)
-        member.bottleneck_treasures = data.get("bottleneck_treasures", [])
+        member.bottleneck = data["bottleneck"]
+        member.bottleneck_insights = data["bottleneck_insights"]
+        member.insights_required = data["insights_required"]
+        member.bottleneck_treasures = data["bottleneck_treasures"]
+        member.last_turn = data["last_turn"]
         
         # Handle sect reference if sects are provided
         if sects and data["sect"]:
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Columnar disciple storage for the Sectomie system
+
+A MemberTable keeps every disciple field in its own column (typed arrays for
+numbers, plain lists for everything else) and hands out MemberView objects
+that read and write through to their row. Views behave like Member objects,
+so sects, the registry and the turn engines can use them unchanged.
+"""
+
+from array import array
+from types import FunctionType
+from member import Member
+
+
+# Numeric fields stored in typed arrays: "q" holds 64-bit integers, "d" doubles.
+# Doubles read back as floats (e.g. 50.0), integer columns reject fractional values.
+NUMERIC_COLUMNS = {
+    "id": "q",
+    "age": "q",
+    "physical": "d",
+    "spiritual": "d",
+    "comprehension": "d",
+    "realm": "q",
+    "realm_stage": "q",
+    "qi": "d",
+    "max_qi": "d",
+    "spirit_stones": "q",
+    "breakthrough_chance": "d",
+    "elixirs_refined": "q",
+    "formations_mastered": "q",
+    "weapons_forged": "q",
+    "bottleneck_insights": "q",
+    "insights_required": "q",
+    "allocated_resources": "d",
+    "missions_completed": "q"
+}
+
+# Fields stored as Python object lists (strings, lists and references)
+OBJECT_COLUMNS = tuple(field for field in Member.__slots__ if field not in NUMERIC_COLUMNS)
+
+
+class MemberTable:
+    """
+    Struct-of-arrays store for disciples
+
+    Rows are append-only and addressed by position; the view for a row is
+    created once and reused, so identity-based bookkeeping (sect member lists,
+    the change tracker, storage backends) keeps working.
+    """
+
+    def __init__(self, members=None):
+        """
+        Initialize the table
+
+        Args:
+            members (list, optional): Member objects to copy into the table
+        """
+        self.columns = {field: array(typecode) for field, typecode in NUMERIC_COLUMNS.items()}
+        self.columns.update({field: [] for field in OBJECT_COLUMNS})
+        self.views = []
+        for member in members or ():
+            self.append(member)
+
+    def append(self, member):
+        """
+        Copy a member into a new row
+
+        Args:
+            member: Member (or view) to copy
+
+        Returns:
+            MemberView: View over the new row
+        """
+        row = len(self.views)
+        for field, column in self.columns.items():
+            column.append(getattr(member, field))
+        return self._new_view(row)
+
+    @classmethod
+    def from_columns(cls, columns, count):
+        """
+        Create a table over existing columns, e.g. ones mapped from a file
+
+        Args:
+            columns (dict): Member field -> column; anything indexable by row
+                            that supports item assignment and append
+            count (int): Number of rows in every column
+
+        Returns:
+            MemberTable: Table with one view per row
+        """
+        table = cls.__new__(cls)
+        table.columns = columns
+        table.views = []
+        for row in range(count):
+            table._new_view(row)
+        return table
+
+    def _new_view(self, row):
+        view = MemberView.__new__(MemberView)
+        object.__setattr__(view, "_table", self)
+        object.__setattr__(view, "_row", row)
+        self.views.append(view)
+        return view
+
+    def view(self, row):
+        """
+        Get the view for a row
+
+        Args:
+            row (int): Row position
+
+        Returns:
+            MemberView: View over the row
+        """
+        return self.views[row]
+
+    def column(self, field):
+        """
+        Get the raw column for a field, e.g. to feed a vectorized computation
+
+        Args:
+            field (str): Member field name
+
+        Returns:
+            array or list: The column, indexed by row
+        """
+        return self.columns[field]
+
+    def __len__(self):
+        return len(self.views)
+
+    def __iter__(self):
+        return iter(self.views)
+
+
+class MemberView:
+    """
+    A disciple whose fields live in a MemberTable row
+
+    Created by MemberTable.append. Views share Member's methods (including
+    change tracking) but not its slots, so each one only stores its table
+    and row.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, *args, **kwargs):
+        raise TypeError("MemberView objects are created by MemberTable.append")
+
+
+def _column_property(field):
+    def get(self):
+        return self._table.columns[field][self._row]
+
+    def set(self, value):
+        self._table.columns[field][self._row] = value
+
+    return property(get, set, doc=f"{field} column of the disciple's table row")
+
+
+# One property per Member field, backed by the matching column
+for _name in Member.__slots__:
+    setattr(MemberView, _name, _column_property(_name))
+
+# Borrow Member's behaviour; inheriting would give every view a full set of empty slots
+for _name, _value in vars(Member).items():
+    if isinstance(_value, FunctionType) and _name not in ("__init__",):
+        setattr(MemberView, _name, _value)
+del _name, _value
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Member registry for the Sectomie system
+"""
+
+
+class MemberRegistry:
+    """
+    Maps stable disciple IDs to Member objects for O(1) lookups
+    """
+
+    def __init__(self, members=None):
+        """
+        Initialize the registry
+
+        Args:
+            members (list, optional): Members to register
+        """
+        self._members = {}
+        self.on_access = None  # Optional callable(member) run on every lookup, e.g. lazy catch-up
+        if members:
+            self.rebuild(members)
+
+    def rebuild(self, members):
+        """
+        Replace the registry contents with a new member list
+
+        Args:
+            members (list): List of Member objects
+        """
+        self._members = {member.id: member for member in members}
+
+    def add(self, member):
+        """
+        Register a member under its ID
+
+        Args:
+            member: Member object to register
+        """
+        self._members[member.id] = member
+
+    def remove(self, member):
+        """
+        Unregister a member
+
+        Args:
+            member: Member object to remove
+        """
+        self._members.pop(member.id, None)
+
+    def get(self, member_id):
+        """
+        Look up a member by ID
+
+        Args:
+            member_id (int): Stable disciple ID
+
+        Returns:
+            Member: The member, or None if no member has this ID
+        """
+        member = self._members.get(member_id)
+        if member is not None and self.on_access is not None:
+            self.on_access(member)
+        return member
+
+    def peek(self, member_id):
+        """
+        Look up a member by ID without running on_access
+
+        Args:
+            member_id (int): Stable disciple ID
+
+        Returns:
+            Member: The member, or None if no member has this ID
+        """
+        return self._members.get(member_id)
+
+    def __contains__(self, member_id):
+        return member_id in self._members
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self._members.values())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Response cache for read-only API endpoints in the Sectomie system
+
+GET responses are kept per URL together with the world version they were
+built at. Every mutation bumps the version (see GameState.mark_changed), so
+a cached body is served until anything in the world changes. The ETag is a
+hash of the body, and clients that send it back get an empty 304 instead
+of the body while the URL's current response is unchanged.
+"""
+
+import functools
+import hashlib
+from flask import request, current_app
+
+
+class ResponseCache:
+    """
+    Read-through cache of JSON responses keyed by URL and world version
+    """
+
+    def __init__(self, version_source, max_entries=256, guard=None):
+        """
+        Initialize the cache
+
+        Args:
+            version_source (callable): Returns the current world version
+            max_entries (int, optional): URLs kept before the cache is emptied
+            guard (callable, optional): Returns a context manager (e.g. a lock)
+                                        held while a missing response is built
+        """
+        self.version_source = version_source
+        self.max_entries = max_entries
+        self.guard = guard
+        self._entries = {}  # URL -> (world version, body, mimetype, ETag)
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    @staticmethod
+    def etag(body):
+        """ETag for a response body; it differs between URLs and survives restarts"""
+        return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+    def clear(self):
+        """Drop every cached response"""
+        self._entries.clear()
+
+    def cached(self, view):
+        """
+        Decorate a GET view so its response is reused until the world version changes
+
+        Only 200 responses are cached; errors are rebuilt on every request.
+        Hits never enter the guard; a 304 is only answered once the URL's
+        current response is known.
+        """
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Read the version before building so a concurrent mutation invalidates the result
+            version = self.version_source()
+            key = request.full_path
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                response = self._build(view, args, kwargs)
+                if response.status_code != 200:
+                    return response
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                body = response.get_data()
+                entry = (version, body, response.mimetype, self.etag(body))
+                self._entries[key] = entry
+
+            _, body, mimetype, etag = entry
+            if request.if_none_match.contains(etag):
+                self.stats["not_modified"] += 1
+                return self._respond(b"", None, etag, 304)
+            return self._respond(body, mimetype, etag, 200)
+
+        wrapper.response_cache = self
+        return wrapper
+
+    def _build(self, view, args, kwargs):
+        if self.guard is None:
+            return current_app.make_response(view(*args, **kwargs))
+        with self.guard():
+            return current_app.make_response(view(*args, **kwargs))
+
+    def _respond(self, body, mimetype, etag, status):
+        response = current_app.response_class(body, status=status, mimetype=mimetype)
+        response.set_etag(etag)
+        # Let browsers keep the body but check the ETag before reusing it
+        response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Save schema versions and record migrations for the Sectomie system
+
+Every save records the schema version of its sect and member records
+("schema" in JSON and stream headers, the binary and mapped headers, or
+SQLite's user_version); saves made before versioning count as version 0.
+Loading runs each record through the migrations between its version and
+SCHEMA_VERSION before any object is built, so Sect.from_dict and
+Member.from_dict can rely on every field being present and nothing past
+loading needs to probe for missing attributes.
+
+Migrations work on one record at a time, so streamed snapshots are migrated
+as they are read instead of in a separate pass. To change the schema, bump
+SCHEMA_VERSION and add a function for the previous version to
+SECT_MIGRATIONS and MEMBER_MIGRATIONS.
+"""
+
+
+SCHEMA_VERSION = 1
+
+
+def _default_treasures(tier):
+    """Treasures a sect of the given tier starts with (see Sect.__init__)"""
+    return {
+        "spirit_pill": tier,
+        "dao_comprehension_stone": max(0, tier - 2),
+        "heaven_and_earth_spirit_fruit": max(0, tier - 4),
+        "nine_transformation_pill": max(0, tier - 6),
+        "immortal_ascension_stone": max(0, tier - 8)
+    }
+
+
+def _sect_v0(record):
+    # Unversioned saves may predate sect resources, treasures, relations and facilities
+    record.setdefault("spirit_herbs", 2 * record["tier"])
+    record.setdefault("dao_crystals", 0)
+    if "treasures" not in record:
+        record["treasures"] = _default_treasures(record["tier"])
+    record.setdefault("cultivation_chambers", 0)
+    record.setdefault("technique_manuals", [])
+    record.setdefault("alliances", [])
+    record.setdefault("rivals", [])
+    return record
+
+
+def _member_v0(record):
+    # Unversioned saves may predate disciple IDs, missions, bottlenecks and lazy cultivation
+    record.setdefault("id", None)  # Allocated in load order
+    record.setdefault("missions_completed", 0)
+    record.setdefault("bottleneck", "none")
+    record.setdefault("bottleneck_insights", 0)
+    record.setdefault("insights_required", 0)
+    record.setdefault("bottleneck_treasures", [])
+    record.setdefault("last_turn", None)
+    return record
+
+
+# Version -> function bringing a record of that version to the next one
+SECT_MIGRATIONS = {0: _sect_v0}
+MEMBER_MIGRATIONS = {0: _member_v0}
+
+
+def _check_version(version):
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Save schema version {version} is newer than this version ({SCHEMA_VERSION})")
+
+
+def _migrate(record, version, migrations):
+    _check_version(version)
+    while version < SCHEMA_VERSION:
+        record = migrations[version](record)
+        version += 1
+    return record
+
+
+def migrate_sect(record, version):
+    """
+    Bring a sect record up to the current schema
+
+    Args:
+        record (dict): Sect record (updated in place)
+        version (int): Schema version it was saved with
+
+    Returns:
+        dict: The migrated record
+
+    Raises:
+        ValueError: If the record is newer than this version understands
+    """
+    return _migrate(record, version, SECT_MIGRATIONS)
+
+
+def migrate_member(record, version):
+    """
+    Bring a member record up to the current schema
+
+    Args:
+        record (dict): Member record (updated in place)
+        version (int): Schema version it was saved with
+
+    Returns:
+        dict: The migrated record
+
+    Raises:
+        ValueError: If the record is newer than this version understands
+    """
+    return _migrate(record, version, MEMBER_MIGRATIONS)
+
+
+def migrate_records(records, version, migrate):
+    """
+    Migrate a stream of records one at a time
+
+    Args:
+        records (iterable): Records saved with the given schema version
+        version (int): Schema version of the records
+        migrate (callable): migrate_sect or migrate_member
+
+    Yields:
+        The migrated records; anything that is not a dict (e.g. an already
+        built disciple from a mapped snapshot) is passed through
+
+    Raises:
+        ValueError: If the records are newer than this version understands
+    """
+    _check_version(version)
+    if version == SCHEMA_VERSION:
+        yield from records
+        return
+    for record in records:
+        yield migrate(record, version) if isinstance(record, dict) else record
@@ -3,6 +3,82 @@
 Sect class for the Sectomie cultivation system
 """
 
+from change_tracker import change_tracker
+
+
+class SectPower:
+    """
+    Running combat power aggregates for a sect's members
+
+    Recounted in bulk where the world changes rather than on every
+    attribute write: members joining or leaving (add_member, remove_member),
+    turn end (rebuild), lazy catch-up and disciple actions (update), so
+    totals, averages and per-realm histograms never rescan the sect.
+    """
+
+    __slots__ = ("entries", "total", "realm_counts", "realm_totals", "_ranking")
+
+    def __init__(self):
+        self.entries = {}  # member ID -> (member, combat power, realm) as last counted
+        self.total = 0
+        self.realm_counts = {}  # realm -> members in it
+        self.realm_totals = {}  # realm -> their combined combat power
+        self._ranking = None  # Entries by descending power, rebuilt on demand
+
+    def add(self, member):
+        """Count a member's combat power"""
+        power = member.get_combat_power()
+        realm = member.realm
+        self.entries[member.id] = (member, power, realm)
+        self.total += power
+        self.realm_counts[realm] = self.realm_counts.get(realm, 0) + 1
+        self.realm_totals[realm] = self.realm_totals.get(realm, 0) + power
+        self._ranking = None
+
+    def remove(self, member):
+        """Stop counting a member"""
+        entry = self.entries.pop(member.id, None)
+        if entry is None:
+            return
+        _, power, realm = entry
+        self.total -= power
+        self.realm_counts[realm] -= 1
+        self.realm_totals[realm] -= power
+        if not self.realm_counts[realm]:
+            del self.realm_counts[realm]
+            del self.realm_totals[realm]
+        self._ranking = None
+
+    def update(self, member):
+        """Recount a member after one of its power fields changed"""
+        if member.id in self.entries:
+            self.remove(member)
+            self.add(member)
+
+    def rebuild(self, members):
+        """Recount every member from scratch"""
+        self.__init__()
+        for member in members:
+            self.add(member)
+
+    def top(self, count):
+        """
+        Get the strongest members
+
+        Args:
+            count (int): Number of members to return
+
+        Returns:
+            list: (member, combat power) pairs, strongest first
+        """
+        if self._ranking is None:
+            self._ranking = sorted(self.entries.values(), key=lambda entry: (-entry[1], entry[0].id))
+        return [(member, power) for member, power, _ in self._ranking[:count]]
+
+    def __len__(self):
+        return len(self.entries)
+
+
 class Sect:
     """
     Represents a cultivation sect with appropriate attributes
@@ -23,6 +99,8 @@ class Sect:
         self.tier = self._validate_tier(tier)
         self.description = description
         self.members = []
+        self.member_ids = {}  # Ordered set of member IDs (dict keys) kept in step with members
+        self.power_stats = SectPower()  # Members' combat power aggregates
         
         # Sect resources
         self.spirit_stones = 10000 * tier  # Basic currency
@@ -47,6 +125,10 @@ class Sect:
         self.territories = []         # List of controlled territories
         self.formation_strength = tier * 10  # Protective formation strength
         
+        # Sect facilities
+        self.cultivation_chambers = 0  # +5% monthly cultivation each
+        self.technique_manuals = []    # {"method": ..., "bonus": ...} boosts for one cultivation method
+        
         # Sect relationships
         self.alliances = []           # List of allied sects
         self.rivals = []              # List of rival sects
@@ -58,6 +140,15 @@ class Sect:
         self.formation_diagrams = []  # Formation diagrams
         self.artifact_blueprints = [] # Artifact crafting blueprints
         
+    def __setattr__(self, name, value):
+        """Assign an attribute and flag the sect as changed for persistence"""
+        object.__setattr__(self, name, value)
+        change_tracker.mark(self)
+    
+    def mark_dirty(self):
+        """Flag the sect as changed after an in-place mutation (e.g. treasures[...] += 1)"""
+        change_tracker.mark(self)
+        
     def _validate_tier(self, tier):
         """Ensure tier is within valid range (1-9)"""
         return max(1, min(9, tier))
@@ -69,9 +160,12 @@ class Sect:
         Args:
             member: Member object to add
         """
-        if member not in self.members:
+        if member.id not in self.member_ids:
             self.members.append(member)
+            self.member_ids[member.id] = None
             member.sect = self  # Update the cultivator's sect reference
+            self.power_stats.add(member)
+            self.mark_dirty()
     
     def remove_member(self, member):
         """
@@ -80,21 +174,49 @@ class Sect:
         Args:
             member: Member object to remove
         """
-        if member in self.members:
+        if member.id in self.member_ids:
             self.members.remove(member)
+            del self.member_ids[member.id]
             member.sect = None  # Clear the member's sect reference
+            self.power_stats.remove(member)
+            self.mark_dirty()
+    
+    def has_member(self, member):
+        """Check whether a member belongs to the sect without scanning the member list"""
+        return member.id in self.member_ids
     
     def get_total_power(self):
-        """Calculate the total combat power of all members"""
-        if not self.members:
-            return 0
-        return sum(member.get_combat_power() for member in self.members)
+        """Get the total combat power of all members"""
+        return self.power_stats.total
     
     def get_average_power(self):
-        """Calculate the average combat power of members"""
-        if not self.members:
+        """Get the average combat power of members"""
+        if not self.power_stats:
             return 0
-        return self.get_total_power() / len(self.members)
+        return self.power_stats.total / len(self.power_stats)
+    
+    def get_realm_distribution(self):
+        """
+        Get how many members are in each realm and their combined power
+        
+        Returns:
+            dict: {realm: {"count": members, "power": combined combat power}}
+        """
+        stats = self.power_stats
+        return {realm: {"count": count, "power": stats.realm_totals[realm]}
+                for realm, count in sorted(stats.realm_counts.items())}
+    
+    def get_top_members(self, count=10):
+        """
+        Get the sect's strongest members
+        
+        Args:
+            count (int): Number of members to return
+            
+        Returns:
+            list: (member, combat power) pairs, strongest first
+        """
+        return self.power_stats.top(count)
     
     def add_territory(self, territory_name, spirit_vein_quality=0):
         """Add a territory to the sect's control"""
@@ -115,6 +237,8 @@ class Sect:
         if other_sect not in self.alliances and other_sect != self:
             self.alliances.append(other_sect)
             other_sect.alliances.append(self)
+            self.mark_dirty()
+            other_sect.mark_dirty()
             
             # Exchange a random technique as a sign of goodwill
             if self.techniques and other_sect.techniques:
@@ -128,6 +252,8 @@ class Sect:
         if other_sect not in self.rivals and other_sect != self:
             self.rivals.append(other_sect)
             other_sect.rivals.append(self)
+            self.mark_dirty()
+            other_sect.mark_dirty()
     
     def to_dict(self):
         """Convert sect data to dictionary for serialization"""
@@ -140,13 +266,15 @@ class Sect:
             "spirit_veins": self.spirit_veins,
             "spirit_vein_quality": self.spirit_vein_quality,
             "elixir_fields": self.elixir_fields,
-            "spirit_herbs": getattr(self, 'spirit_herbs', 0),
-            "dao_crystals": getattr(self, 'dao_crystals', 0),
-            "treasures": getattr(self, 'treasures', {}),
+            "spirit_herbs": self.spirit_herbs,
+            "dao_crystals": self.dao_crystals,
+            "treasures": self.treasures,
             "sect_influence": self.sect_influence,
             "reputation": self.reputation,
             "territories": self.territories,
             "formation_strength": self.formation_strength,
+            "cultivation_chambers": self.cultivation_chambers,
+            "technique_manuals": self.technique_manuals,
             "members": [member.name for member in self.members],
             "alliances": [sect.name for sect in self.alliances],
             "rivals": [sect.name for sect in self.rivals],
@@ -159,7 +287,7 @@ class Sect:
     
     @classmethod
     def from_dict(cls, data, members=None, sects=None):
-        """Create a Sect instance from dictionary data"""
+        """Create a Sect instance from a record of the current schema (see schema.py)"""
         sect = cls(
             data["name"],
             data["dao_heritage"],
@@ -170,40 +298,34 @@ class Sect:
         sect.spirit_veins = data["spirit_veins"]
         sect.spirit_vein_quality = data["spirit_vein_quality"]
         sect.elixir_fields = data["elixir_fields"]
-        sect.spirit_herbs = data.get("spirit_herbs", 2 * data["tier"])
-        sect.dao_crystals = data.get("dao_crystals", 0)
-        
-        # Load treasures or initialize with defaults based on tier
-        if "treasures" in data:
-            sect.treasures = data["treasures"]
-        else:
-            # Initialize with default treasures based on tier
-            tier = data["tier"]
-            sect.treasures = {
-                "spirit_pill": tier,
-                "dao_comprehension_stone": max(0, tier - 2),
-                "heaven_and_earth_spirit_fruit": max(0, tier - 4),
-                "nine_transformation_pill": max(0, tier - 6),
-                "immortal_ascension_stone": max(0, tier - 8)
-            }
-        
+        sect.spirit_herbs = data["spirit_herbs"]
+        sect.dao_crystals = data["dao_crystals"]
+        sect.treasures = data["treasures"]
         sect.sect_influence = data["sect_influence"]
         sect.reputation = data["reputation"]
         sect.territories = data["territories"]
         sect.formation_strength = data["formation_strength"]
+        sect.cultivation_chambers = data["cultivation_chambers"]
+        sect.technique_manuals = data["technique_manuals"]
         sect.techniques = data["techniques"]
         sect.secret_manuals = data["secret_manuals"]
         sect.alchemy_recipes = data["alchemy_recipes"]
         sect.formation_diagrams = data["formation_diagrams"]
         sect.artifact_blueprints = data["artifact_blueprints"]
         
-        # Handle member references if members are provided
+        # Handle member references if members are provided (a list, or a
+        # prebuilt {name: Member} dict to avoid re-indexing per sect)
         if members:
-            for member_name in data["members"]:
+            if isinstance(members, dict):
+                members_by_name = members
+            else:
+                members_by_name = {}
                 for member in members:
-                    if member.name == member_name:
-                        sect.add_member(member)
-                        break
+                    members_by_name.setdefault(member.name, member)
+            for member_name in data["members"]:
+                member = members_by_name.get(member_name)
+                if member is not None:
+                    sect.add_member(member)
         
         # Alliance and rival references need to be handled after all sects are created
         # This would typically be done in a second pass by the data manager
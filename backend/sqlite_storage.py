@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+SQLite storage backend for the Sectomie system
+"""
+
+import json
+import sqlite3
+from change_tracker import change_tracker
+from schema import SCHEMA_VERSION, migrate_member, migrate_sect
+
+
+# Member fields stored as plain columns, in table order
+MEMBER_COLUMNS = [
+    "id", "name", "sect", "age", "path", "physical", "spiritual", "comprehension",
+    "realm", "realm_stage", "qi", "max_qi", "spirit_stones", "breakthrough_chance",
+    "elixirs_refined", "formations_mastered", "weapons_forged", "missions_completed",
+    "bottleneck", "bottleneck_insights", "insights_required", "last_turn"
+]
+
+# Member fields holding lists, stored as JSON text
+MEMBER_JSON_COLUMNS = ["techniques", "bottleneck_treasures"]
+
+# Sect fields stored as plain columns, in table order
+SECT_COLUMNS = [
+    "name", "dao_heritage", "tier", "description", "spirit_stones",
+    "spirit_vein_quality", "elixir_fields", "spirit_herbs", "dao_crystals",
+    "sect_influence", "reputation", "formation_strength", "cultivation_chambers"
+]
+
+# Sect fields holding lists, stored as JSON text
+SECT_JSON_COLUMNS = [
+    "territories", "techniques", "secret_manuals", "alchemy_recipes",
+    "formation_diagrams", "artifact_blueprints", "technique_manuals"
+]
+
+# Values bound per "IN (...)" list, below SQLite's lowest variable limit
+MAX_IN_VALUES = 500
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sects (
+    position INTEGER PRIMARY KEY,
+    {", ".join(SECT_COLUMNS + SECT_JSON_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_sects_name ON sects (name);
+
+CREATE TABLE IF NOT EXISTS members (
+    position INTEGER PRIMARY KEY,
+    {", ".join(MEMBER_COLUMNS + MEMBER_JSON_COLUMNS)}
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_members_id ON members (id);
+CREATE INDEX IF NOT EXISTS idx_members_name ON members (name);
+CREATE INDEX IF NOT EXISTS idx_members_sect ON members (sect);
+
+CREATE TABLE IF NOT EXISTS sect_relations (
+    sect_position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    other_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sect_relations_sect ON sect_relations (sect_position);
+
+CREATE TABLE IF NOT EXISTS treasures (
+    sect_position INTEGER NOT NULL,
+    treasure_type TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (sect_position, treasure_type)
+);
+
+CREATE TABLE IF NOT EXISTS spirit_veins (
+    sect_position INTEGER NOT NULL,
+    location TEXT,
+    quality INTEGER,
+    output INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_spirit_veins_sect ON spirit_veins (sect_position);
+
+CREATE TABLE IF NOT EXISTS world (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    state TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorage:
+    """
+    Stores the world in an SQLite database with one row per entity
+
+    Members and sects are keyed by their position in the in-memory lists.
+    Each save runs as a single transaction that only rewrites the rows of
+    entities created or modified since the previous save. The database's
+    user_version holds the save schema of its rows (see schema.py); older
+    databases are migrated when they are opened.
+    """
+
+    def __init__(self, filename):
+        """
+        Open (or create) a world database
+
+        Args:
+            filename (str): Path of the SQLite database file
+        """
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self.attached = False
+        self._member_positions = {}  # id(member) -> position
+        self._sect_positions = {}    # id(sect) -> position
+        self._world = None           # Game state as of the last save
+
+    def _migrate(self):
+        # Bring every row of an older database up to SCHEMA_VERSION in one transaction
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Database schema version {version} is newer than this version ({SCHEMA_VERSION})")
+        if version == SCHEMA_VERSION:
+            return
+        with self.connection:
+            self.connection.execute("BEGIN")
+            missing = self._add_missing_columns()
+            sect_rows = self.connection.execute("SELECT * FROM sects ORDER BY position").fetchall()
+            for row, data in zip(sect_rows, self._sect_records(sect_rows, missing["sects"])):
+                self._write_sect_record(row["position"], migrate_sect(data, version))
+            for row in self.connection.execute("SELECT * FROM members ORDER BY position").fetchall():
+                data = migrate_member(self._member_data(row, missing["members"]), version)
+                self._write_member_record(row["position"], data)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _add_missing_columns(self):
+        # Databases created before a column was introduced get it added (empty); the
+        # migration reads rows without it so the schema migrations fill it in
+        missing = {}
+        for table, columns in (("members", MEMBER_COLUMNS + MEMBER_JSON_COLUMNS),
+                               ("sects", SECT_COLUMNS + SECT_JSON_COLUMNS)):
+            existing = {row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            missing[table] = [column for column in columns if column not in existing]
+            for column in missing[table]:
+                self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+        return missing
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def is_empty(self):
+        """Check whether the database holds a world yet"""
+        return self.connection.execute("SELECT 1 FROM sects LIMIT 1").fetchone() is None
+
+    def attach(self, sects, members, world=None):
+        """
+        Start incremental saving against an in-memory world that matches the database
+
+        Args:
+            sects (list): Loaded Sect objects
+            members (list): Loaded Member objects
+            world (dict, optional): Game state saved with the world
+        """
+        self._sect_positions = {id(sect): i for i, sect in enumerate(sects)}
+        self._member_positions = {id(member): i for i, member in enumerate(members)}
+        self._world = world
+        self.attached = True
+        change_tracker.clear()
+
+    # Writing
+
+    def _write_member(self, position, member):
+        self._write_member_record(position, member.to_dict())
+
+    def _write_member_record(self, position, data):
+        values = [data[column] for column in MEMBER_COLUMNS]
+        values += [json.dumps(data[column]) for column in MEMBER_JSON_COLUMNS]
+        columns = MEMBER_COLUMNS + MEMBER_JSON_COLUMNS
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO members (position, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})",
+            [position] + values
+        )
+
+    def _write_sect(self, position, sect):
+        self._write_sect_record(position, sect.to_dict())
+
+    def _write_sect_record(self, position, data):
+        values = [data[column] for column in SECT_COLUMNS]
+        values += [json.dumps(data[column]) for column in SECT_JSON_COLUMNS]
+        columns = SECT_COLUMNS + SECT_JSON_COLUMNS
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO sects (position, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})",
+            [position] + values
+        )
+
+        # Child tables are small per sect, so replace them wholesale
+        for table in ("sect_relations", "treasures", "spirit_veins"):
+            self.connection.execute(f"DELETE FROM {table} WHERE sect_position = ?", (position,))
+        self.connection.executemany(
+            "INSERT INTO sect_relations (sect_position, kind, other_name) VALUES (?, ?, ?)",
+            [(position, "alliance", name) for name in data["alliances"]] +
+            [(position, "rival", name) for name in data["rivals"]]
+        )
+        self.connection.executemany(
+            "INSERT INTO treasures (sect_position, treasure_type, quantity) VALUES (?, ?, ?)",
+            [(position, treasure, quantity) for treasure, quantity in data["treasures"].items()]
+        )
+        self.connection.executemany(
+            "INSERT INTO spirit_veins (sect_position, location, quality, output) VALUES (?, ?, ?, ?)",
+            [(position, vein.get("location"), vein.get("quality"), vein.get("output"))
+             for vein in data["spirit_veins"]]
+        )
+
+    def _write_world(self, world):
+        if world is not None and world != self._world:
+            self.connection.execute("INSERT OR REPLACE INTO world (id, state) VALUES (0, ?)", (json.dumps(world),))
+            self._world = world
+
+    def write_all(self, sects, members, world=None):
+        """
+        Replace the stored world with the given objects in one transaction
+
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            world (dict, optional): Game state saved with the world
+        """
+        with self.connection:
+            for table in ("members", "sects", "sect_relations", "treasures", "spirit_veins", "world"):
+                self.connection.execute(f"DELETE FROM {table}")
+            for i, sect in enumerate(sects):
+                self._write_sect(i, sect)
+            for i, member in enumerate(members):
+                self._write_member(i, member)
+            self._world = None
+            self._write_world(world)
+        self.attach(sects, members, world)
+
+    def save(self, sects, members, world=None):
+        """
+        Persist new and modified entities in a single transaction
+
+        Args:
+            sects (list): List of Sect objects
+            members (list): List of Member objects
+            world (dict, optional): Game state saved with the world
+
+        Returns:
+            int: Number of entity rows written
+        """
+        if not self.attached:
+            self.write_all(sects, members, world)
+            return len(sects) + len(members)
+
+        # Entities created since the last save sit at the end of the lists
+        for i in range(len(self._sect_positions), len(sects)):
+            self._sect_positions[id(sects[i])] = i
+            change_tracker.mark(sects[i])
+        for i in range(len(self._member_positions), len(members)):
+            self._member_positions[id(members[i])] = i
+            change_tracker.mark(members[i])
+
+        written = 0
+        with self.connection:
+            for entity in change_tracker.drain():
+                if id(entity) in self._member_positions:
+                    self._write_member(self._member_positions[id(entity)], entity)
+                    written += 1
+                elif id(entity) in self._sect_positions:
+                    self._write_sect(self._sect_positions[id(entity)], entity)
+                    written += 1
+            self._write_world(world)
+        return written
+
+    # Reading
+
+    def _member_data(self, row, skip=()):
+        data = {column: row[column] for column in MEMBER_COLUMNS if column not in skip}
+        for column in MEMBER_JSON_COLUMNS:
+            if column not in skip:
+                data[column] = json.loads(row[column])
+        return data
+
+    def _select_in(self, query, column, values, order):
+        # Run a query for many keys with a few "IN (...)" lists instead of one query per key
+        rows = []
+        for start in range(0, len(values), MAX_IN_VALUES):
+            chunk = values[start:start + MAX_IN_VALUES]
+            rows += self.connection.execute(
+                f"{query} WHERE {column} IN ({', '.join('?' * len(chunk))}) ORDER BY {order}", chunk
+            ).fetchall()
+        return rows
+
+    def _sect_records(self, rows, skip=()):
+        # Sect records for the given rows, reading each child table once for all of them
+        positions = [row["position"] for row in rows]
+        records = {}
+        for row in rows:
+            data = {column: row[column] for column in SECT_COLUMNS if column not in skip}
+            for column in SECT_JSON_COLUMNS:
+                if column not in skip:
+                    data[column] = json.loads(row[column])
+            data.update(alliances=[], rivals=[], treasures={}, spirit_veins=[], members=[])
+            records[row["position"]] = data
+
+        for r in self._select_in("SELECT sect_position, kind, other_name FROM sect_relations",
+                                 "sect_position", positions, "sect_position, rowid"):
+            records[r["sect_position"]]["alliances" if r["kind"] == "alliance" else "rivals"].append(r["other_name"])
+        for r in self._select_in("SELECT sect_position, treasure_type, quantity FROM treasures",
+                                 "sect_position", positions, "sect_position, rowid"):
+            records[r["sect_position"]]["treasures"][r["treasure_type"]] = r["quantity"]
+        for r in self._select_in("SELECT sect_position, location, quality, output FROM spirit_veins",
+                                 "sect_position", positions, "sect_position, rowid"):
+            records[r["sect_position"]]["spirit_veins"].append(
+                {"location": r["location"], "quality": r["quality"], "output": r["output"]}
+            )
+
+        # Members join the first sect with their sect's name, as DataManager wires them
+        by_name = {}
+        for data in records.values():
+            by_name.setdefault(data["name"], data)
+        for r in self._select_in("SELECT sect, name FROM members", "sect", list(by_name), "position"):
+            by_name[r["sect"]]["members"].append(r["name"])
+        return [records[position] for position in positions]
+
+    def read(self):
+        """
+        Read the whole world as raw dictionaries
+
+        Returns:
+            dict: {"sects": [...], "members": [...]} in the JSON file layout
+        """
+        sect_rows = self.connection.execute("SELECT * FROM sects ORDER BY position").fetchall()
+        member_rows = self.connection.execute("SELECT * FROM members ORDER BY position").fetchall()
+        world_row = self.connection.execute("SELECT state FROM world WHERE id = 0").fetchone()
+        return {
+            "schema": SCHEMA_VERSION,  # Migrated when the database was opened
+            "world": json.loads(world_row["state"]) if world_row else None,
+            "sects": self._sect_records(sect_rows),
+            "members": [self._member_data(row) for row in member_rows]
+        }
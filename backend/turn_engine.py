@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Vectorized turn engine for the Sectomie cultivation system
+
+Computes a whole sect's monthly cultivation with NumPy column operations
+instead of calling Member.calculate_monthly_cultivation per disciple.
+NumPy is optional; process_sect_cultivation is the per-disciple fallback.
+"""
+
+import random
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from change_tracker import change_tracker
+from cultivation_methods import MONTHLY_METHODS
+from rng import numpy_generator
+
+
+HAS_NUMPY = np is not None
+
+# Method order used for the per-method lookup tables
+METHOD_KEYS = list(MONTHLY_METHODS)
+METHOD_INDEX = {key: i for i, key in enumerate(METHOD_KEYS)}
+
+# Attribute codes used in the attribute table
+ATTRIBUTES = ["physical", "spiritual", "comprehension"]
+ATTRIBUTE_ALL = 3
+ATTRIBUTE_RANDOM = 4
+ATTRIBUTE_CODES = {"physical": 0, "spiritual": 1, "comprehension": 2, "all": ATTRIBUTE_ALL, "random": ATTRIBUTE_RANDOM}
+
+# Disciple fields reported in a turn's change set
+CHANGE_FIELDS = ("qi", "breakthrough_chance", "realm", "realm_stage")
+
+
+def calculate_facility_bonus(sect):
+    """Cultivation bonus from the sect's cultivation chambers (5% per chamber)"""
+    facility_bonus = 1.0
+    if sect.cultivation_chambers > 0:
+        facility_bonus += sect.cultivation_chambers * 0.05
+    return facility_bonus
+
+
+def calculate_manual_bonus(sect, method):
+    """Cultivation bonus from the sect's technique manuals for a specific method"""
+    manual_bonus = 1.0
+    for manual in sect.technique_manuals:
+        if manual.get('method') == method:
+            manual_bonus += manual.get('bonus', 0.1)  # Default 10% bonus per manual
+    return manual_bonus
+
+
+def new_turn_results():
+    """Empty end-of-turn results structure filled in by the turn engines"""
+    return {
+        "resource_income": {},
+        "cultivation_progress": {},
+        "events": [],
+        "new_missions": [],
+        "cultivation_deviations": [],
+        "attribute_increases": [],
+        "disciple_changes": {}
+    }
+
+
+def record_changes(results, member, before):
+    """
+    Add a disciple to the turn's change set if any tracked field changed
+
+    Args:
+        results (dict): Turn results dict
+        member: Member that was processed
+        before (tuple): Values of CHANGE_FIELDS before processing
+
+    Entries are keyed by disciple ID and hold [old, new] pairs for the
+    changed fields only, e.g. {"name": "Li Mei", "qi": [120.0, 145.5]}.
+    """
+    after = (member.qi, member.breakthrough_chance, member.realm, member.realm_stage)
+    if after != before:
+        change = {"name": member.name}
+        for field, old, new in zip(CHANGE_FIELDS, before, after):
+            if old != new:
+                change[field] = [old, new]
+        results["disciple_changes"][member.id] = change
+
+
+def collect_sect_income(sect, results, rng=None):
+    """Add one month of spirit vein and elixir field income to a sect"""
+    rng = rng or random
+    # Calculate resource income
+    spirit_stone_income = sum(vein["output"] for vein in sect.spirit_veins)
+    sect.spirit_stones += spirit_stone_income
+    results["resource_income"]["spirit_stones"] = spirit_stone_income
+
+    # Generate spirit herbs from elixir fields
+    if sect.elixir_fields > 0:
+        # Each elixir field has a chance to produce 0-2 spirit herbs
+        herb_income = 0
+        for _ in range(sect.elixir_fields):
+            herb_income += rng.randint(0, 2)
+
+        sect.spirit_herbs += herb_income
+        results["resource_income"]["spirit_herbs"] = herb_income
+
+
+def process_sect_cultivation(sect, results, rng=None):
+    """Apply monthly cultivation to each active disciple of a sect, one at a time, then recount its power"""
+    rng = rng or random
+    for member in sect.members:
+        # Skip disciples that are not active or are in seclusion
+        if member.status not in ['active', None]:
+            continue
+        before = (member.qi, member.breakthrough_chance, member.realm, member.realm_stage)
+
+        # Get assigned cultivation method (default to qi_circulation if none assigned)
+        assigned_method = member.assigned_cultivation_method or 'qi_circulation'
+
+        # Calculate facility and manual bonuses from sect buildings and technique manuals
+        facility_bonus = calculate_facility_bonus(sect)
+        manual_bonus = calculate_manual_bonus(sect, assigned_method)
+
+        # Calculate resource bonus based on allocated resources
+        resource_bonus = 1.0 + member.allocated_resources * 0.1  # 10% bonus per resource point
+
+        # Apply monthly cultivation with all bonuses
+        cultivation_result = member.calculate_monthly_cultivation(
+            assigned_method=assigned_method,
+            facility_bonus=facility_bonus,
+            manual_bonus=manual_bonus,
+            resource_bonus=resource_bonus,
+            rng=rng
+        )
+
+        # Record cultivation progress
+        results["cultivation_progress"][member.id] = {
+            "name": member.name,
+            "qi_gained": cultivation_result["qi_gained"],
+            "current_qi": member.qi,
+            "max_qi": member.max_qi,
+            "breakthrough_chance": member.breakthrough_chance,
+            "method_used": assigned_method,
+            "method_description": cultivation_result.get("method_description", "")
+        }
+
+        # Record cultivation deviations
+        if cultivation_result["cultivation_deviation"]:
+            results["cultivation_deviations"].append({
+                "disciple_id": member.id,
+                "name": member.name,
+                "message": cultivation_result["message"]
+            })
+
+        # Record attribute increases
+        if cultivation_result["attribute_increase"]:
+            results["attribute_increases"].append({
+                "disciple_id": member.id,
+                "name": member.name,
+                "attribute": cultivation_result["attribute_increase"],
+                "value": cultivation_result["attribute_value"]
+            })
+
+        # Check for automatic breakthrough attempts
+        if member.qi >= member.max_qi and member.bottleneck == "none":
+            # 10% chance to automatically attempt breakthrough when qi is full
+            if rng.random() < 0.1:
+                breakthrough_result = member.attempt_breakthrough(rng)
+                if breakthrough_result["success"]:
+                    results["events"].append({
+                        "type": "breakthrough",
+                        "disciple_id": member.id,
+                        "name": member.name,
+                        "message": breakthrough_result["message"],
+                        "new_realm": member.realm,
+                        "new_stage": member.get_stage_name()
+                    })
+
+        record_changes(results, member, before)
+
+    sect.power_stats.rebuild(sect.members)
+
+
+def _shared_table_rows(disciples):
+    """
+    Find the MemberTable every disciple is a view of
+
+    Returns:
+        tuple: (table, numpy row positions), or (None, None) if the disciples
+               are plain Member objects or come from several tables
+    """
+    table = getattr(disciples[0], "_table", None) if disciples else None
+    if table is None or any(getattr(m, "_table", None) is not table for m in disciples):
+        return None, None
+    return table, np.array([m._row for m in disciples], dtype=np.int64)
+
+
+class SectColumns:
+    """
+    Column arrays holding the cultivation state of a sect's active disciples
+    """
+
+    def __init__(self, disciples):
+        """
+        Gather disciple attributes into column arrays
+
+        Args:
+            disciples (list): Active Member objects, in processing order
+        """
+        self.disciples = disciples
+        self._table, self._rows = _shared_table_rows(disciples)
+        self.assigned_methods = [m.assigned_cultivation_method or "qi_circulation" for m in disciples]
+        self.method_index = np.array([METHOD_INDEX.get(method, -1) for method in self.assigned_methods], dtype=np.int64)
+        self.spiritual = self._gather("spiritual")
+        self.comprehension = self._gather("comprehension")
+        self.realm = self._gather("realm")
+        self.realm_stage = [m.realm_stage for m in disciples]
+        self.qi = self._gather("qi")
+        self.max_qi = self._gather("max_qi")
+        self.breakthrough_chance = self._gather("breakthrough_chance")
+        self.allocated_resources = np.array([m.allocated_resources for m in disciples], dtype=np.float64)
+        self.no_bottleneck = np.array([m.bottleneck == "none" for m in disciples], dtype=bool)
+
+    def _gather(self, field):
+        """Read one numeric field of every disciple as a float64 array"""
+        if self._table is not None:
+            column = self._table.columns[field]
+            if hasattr(column, "gather"):
+                # Columns mapped from a snapshot are read in one fancy-indexing pass
+                return column.gather(self._rows)
+        return np.array([getattr(m, field) for m in self.disciples], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.disciples)
+
+
+class BatchTurnEngine:
+    """
+    Processes monthly cultivation for a whole sect with vectorized operations
+
+    Produces the same results structure as GameState's per-disciple loop.
+    Random outcomes are drawn in batches, so individual rolls differ from the
+    scalar path while following the same probabilities.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Initialize the engine
+
+        Args:
+            seed (int, optional): Seed for the engine's Philox generator
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("The batch turn engine requires numpy")
+        self.rng = numpy_generator(seed)
+
+        # Per-method lookup tables, indexed by METHOD_KEYS position
+        effects = [MONTHLY_METHODS[key] for key in METHOD_KEYS]
+        self.qi_factor = np.array([e.qi_factor for e in effects])
+        self.breakthrough_increase = np.array([e.breakthrough_increase for e in effects])
+        self.attribute_chance = np.array([e.attribute_chance if e.attribute else 0 for e in effects])
+        self.attribute_code = np.array([ATTRIBUTE_CODES.get(e.attribute, 0) for e in effects])
+        self.attribute_increase = np.array([e.attribute_increase for e in effects], dtype=np.float64)
+        self.deviation_chance = np.array([e.deviation_chance for e in effects])
+
+    def reseed(self, seed):
+        """
+        Restart the engine's random generator from a new seed
+
+        Args:
+            seed (int): Seed for the engine's Philox generator
+        """
+        self.rng = numpy_generator(seed)
+
+    def process_cultivation(self, sect, results, rng=None):
+        """
+        Apply one month of cultivation to every active disciple of a sect
+
+        Args:
+            sect (Sect): Sect whose disciples cultivate
+            results (dict): Turn results dict to fill in
+            rng (random.Random, optional): Stream for the per-disciple breakthrough attempts
+        """
+        disciples = [m for m in sect.members if m.status in ['active', None]]
+        if not disciples:
+            return
+
+        columns = SectColumns(disciples)
+        generator = self.rng
+        n = len(columns)
+
+        # Bonuses: facility bonus is per sect, manual bonus per method
+        facility_bonus = calculate_facility_bonus(sect)
+        manual_table = np.array([calculate_manual_bonus(sect, key) for key in METHOD_KEYS])
+
+        valid = columns.method_index >= 0
+        method = np.where(valid, columns.method_index, 0)
+        manual_bonus = manual_table[method]
+        resource_bonus = 1.0 + columns.allocated_resources * 0.1
+
+        # Qi gain and breakthrough chance
+        qi_gained = np.where(valid, columns.spiritual * (1 + columns.realm * 0.5) * self.qi_factor[method] * facility_bonus * manual_bonus * resource_bonus, 0.0)
+        qi = np.where(valid, np.minimum(columns.qi + qi_gained, columns.max_qi), columns.qi)
+        breakthrough_chance = np.where(
+            valid,
+            np.minimum(columns.breakthrough_chance + self.breakthrough_increase[method] * facility_bonus * manual_bonus, 99),
+            columns.breakthrough_chance
+        )
+
+        # Attribute increases
+        attribute_hit = valid & (generator.random(n) < self.attribute_chance[method])
+        attribute_code = self.attribute_code[method]
+        attribute_code = np.where(attribute_code == ATTRIBUTE_RANDOM, generator.integers(0, 3, n), attribute_code)
+        increase = self.attribute_increase[method]
+        comprehension = columns.comprehension.copy()
+        comprehension_hit = attribute_hit & ((attribute_code == 2) | (attribute_code == ATTRIBUTE_ALL))
+        comprehension[comprehension_hit] = np.minimum(comprehension[comprehension_hit] + increase[comprehension_hit], 100)
+
+        # Cultivation deviations (comprehension after this month's increase resists)
+        deviation_roll = generator.random(n) < self.deviation_chance[method] / manual_bonus
+        comprehension_failed = generator.random(n) * 100 > comprehension
+        deviated = valid & deviation_roll & comprehension_failed
+        severity = generator.uniform(0.1, 0.3, n)
+        qi = np.where(deviated, qi - qi * severity, qi)
+
+        # Automatic breakthrough attempts when qi is full
+        attempt_breakthrough = (qi >= columns.max_qi) & columns.no_bottleneck & (generator.random(n) < 0.1)
+
+        # Write the new state back to the disciples, bypassing per-attribute tracking;
+        # the changed ones are marked once and the sect's power recounted at the end
+        qi_list = qi.tolist()
+        chance_list = breakthrough_chance.tolist()
+        qi_gained_list = qi_gained.tolist()
+        valid_list = valid.tolist()
+        set_field = object.__setattr__
+        for i, member in enumerate(disciples):
+            if valid_list[i]:
+                set_field(member, "qi", qi_list[i])
+                set_field(member, "breakthrough_chance", chance_list[i])
+
+        for i in np.flatnonzero(attribute_hit).tolist():
+            member = disciples[i]
+            code = int(attribute_code[i])
+            amount = MONTHLY_METHODS[METHOD_KEYS[method[i]]].attribute_increase
+            if code == ATTRIBUTE_ALL:
+                member.physical = min(member.physical + amount, 100)
+                member.spiritual = min(member.spiritual + amount, 100)
+                member.comprehension = min(member.comprehension + amount, 100)
+                attribute, value = "all", 0
+            else:
+                attribute = ATTRIBUTES[code]
+                value = min(getattr(member, attribute) + amount, 100)
+                setattr(member, attribute, value)
+            results["attribute_increases"].append({
+                "disciple_id": member.id,
+                "name": member.name,
+                "attribute": attribute,
+                "value": value
+            })
+
+        for i in np.flatnonzero(deviated).tolist():
+            member = disciples[i]
+            results["cultivation_deviations"].append({
+                "disciple_id": member.id,
+                "name": member.name,
+                "message": f"Cultivation deviation occurred! Lost {int(severity[i] * 100)}% of accumulated qi."
+            })
+
+        for i, member in enumerate(disciples):
+            method_key = columns.assigned_methods[i]
+            effects = MONTHLY_METHODS.get(method_key or "qi_circulation")
+            results["cultivation_progress"][member.id] = {
+                "name": member.name,
+                "qi_gained": qi_gained_list[i] if valid_list[i] else 0,
+                "current_qi": member.qi,
+                "max_qi": member.max_qi,
+                "breakthrough_chance": member.breakthrough_chance,
+                "method_used": method_key,
+                "method_description": effects.description if effects else ""
+            }
+
+        for i in np.flatnonzero(attempt_breakthrough).tolist():
+            member = disciples[i]
+            breakthrough_result = member.attempt_breakthrough(rng)
+            if breakthrough_result["success"]:
+                results["events"].append({
+                    "type": "breakthrough",
+                    "disciple_id": member.id,
+                    "name": member.name,
+                    "message": breakthrough_result["message"],
+                    "new_realm": member.realm,
+                    "new_stage": member.get_stage_name()
+                })
+
+        # Change set: only disciples whose qi or chance moved or who attempted a breakthrough
+        changed = (qi != columns.qi) | (breakthrough_chance != columns.breakthrough_chance) | attempt_breakthrough
+        old_qi = columns.qi.tolist()
+        old_chance = columns.breakthrough_chance.tolist()
+        changed_rows = np.flatnonzero(changed).tolist()
+        for i in changed_rows:
+            member = disciples[i]
+            record_changes(results, member, (old_qi[i], old_chance[i], int(columns.realm[i]), columns.realm_stage[i]))
+
+        change_tracker.mark_all(disciples[i] for i in changed_rows)
+        sect.power_stats.rebuild(sect.members)
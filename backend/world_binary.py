@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Compact binary world snapshots for the Sectomie system
+
+Layout (little-endian):
+
+    b"SECTOMIE" | u16 version | u8 compression | u16 schema | u32 world size | world | payload
+
+The world field is the game state saved alongside as UTF-8 JSON (see
+GameState.to_dict), "null" if none.
+
+The payload (optionally gzip or zstd compressed) holds:
+
+- a string table: every distinct name, path, technique, bottleneck state
+  and sect name once (u32 count, u32 byte lengths, UTF-8 bytes);
+- the sect records as one JSON array (a world has few sects);
+- the member records as columns, each a name, a kind byte and its data:
+
+    q  int64 values             d  float64 values
+    v  u8 kinds (0 None, 1 int, 2 float) + float64 values
+    s  u32 string table index (0xFFFFFFFF for None)
+    l  u32 list lengths + u32 string table indexes
+    j  JSON array (anything else)
+
+Column kinds are inferred from the values when saving, so new Member
+fields are stored without changing this module. Strings are interned on
+load: every disciple on the Sword path shares one "Sword" string.
+"""
+
+import gzip
+import json
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from schema import SCHEMA_VERSION
+
+
+MAGIC = b"SECTOMIE"
+VERSION = 1
+COMPRESSIONS = ("none", "gzip", "zstd")
+HAS_ZSTD = zstandard is not None
+
+_HEADER = struct.Struct("<8sHB")
+_SCHEMA = struct.Struct("<H")
+_WORLD_SIZE = struct.Struct("<I")
+_NONE_STRING = 0xFFFFFFFF
+_SWAP = sys.byteorder == "big"  # Columns are stored little-endian
+
+
+def is_world_binary(filename):
+    """Check whether a file starts with the binary snapshot magic"""
+    with open(filename, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _pack_array(typecode, values):
+    column = array(typecode, values)
+    if _SWAP:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpack_array(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if _SWAP:
+        column.byteswap()
+    return column
+
+
+def _compress(payload, compression):
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=6)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(payload)
+    return payload
+
+
+def _decompress(payload, compression):
+    if compression == "gzip":
+        return gzip.decompress(payload)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("Snapshot is zstd compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+class _StringTable:
+    def __init__(self):
+        self.indexes = {}
+
+    def index(self, value):
+        if value is None:
+            return _NONE_STRING
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+        return index
+
+    def to_bytes(self):
+        encoded = [value.encode("utf-8") for value in self.indexes]
+        return (struct.pack("<I", len(encoded)) + _pack_array("I", [len(value) for value in encoded])
+                + b"".join(encoded))
+
+
+def _column_kind(values):
+    kinds = set(map(type, values))
+    if kinds <= {int}:
+        return "q"
+    if kinds <= {float}:
+        return "d"
+    if kinds <= {int, float, type(None)}:
+        return "v"
+    if kinds <= {str, type(None)}:
+        return "s"
+    if kinds <= {list} and all(type(item) is str for value in values for item in value):
+        return "l"
+    return "j"
+
+
+def _encode_column(kind, values, strings):
+    if kind == "q":
+        return _pack_array("q", values)
+    if kind == "d":
+        return _pack_array("d", values)
+    if kind == "v":
+        kinds = bytes(0 if value is None else 1 if type(value) is int else 2 for value in values)
+        return kinds + _pack_array("d", [0.0 if value is None else value for value in values])
+    if kind == "s":
+        return _pack_array("I", [strings.index(value) for value in values])
+    if kind == "l":
+        return (_pack_array("I", [len(value) for value in values])
+                + _pack_array("I", [strings.index(item) for value in values for item in value]))
+    return json.dumps(values).encode("utf-8")
+
+
+def _decode_column(kind, data, count, strings):
+    """Iterator over one column's values, in record order"""
+    if kind == "q":
+        return iter(_unpack_array("q", data))
+    if kind == "d":
+        return iter(_unpack_array("d", data))
+    if kind == "v":
+        values = _unpack_array("d", data[count:])
+        return (None if flag == 0 else int(value) if flag == 1 else value
+                for flag, value in zip(data[:count], values))
+    if kind == "s":
+        return (None if index == _NONE_STRING else strings[index] for index in _unpack_array("I", data))
+    if kind == "l":
+        lengths = _unpack_array("I", data[:count * 4])
+        items = _unpack_array("I", data[count * 4:])
+        return _decode_lists(lengths, items, strings)
+    if kind == "j":
+        return iter(json.loads(data))
+    raise ValueError(f"Unknown column kind '{kind}'")
+
+
+def _decode_lists(lengths, items, strings):
+    position = 0
+    for length in lengths:
+        yield [strings[index] for index in items[position:position + length]]
+        position += length
+
+
+def write_world_binary(filename, sects, members, compression="gzip", world=None):
+    """
+    Write a world as a binary snapshot, replacing the file atomically
+
+    Args:
+        filename (str): Path of the snapshot
+        sects (list): List of Sect objects
+        members (list): List of Member objects
+        compression (str): "none", "gzip" (default) or "zstd"
+        world (dict, optional): Game state saved with the world
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package")
+
+    # Gather the values column by column, one member dict at a time
+    values_by_name = {}
+    for member in members:
+        record = member.to_dict()
+        if not values_by_name:
+            values_by_name = {name: [] for name in record}
+        for name, values in values_by_name.items():
+            values.append(record.get(name))
+
+    strings = _StringTable()
+    columns = []
+    for name, values in values_by_name.items():
+        kind = _column_kind(values)
+        columns.append((name, kind, _encode_column(kind, values, strings)))
+    del values_by_name
+
+    parts = [strings.to_bytes()]
+    sect_data = json.dumps([sect.to_dict() for sect in sects]).encode("utf-8")
+    parts.append(struct.pack("<I", len(sect_data)) + sect_data)
+    parts.append(struct.pack("<IH", len(members), len(columns)))
+    for name, kind, data in columns:
+        encoded_name = name.encode("utf-8")
+        parts.append(struct.pack("<H", len(encoded_name)) + encoded_name
+                     + struct.pack("<cQ", kind.encode(), len(data)) + data)
+    payload = _compress(b"".join(parts), compression)
+    world_data = json.dumps(world).encode("utf-8")
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, COMPRESSIONS.index(compression)))
+        file.write(_SCHEMA.pack(SCHEMA_VERSION))
+        file.write(_WORLD_SIZE.pack(len(world_data)) + world_data)
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+class WorldBinaryReader:
+    """
+    Records of a binary snapshot, read the same way as a WorldStreamReader
+
+    The columns are decoded up front (they are compact); member dicts are
+    only built one at a time by members().
+    """
+
+    def __init__(self, filename):
+        """
+        Read and decompress a snapshot
+
+        Args:
+            filename (str): Path of the snapshot
+
+        Raises:
+            ValueError: If the file is not a snapshot this version can read
+        """
+        with open(filename, 'rb') as file:
+            magic, version, compression = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("Not a Sectomie binary snapshot")
+            if version > VERSION:
+                raise ValueError(f"Snapshot version {version} is newer than this version ({VERSION})")
+            if compression >= len(COMPRESSIONS):
+                raise ValueError(f"Unknown snapshot compression {compression}")
+            (schema,) = _SCHEMA.unpack(file.read(_SCHEMA.size))
+            (world_size,) = _WORLD_SIZE.unpack(file.read(_WORLD_SIZE.size))
+            world = json.loads(file.read(world_size))
+            payload = memoryview(_decompress(file.read(), COMPRESSIONS[compression]))
+
+        offset = 0
+
+        def take(size):
+            nonlocal offset
+            data = payload[offset:offset + size]
+            offset += size
+            return data
+
+        (string_count,) = struct.unpack("<I", take(4))
+        lengths = _unpack_array("I", take(4 * string_count))
+        self._strings = [bytes(take(length)).decode("utf-8") for length in lengths]
+
+        (sect_size,) = struct.unpack("<I", take(4))
+        self._sect_records = json.loads(bytes(take(sect_size)))
+
+        member_count, column_count = struct.unpack("<IH", take(6))
+        self._columns = []
+        for _ in range(column_count):
+            (name_size,) = struct.unpack("<H", take(2))
+            name = bytes(take(name_size)).decode("utf-8")
+            kind, size = struct.unpack("<cQ", take(9))
+            self._columns.append((name, kind.decode(), bytes(take(size))))
+
+        self.header = {
+            "format": "binary",
+            "version": version,
+            "compression": COMPRESSIONS[compression],
+            "schema": schema,
+            "world": world,
+            "sects": len(self._sect_records),
+            "members": member_count
+        }
+
+    def sects(self):
+        """Yield the sect records"""
+        return iter(self._sect_records)
+
+    def members(self):
+        """Yield the member records"""
+        count = self.header["members"]
+        names = [name for name, _, _ in self._columns]
+        values = [_decode_column(kind, data, count, self._strings) for _, kind, data in self._columns]
+        for row in zip(*values):
+            yield dict(zip(names, row))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Locking for concurrent access to the Sectomie world
+
+Two levels of readers-writer locks:
+
+- the world lock, held exclusively by whole-world operations (turn end,
+  fast-forward) and shared by everything else;
+- one lock per sect, held exclusively while a request changes the sect or
+  its disciples and shared while it only reads them.
+
+Requests touching a single sect therefore run in parallel with requests on
+other sects. Readers spanning the world take every sect lock shared, always
+in sect order, and a request never holds more than one sect lock for
+writing, so the locks cannot deadlock.
+"""
+
+import threading
+from contextlib import contextmanager, ExitStack
+
+
+class RWLock:
+    """
+    Readers-writer lock preferring writers (not reentrant)
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """Block until no writer holds or waits for the lock, then share it"""
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """Block until the lock is free, then hold it exclusively"""
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Context manager holding the lock shared"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Context manager holding the lock exclusively"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class WorldLocks:
+    """
+    The world lock and one lock per sect
+    """
+
+    def __init__(self, sects):
+        """
+        Initialize the locks
+
+        Args:
+            sects (list): List of Sect objects; list order is the locking order
+        """
+        self.sects = sects
+        self.world = RWLock()
+        self._sect_locks = {}  # id(sect) -> RWLock
+        self._guard = threading.Lock()
+
+    def sect_lock(self, sect):
+        """Get the lock for a sect, creating it on first use"""
+        lock = self._sect_locks.get(id(sect))
+        if lock is None:
+            with self._guard:
+                lock = self._sect_locks.setdefault(id(sect), RWLock())
+        return lock
+
+    @contextmanager
+    def world_write(self):
+        """Hold the whole world exclusively (turn end)"""
+        with self.world.write():
+            yield
+
+    @contextmanager
+    def sect_write(self, sect):
+        """Hold one sect exclusively; other sects stay available"""
+        with self.world.read(), self.sect_lock(sect).write():
+            yield
+
+    @contextmanager
+    def sect_read(self, sect):
+        """Read one sect while only writers of that sect are kept out"""
+        with self.world.read(), self.sect_lock(sect).read():
+            yield
+
+    @contextmanager
+    def read_all(self):
+        """Read the whole world consistently: every sect lock shared, in sect order"""
+        with ExitStack() as stack:
+            stack.enter_context(self.world.read())
+            for sect in self.sects:
+                stack.enter_context(self.sect_lock(sect).read())
+            yield
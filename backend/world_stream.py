@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Streaming (NDJSON) world files for the Sectomie system
+
+The regular save file is one JSON document, so saving builds the whole
+{"sects": [...], "members": [...]} tree next to the live objects and
+loading parses all of it before a single object exists. A stream file holds
+the same records one per line instead:
+
+    {"format": "sectomie-ndjson", "version": 1, "schema": 1, "world": {...}, "sects": 2, "members": 1000}
+    {...sect record...}
+    ...
+    {...member record...}
+
+Sects come first so disciples can be attached to their sect as they are
+read; only one record is ever held as a dict while saving or loading. The
+header's "world" holds the game state saved alongside (see GameState.to_dict).
+"""
+
+import json
+import os
+from itertools import islice
+
+from schema import SCHEMA_VERSION
+
+
+FORMAT = "sectomie-ndjson"
+VERSION = 1
+
+
+def is_world_stream(filename):
+    """Check whether a file starts with a stream header"""
+    with open(filename, 'rb') as file:
+        return file.read(len(FORMAT) + 16).startswith(b'{"format": "' + FORMAT.encode())
+
+
+def write_world_stream(filename, sects, members, world=None):
+    """
+    Write a world one record per line, replacing the file atomically
+
+    Args:
+        filename (str): Path of the stream file
+        sects (list): List of Sect objects
+        members (list): List of Member objects
+        world (dict, optional): Game state saved with the world
+    """
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'w') as file:
+        header = {"format": FORMAT, "version": VERSION, "schema": SCHEMA_VERSION, "world": world,
+                  "sects": len(sects), "members": len(members)}
+        file.write(json.dumps(header) + "\n")
+        for sect in sects:
+            file.write(json.dumps(sect.to_dict()) + "\n")
+        for member in members:
+            file.write(json.dumps(member.to_dict()) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+class WorldStreamReader:
+    """
+    Iterate over the records of a stream file without loading it whole
+
+    Read `header` first, then `sects()` and `members()` in that order; both
+    are generators that parse one line at a time.
+    """
+
+    def __init__(self, file):
+        """
+        Initialize a reader over an open text file
+
+        Args:
+            file: Stream file opened for reading
+
+        Raises:
+            ValueError: If the file is not a stream file this version can read
+        """
+        self._file = file
+        self.header = json.loads(file.readline())
+        if self.header.get("format") != FORMAT:
+            raise ValueError("Not a Sectomie stream file")
+        if self.header.get("version", 0) > VERSION:
+            raise ValueError(f"Stream file version {self.header['version']} is newer than this version ({VERSION})")
+        self.header.setdefault("schema", 0)  # Written before save schemas were versioned
+        self.header.setdefault("world", None)  # Written before the game state was saved
+
+    def _records(self, count):
+        decode = json.loads
+        for line in islice(self._file, count):
+            yield decode(line)
+            count -= 1
+        if count:
+            raise ValueError("Stream file ends early")
+
+    def sects(self):
+        """Yield the sect records"""
+        return self._records(self.header["sects"])
+
+    def members(self):
+        """Yield the member records"""
+        return self._records(self.header["members"])
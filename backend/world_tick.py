@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+World tick scheduler for the Sectomie system
+
+Advances every sect in the world by one turn: spirit vein income, herb
+growth and disciple cultivation. Each sect draws from its own random stream
+keyed by the turn number and the sect name, so a turn's outcome does not
+depend on how many worker processes share the work.
+"""
+
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from change_tracker import change_tracker
+from member import Member
+from rng import RandomStreams
+from sect import Sect, SectPower
+from turn_engine import HAS_NUMPY, BatchTurnEngine, new_turn_results, collect_sect_income, process_sect_cultivation
+
+
+# Member fields shipped to and from worker processes (the sect link is rebuilt there)
+MEMBER_FIELDS = tuple(field for field in Member.__slots__ if field != "sect")
+
+# Sect attributes that reference other objects or are derived from members; they stay in the parent process
+SECT_LINK_FIELDS = ("members", "member_ids", "power_stats", "alliances", "rivals")
+
+# Below this many disciples a world turn runs in-process; pickling costs more than it saves
+MIN_PARALLEL_DISCIPLES = 5000
+
+_MISSING = object()
+
+# Batch engine reused by every sect processed in this process
+_batch_engine = None
+
+
+def sect_turn_key(turn, sect):
+    """Random stream key for one sect's turn"""
+    return ("turn", turn, "sect", sect.name)
+
+
+def run_sect_turn(sect, seed, batch_engine=None, cultivate=True):
+    """
+    Process one turn for a single sect with its own random stream
+
+    Args:
+        sect (Sect): Sect to advance
+        seed (int): Seed for this sect's turn
+        batch_engine (BatchTurnEngine, optional): Vectorized engine for cultivation (reseeded from seed)
+        cultivate (bool): Cultivate the sect's disciples (False leaves them to lazy catch-up)
+
+    Returns:
+        dict: The sect's turn results
+    """
+    results = new_turn_results()
+    rng = random.Random(seed)
+    collect_sect_income(sect, results, rng)
+    if cultivate and batch_engine is not None:
+        batch_engine.reseed(seed)
+        batch_engine.process_cultivation(sect, results, rng)
+    elif cultivate:
+        process_sect_cultivation(sect, results, rng)
+    return results
+
+
+def _get_batch_engine():
+    global _batch_engine
+    if _batch_engine is None:
+        _batch_engine = BatchTurnEngine()
+    return _batch_engine
+
+
+# Worker side
+
+def _init_worker():
+    # Detached copies are thrown away, so there is nothing to track
+    change_tracker.enabled = False
+
+
+def _sect_state(sect):
+    return {key: value for key, value in vars(sect).items() if key not in SECT_LINK_FIELDS}
+
+
+def _member_state(member):
+    return [getattr(member, field) for field in MEMBER_FIELDS]
+
+
+def _run_sect_task(task):
+    """Rebuild a detached sect from its state, advance it and return the new state"""
+    seed, use_batch, sect_state, member_states = task
+
+    sect = Sect.__new__(Sect)
+    vars(sect).update(sect_state)
+    # The parent recounts the sect's power once the changes are applied
+    vars(sect).update(members=[], member_ids={}, power_stats=SectPower(), alliances=[], rivals=[])
+    for values in member_states:
+        member = Member.__new__(Member)
+        for field, value in zip(MEMBER_FIELDS, values):
+            object.__setattr__(member, field, value)
+        object.__setattr__(member, "sect", sect)
+        sect.members.append(member)
+
+    results = run_sect_turn(sect, seed, _get_batch_engine() if use_batch else None)
+    return results, _sect_state(sect), [_member_state(member) for member in sect.members]
+
+
+def _apply_changes(entity, fields, values):
+    # Only assign what changed so untouched entities stay clean for incremental saves
+    for field, value in zip(fields, values):
+        if getattr(entity, field, _MISSING) != value:
+            setattr(entity, field, value)
+
+
+class WorldTicker:
+    """
+    Processes a turn for every sect, optionally sharded across worker processes
+    """
+
+    def __init__(self, workers=None, streams=None, min_parallel_disciples=MIN_PARALLEL_DISCIPLES):
+        """
+        Initialize the scheduler
+
+        Args:
+            workers (int, optional): Worker processes (1, the default, runs in-process)
+            streams (RandomStreams, optional): World random streams (a randomly seeded set if omitted)
+            min_parallel_disciples (int, optional): Smallest world sharded across processes
+        """
+        self.workers = workers or 1
+        self.streams = streams or RandomStreams()
+        self.min_parallel_disciples = min_parallel_disciples
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Workers start from a fresh interpreter: a fork would copy the request and
+            # saver threads' locks in whatever state they are in, and could deadlock
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def run(self, sects, turn, use_batch=False, idle=()):
+        """
+        Advance every sect by one turn
+
+        Args:
+            sects (list): List of Sect objects
+            turn (int): Turn being processed (part of each sect's seed)
+            use_batch (bool): Use the vectorized engine for cultivation (requires numpy)
+            idle (set, optional): Indices of sects that only collect income; their
+                                  disciples are left to lazy catch-up
+
+        Returns:
+            list: Per-sect results dicts, in the same order as sects
+        """
+        use_batch = use_batch and HAS_NUMPY
+        seeds = [self.streams.seed_for(*sect_turn_key(turn, sect)) for sect in sects]
+        per_sect = [None] * len(sects)
+
+        # Income alone is cheap; it never leaves this process
+        for index in idle:
+            per_sect[index] = run_sect_turn(sects[index], seeds[index], cultivate=False)
+        active = [index for index in range(len(sects)) if per_sect[index] is None]
+
+        disciples = sum(len(sects[index].members) for index in active)
+        if self.workers <= 1 or len(active) <= 1 or disciples < self.min_parallel_disciples:
+            batch_engine = _get_batch_engine() if use_batch else None
+            for index in active:
+                per_sect[index] = run_sect_turn(sects[index], seeds[index], batch_engine)
+            return per_sect
+
+        tasks = [
+            (seeds[index], use_batch, _sect_state(sects[index]), [_member_state(member) for member in sects[index].members])
+            for index in active
+        ]
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        for index, (results, sect_state, member_states) in zip(active, self._get_executor().map(_run_sect_task, tasks, chunksize=chunksize)):
+            sect = sects[index]
+            _apply_changes(sect, sect_state.keys(), sect_state.values())
+            for member, values in zip(sect.members, member_states):
+                _apply_changes(member, MEMBER_FIELDS, values)
+            sect.power_stats.rebuild(sect.members)
+            per_sect[index] = results
+        return per_sect
+
+
+def merge_results(sects, per_sect):
+    """
+    Merge per-sect turn results into one world results dict
+
+    Args:
+        sects (list): List of Sect objects, in the order the results were produced
+        per_sect (list): Results dicts returned by WorldTicker.run
+
+    Returns:
+        dict: Turn results with resource income keyed by sect name and
+              every event, deviation and attribute increase tagged with its sect
+    """
+    merged = new_turn_results()
+    for sect, results in zip(sects, per_sect):
+        merged["resource_income"][sect.name] = results["resource_income"]
+        merged["cultivation_progress"].update(results["cultivation_progress"])
+        merged["disciple_changes"].update(results["disciple_changes"])
+        for key in ("events", "new_missions", "cultivation_deviations", "attribute_increases"):
+            merged[key].extend(dict(entry, sect=sect.name) for entry in results[key])
+    return merged
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the Sectomie API
+
+The world (sects, disciples, game state) lives in the memory of the process
+that imported app.py, so the API is served by exactly one worker process
+and gets its concurrency from threads:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+GETs answered from the response cache are served without locks. Other
+requests lock the sect they act on (see world_locks.py), so writes to
+different sects run in parallel, while turn end holds the whole world.
+
+Mutations are saved by app.world_saver on a background thread; it writes
+out anything pending when the process exits (SIGTERM included when this
+module is run directly, and gunicorn's worker_exit hook otherwise).
+
+Running this module directly uses Werkzeug's threaded server without the
+debugger and reloader of `python app.py`.
+"""
+
+import os
+import signal
+import sys
+
+from app import app
+
+
+application = app
+
+
+if __name__ == '__main__':
+    from werkzeug.serving import run_simple
+
+    # Exit normally on SIGTERM so the atexit hook flushes pending saves
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    host, _, port = os.environ.get('SECTOMIE_BIND', '127.0.0.1:5000').rpartition(':')
+    run_simple(host or '127.0.0.1', int(port), application, threaded=True)